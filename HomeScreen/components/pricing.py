@@ -3,10 +3,12 @@ import numpy as np
 import streamlit as st
 from scipy.interpolate import make_interp_spline
 import gc  # ✅ Required for memory cleanup
+from ai_dev_app.helpers import metrics
 
 def get_color(val, ref):
     return "green" if val > ref else "red" if val < ref else "gray"
 
+@metrics.timed("render_seconds", stage="price_cards")
 def render_price_cards(min_price, max_price, avg, today_price, unit, city="National Average"):
     st.markdown("""
     <style>
@@ -63,6 +65,7 @@ def render_price_cards(min_price, max_price, avg, today_price, unit, city="Natio
                 unsafe_allow_html=True)
 
 
+@metrics.timed("render_seconds", stage="price_chart")
 def draw_price_chart(min_price, average_price, max_price, today_price):
     import numpy as np
     import matplotlib.pyplot as plt
@@ -1,14 +1,11 @@
 import streamlit as st
+from ai_dev_app.helpers import metrics
+from ai_dev_app.helpers.catalog import supplier_records
 
+@metrics.timed("render_seconds", stage="suppliers")
 def render_suppliers_tabs(product, selected_city):
-    suppliers = product.get("suppliers", [])
-    second_layer = product.get("second_layer_wholesale_suppliers", [])
-    retail = product.get("retail_suppliers", [])
-    all_wholesale = suppliers + second_layer
-
     # Filter by city
-    filtered_wholesale = _filter_by_city(all_wholesale, selected_city)
-    filtered_retail = _filter_by_city(retail, selected_city)
+    filtered_wholesale, filtered_retail = supplier_records(product, selected_city)
 
     tabs = st.tabs([
         f"🏢 Wholesale Suppliers ({len(filtered_wholesale)})",
@@ -20,24 +17,19 @@ def render_suppliers_tabs(product, selected_city):
     with tabs[1]:
         _render_supplier_list(filtered_retail, highlight_color="#ffcc00")
 
-def _filter_by_city(suppliers, selected_city):
-    if selected_city == "National Average":
-        return suppliers
-    return [s for s in suppliers if selected_city.lower() in s.get("location", "").lower()]
-
 def _render_supplier_list(suppliers, highlight_color):
     if not suppliers:
         st.info("No suppliers listed.")
         return
 
     for sup in suppliers:
-        name = sup.get("name", "—")
-        loc = sup.get("location", "—")
-        desc = sup.get("description", "")
-        website = sup.get("website")
-        email = sup.get("email")
-        sales_email = sup.get("sales_email")
-        phone = sup.get("phone")
+        name = sup.name or "—"
+        loc = sup.location or "—"
+        desc = sup.description
+        website = sup.website
+        email = sup.email
+        sales_email = sup.sales_email
+        phone = sup.phone
 
         contact_html = ""
         if email:
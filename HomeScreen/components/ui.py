@@ -2,6 +2,10 @@ import streamlit as st
 import matplotlib.pyplot as plt
 from HomeScreen.components.suppliers import render_suppliers_tabs
 from HomeScreen.components.pricing import render_price_cards, draw_price_chart
+from HomeScreen.utils.profiler import annotate_profile
+from ai_dev_app.constants.app_constants import AppConstants
+from ai_dev_app.helpers.catalog import city_price_bounds, get_catalog
+from ai_dev_app.helpers.product_search import search_products
 
 def render_title():
     st.markdown("""
@@ -27,25 +31,19 @@ def draw_product_section(category, get_price_fn):
         st.markdown("#### 🌍 **Select City**")
         selected_city = st.selectbox(
             "Choose a city",
-            options=["National Average", "Riyadh", "Jeddah", "Makkah", "Dammam", "Medina"],
+            options=AppConstants.CITIES,
             key=f"city_selector_{category['name']}"
         )
 
     if not selected_product:
         return
 
-    # --- Calculate city-specific prices ---
-    base_min = selected_product.get("min_price", 0)
-    base_max = selected_product.get("max_price", 0)
-    city_margins = selected_product.get("city_margins", {})
+    annotate_profile(category=category.get("name"), product=selected_name, city=selected_city)
+    draw_product_details(selected_product, selected_city, get_price_fn, left, right)
 
-    margin = city_margins.get(selected_city, {}) if selected_city != "National Average" else {}
-    min_margin = margin.get("min_margin_percent", 0)
-    max_margin = margin.get("max_margin_percent", 0)
-
-    min_price = base_min + (base_min * min_margin / 100)
-    max_price = base_max + (base_max * max_margin / 100)
-    avg_price = (min_price + max_price) / 2
+def draw_product_details(selected_product, selected_city, get_price_fn, left, right):
+    # --- City-specific prices (precomputed per catalog) ---
+    min_price, max_price, _, avg_price = city_price_bounds(selected_product, selected_city)
 
     # --- Get AI price with city ---
     price_data = get_price_fn(selected_product, city=selected_city)
@@ -64,3 +62,28 @@ def draw_product_section(category, get_price_fn):
 
     with left:
         render_suppliers_tabs(selected_product, selected_city)
+
+def render_product_search(get_price_fn):
+    query = st.text_input("🔎 Search products (English or Arabic)", key="product_search")
+    if not query.strip():
+        return
+
+    results = search_products(query, limit=8)
+    if not results:
+        st.info(f"No products match “{query}”.")
+        return
+
+    left, right = st.columns([1, 2])
+
+    with left:
+        labels = [f"{r['name']} · {r['category']}" for r in results]
+        selected_label = st.radio("Matching products", labels, key="product_search_result")
+        selected = results[labels.index(selected_label)]
+        selected_city = st.selectbox("Choose a city", options=AppConstants.CITIES, key="city_selector_search")
+
+    selected_product = get_catalog().get_product(selected["name"])
+    if not selected_product:
+        return
+
+    annotate_profile(category=selected["category"], product=selected["name"], city=selected_city, search=query)
+    draw_product_details(selected_product, selected_city, get_price_fn, left, right)
@@ -1,6 +1,4 @@
-import json
+from ai_dev_app.helpers.catalog import get_catalog
 
 def load_materials(path):
-    with open(path, "r") as f:
-        data = json.load(f)
-    return data["materials"]
+    return get_catalog(path).categories
@@ -0,0 +1,170 @@
+import os
+import re
+import json
+import time
+import pstats
+import cProfile
+import threading
+from datetime import datetime
+import streamlit as st
+from ai_dev_app.constants.app_constants import AppConstants
+
+# Opt-in cProfile capture of one Streamlit script run.
+# Enable with FRJAR_PROFILE=1 (FRJAR_PROFILE_SUMMARY=1 also shows the top
+# functions under the page). With FRJAR_PROFILE_ALLOW_QUERY=1 the operator
+# also lets visitors turn it on with ?profile=1 or ?profile=summary.
+# Each profiled rerun writes <app>-<time>-<session>.prof plus a .json sidecar
+# with the session and product context to AppConstants.PROFILE_DIR.
+
+_active = threading.local()
+
+
+def _query_param(name):
+    try:
+        value = st.query_params.get(name)
+    except Exception:
+        return None
+    if isinstance(value, list):
+        return value[0] if value else None
+    return value
+
+
+def _session_id():
+    try:
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+        ctx = get_script_run_ctx()
+        return ctx.session_id if ctx else "no-session"
+    except Exception:
+        return "no-session"
+
+
+def profiling_mode():
+    """Returns None (off), "file" or "summary" for the current rerun."""
+    param = (_query_param("profile") or "").lower() if AppConstants.PROFILE_ALLOW_QUERY else ""
+    env = os.environ.get("FRJAR_PROFILE", "0").lower()
+    if param == "summary" or (env in ("1", "true") and os.environ.get("FRJAR_PROFILE_SUMMARY") == "1"):
+        return "summary"
+    if param in ("1", "true") or env in ("1", "true"):
+        return "file"
+    return None
+
+
+class RerunProfiler:
+    def __init__(self, app_name, show_summary=False, top_n=AppConstants.PROFILE_TOP_N):
+        self.app_name = app_name
+        self.show_summary = show_summary
+        self.top_n = top_n
+        self.context = {"annotations": []}
+        self.path = None
+        self.top = []
+        self._profile = cProfile.Profile()
+        self._started = None
+
+    def start(self):
+        # A previous run on this script thread may have died before finish()
+        stale = getattr(_active, "profiler", None)
+        if stale is not None and stale is not self:
+            stale._profile.disable()
+        self._started = time.perf_counter()
+        _active.profiler = self
+        self._profile.enable()
+        return self
+
+    def finish(self):
+        if self._started is None:
+            return None
+        self._profile.disable()
+        elapsed = time.perf_counter() - self._started
+        self._started = None
+        _active.profiler = None
+
+        session_id = _session_id()
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+        os.makedirs(AppConstants.PROFILE_DIR, exist_ok=True)
+        session_tag = re.sub(r"[^A-Za-z0-9]", "", session_id)[:8]
+        base = os.path.join(AppConstants.PROFILE_DIR, f"{self.app_name}-{stamp}-{session_tag}")
+
+        self.path = base + ".prof"
+        self._profile.dump_stats(self.path)
+        self.top = top_functions(pstats.Stats(self._profile), self.top_n)
+
+        with open(base + ".json", "w", encoding="utf-8") as f:
+            json.dump({
+                "app": self.app_name,
+                "session_id": session_id,
+                "started_at": stamp,
+                "duration_s": round(elapsed, 4),
+                "query_params": _query_params_dict(),
+                "context": self.context,
+                "top_functions": self.top
+            }, f, ensure_ascii=False, indent=2)
+
+        if self.show_summary:
+            render_profile_summary(self, elapsed)
+        return self.path
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        # st.stop() and st.rerun() end the script with an exception; still keep the profile
+        try:
+            self.finish()
+        except Exception as e:
+            print(f"⚠️ Could not save rerun profile: {e}")
+        return False
+
+
+class _NoopProfiler:
+    def start(self):
+        return self
+
+    def finish(self):
+        return None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+def _query_params_dict():
+    try:
+        return {k: st.query_params.get(k) for k in st.query_params.keys()}
+    except Exception:
+        return {}
+
+
+def profile_rerun(app_name):
+    """Profiler for this script run if profiling was requested, otherwise a no-op."""
+    mode = profiling_mode()
+    if not mode:
+        return _NoopProfiler()
+    return RerunProfiler(app_name, show_summary=(mode == "summary"))
+
+
+def annotate_profile(**fields):
+    """Attaches context (selected product, city, ...) to the profile of the current rerun."""
+    profiler = getattr(_active, "profiler", None)
+    if profiler is not None:
+        profiler.context["annotations"].append(fields)
+
+
+def top_functions(stats, top_n):
+    rows = []
+    for (filename, line, func), (cc, nc, tt, ct, _) in stats.stats.items():
+        rows.append({
+            "function": f"{func} ({os.path.basename(filename)}:{line})",
+            "calls": nc,
+            "own_s": round(tt, 6),
+            "cumulative_s": round(ct, 6)
+        })
+    rows.sort(key=lambda r: r["cumulative_s"], reverse=True)
+    return rows[:top_n]
+
+
+def render_profile_summary(profiler, elapsed):
+    with st.expander(f"⏱️ Rerun profile — {elapsed * 1000:.0f} ms", expanded=False):
+        st.caption(f"Saved to {profiler.path}")
+        st.table(profiler.top)
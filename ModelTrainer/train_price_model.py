@@ -1,13 +1,22 @@
+import sys
 import os
+
+# Add the root project folder (one level up from ModelTrainer) to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
 import json
-import pickle
 import logging
+import argparse
+import threading
+import multiprocessing
 import numpy as np
 from datetime import datetime
 from sklearn.preprocessing import OneHotEncoder
 from sklearn.model_selection import train_test_split
 from xgboost import XGBRegressor
 from apscheduler.schedulers.background import BackgroundScheduler
+from ai_dev_app.constants.app_constants import AppConstants
+from ai_dev_app.helpers.model_registry import publish_model, current_model_file, load_model_file
 
 # Configure logging
 logging.basicConfig(
@@ -70,26 +79,27 @@ def extract_features(data: dict) -> list:
 
 
 class CloudTrainingModel:
-    def __init__(self):
+    def __init__(self, load_existing=True):
         self.forecast_file = "../assets/final_materials_with_forecast.json"
         self.training_file = "../assets/cloud_ai_training.json"
-        self.model_file = "../models/ai_price_model.pkl"
+        self.model_dir = "../models"
         self.model = None
-        self._initialize()
+        self._initialize(load_existing)
 
-    def _initialize(self):
-        """Initialize directories and load/create model."""
-        os.makedirs("../models", exist_ok=True)
+    def _initialize(self, load_existing=True):
+        """Initialize directories and, unless told not to, load/create model."""
+        os.makedirs(self.model_dir, exist_ok=True)
         os.makedirs("../assets", exist_ok=True)
-        self._load_or_train_model()
+        if load_existing:
+            self._load_or_train_model()
 
     def _load_or_train_model(self):
         """Load existing model or train a new one."""
         try:
-            if os.path.exists(self.model_file):
-                with open(self.model_file, "rb") as f:
-                    self.model = pickle.load(f)
-                logger.info("Loaded existing model successfully")
+            version, path = current_model_file(self.model_dir)
+            if path:
+                self.model = load_model_file(path)
+                logger.info(f"Loaded existing model version {version}")
             else:
                 logger.info("No model found - training new model")
                 self.train_model()
@@ -258,7 +268,8 @@ class CloudTrainingModel:
             colsample_bytree=0.9,
             objective="reg:squarederror",
             early_stopping_rounds=10,
-            eval_metric="rmse"
+            eval_metric="rmse",
+            n_jobs=AppConstants.TRAIN_THREADS
         )
 
         model.fit(
@@ -267,31 +278,77 @@ class CloudTrainingModel:
             verbose=True
         )
 
-        with open(self.model_file, "wb") as f:
-            pickle.dump(model, f)
+        # Versioned file + atomic rename; running servers swap it in on their next poll
+        version = publish_model(model, self.model_dir)
+        logger.info(f"Published model version {version}")
 
         self.model = model
 
-    def schedule_auto_training(self, hours=6):
-        """Schedule automatic retraining."""
-        try:
-            scheduler = BackgroundScheduler()
-            scheduler.add_job(
-                self.train_model,
-                'interval',
-                hours=hours,
-                next_run_time=datetime.now()
-            )
-            scheduler.start()
-            logger.info(f"⏰ Scheduled retraining every {hours} hours")
-        except Exception as e:
-            logger.error(f"Scheduler failed: {str(e)}")
 
+def schedule_auto_training(hours=6):
+    """Schedule automatic retraining, each run in its own process."""
+    try:
+        scheduler = BackgroundScheduler()
+        scheduler.add_job(
+            train_in_subprocess,
+            'interval',
+            hours=hours,
+            next_run_time=datetime.now()
+        )
+        scheduler.start()
+        logger.info(f"⏰ Scheduled retraining every {hours} hours")
+    except Exception as e:
+        logger.error(f"Scheduler failed: {str(e)}")
+
+
+def _train_process():
+    # Runs in the child at a lower priority, so a server sharing the machine
+    # keeps its cores. Always trains: loading the current model is not needed.
+    try:
+        os.nice(AppConstants.TRAIN_NICE)
+    except (AttributeError, OSError):
+        pass
+    CloudTrainingModel(load_existing=False).train_model()
+
+
+def train_in_subprocess(timeout=None):
+    """Trains and publishes a model in a separate process; returns True if it succeeded."""
+    process = multiprocessing.get_context("spawn").Process(target=_train_process, name="price-model-training")
+    # The child reads OMP_NUM_THREADS when it imports numpy and xgboost, before
+    # _train_process runs, so it has to be in the environment it starts with
+    previous = os.environ.get("OMP_NUM_THREADS")
+    os.environ["OMP_NUM_THREADS"] = str(AppConstants.TRAIN_THREADS)
+    try:
+        process.start()
+    finally:
+        if previous is None:
+            os.environ.pop("OMP_NUM_THREADS", None)
+        else:
+            os.environ["OMP_NUM_THREADS"] = previous
+    process.join(timeout)
+    if process.is_alive():
+        logger.error("Training timed out; terminating it")
+        process.terminate()
+        process.join()
+        return False
+    if process.exitcode != 0:
+        logger.error(f"Training process exited with code {process.exitcode}")
+        return False
+    return True
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train the local price model and publish a new version")
+    parser.add_argument("--once", action="store_true", help="Train once in a child process and exit")
+    parser.add_argument("--hours", type=float, default=6, help="Retraining interval")
+    args = parser.parse_args()
+
     try:
-        model = CloudTrainingModel()
-        model.schedule_auto_training()
+        if args.once:
+            sys.exit(0 if train_in_subprocess() else 1)
+        # This process only schedules; every run trains in its own child process
+        schedule_auto_training(hours=args.hours)
+        # The scheduler thread is a daemon; keep the trainer process alive
+        threading.Event().wait()
     except Exception as e:
         logger.error(f"Application failed: {str(e)}")
@@ -1,6 +1,15 @@
 import os
 import streamlit as st
 
+
+def _secret(name, default=""):
+    # Headless processes (API server, CLI) run without .streamlit/secrets.toml
+    try:
+        return st.secrets[name]
+    except Exception:
+        return os.environ.get(name, default)
+
+
 class AppConstants:
     # Default products if no file uploaded
     # DEFAULT_PRODUCTS = [
@@ -29,22 +38,121 @@ class AppConstants:
     # Forecast years
     PAST_YEARS = 3
     FUTURE_YEARS = 3
+    # Months precomputed by the local forecast engine past each series' end
+    FORECAST_HORIZON_MONTHS = 72
 
     # OpenAI settings
     OPENAI_MODEL = "gpt-4o"
-    OPENAI_API_KEY = st.secrets["OPENAI_API_KEY"]
+    OPENAI_API_KEY = _secret("OPENAI_API_KEY")
 
     # Gemini (Google AI) settings
-    GEMINI_API_KEY = st.secrets["GEMINI_API_KEY"]
+    GEMINI_API_KEY = _secret("GEMINI_API_KEY")
     GEMINI_MODEL = "gemini-2.0-flash"
 
     # Groq settings
     GROQ_MODEL = "llama3-70b-8192"
-    GROQ_API_KEY = st.secrets["GROQ_API_KEY"]
+    GROQ_API_KEY = _secret("GROQ_API_KEY")
 
     # DeepSeek settings
     DEEPSEEK_MODEL = "deepseek-chat"
-    DEEPSEEK_API_KEY = st.secrets["DEEPSEEK_API_KEY"]
+    DEEPSEEK_API_KEY = _secret("DEEPSEEK_API_KEY")
+
+    # Provider endpoints. FRJAR_LLM_BASE_URL points all of them at a local
+    # mock server (benchmarks/mock_llm_server.py) for load and failure testing.
+    LLM_BASE_URL = os.environ.get("FRJAR_LLM_BASE_URL", "").rstrip("/")
+    GEMINI_BASE_URL = f"{LLM_BASE_URL}/gemini" if LLM_BASE_URL else "https://generativelanguage.googleapis.com"
+    GROQ_BASE_URL = f"{LLM_BASE_URL}/groq/v1" if LLM_BASE_URL else "https://api.groq.com/openai/v1"
+    DEEPSEEK_BASE_URL = f"{LLM_BASE_URL}/deepseek/v1" if LLM_BASE_URL else "https://api.deepseek.com/v1"
+    OPENAI_BASE_URL = f"{LLM_BASE_URL}/openai/v1" if LLM_BASE_URL else None
+    LLM_TIMEOUT_SECONDS = 30
+    # Connection pool size of the shared async HTTP session (async_helpers)
+    LLM_MAX_CONNECTIONS = int(os.environ.get("FRJAR_LLM_MAX_CONNECTIONS", "100"))
+
+    # Client-side provider quotas (ai_dev_app/helpers/rate_limiter.py): requests
+    # and tokens per minute, 0 = unlimited. ask_ai skips a provider without
+    # budget and only waits (briefly, in a bounded queue) when all are spent.
+    LLM_RATE_LIMITS_ENABLED = os.environ.get("FRJAR_LLM_RATE_LIMITS", "1") == "1"
+    LLM_RATE_LIMITS = {
+        "gemini": {"rpm": int(os.environ.get("FRJAR_GEMINI_RPM", "15")), "tpm": int(os.environ.get("FRJAR_GEMINI_TPM", "1000000"))},
+        "groq": {"rpm": int(os.environ.get("FRJAR_GROQ_RPM", "30")), "tpm": int(os.environ.get("FRJAR_GROQ_TPM", "6000"))},
+        "deepseek": {"rpm": int(os.environ.get("FRJAR_DEEPSEEK_RPM", "0")), "tpm": int(os.environ.get("FRJAR_DEEPSEEK_TPM", "0"))},
+        "openai": {"rpm": int(os.environ.get("FRJAR_OPENAI_RPM", "500")), "tpm": int(os.environ.get("FRJAR_OPENAI_TPM", "30000"))}
+    }
+    LLM_RATE_LIMIT_MAX_WAIT_SECONDS = 2.0
+    LLM_RATE_LIMIT_MAX_WAITERS = 16
+
+    # Prompt-hash -> reply cache in front of ask_ai (ai_dev_app/helpers/llm_cache.py)
+    LLM_CACHE_ENABLED = os.environ.get("FRJAR_LLM_CACHE", "1") == "1"
+    LLM_CACHE_FILE = "cache/llm_responses.sqlite3"
+    LLM_CACHE_TTL_HOURS = 24
+    LLM_CACHE_MAX_ENTRIES = 20000
+    # Date granularity written into pricing prompts: "day", "week" or "month".
+    # Coarser buckets let more lookups share one cached reply.
+    LLM_PROMPT_DATE_BUCKET = os.environ.get("FRJAR_LLM_PROMPT_DATE_BUCKET", "week")
 
     # Session backup
     SESSION_BACKUP_FILE = "cache/session_backup.json"
+
+    # Catalog
+    CATALOG_FILE = "assets/final_materials_with_forecast.json"
+    # Poll the catalog file and swap in edits without a restart
+    CATALOG_HOT_RELOAD = os.environ.get("FRJAR_CATALOG_HOT_RELOAD", "1") == "1"
+    CATALOG_RELOAD_INTERVAL_SECONDS = float(os.environ.get("FRJAR_CATALOG_RELOAD_INTERVAL", "5"))
+    CITIES = ["National Average", "Riyadh", "Jeddah", "Makkah", "Dammam", "Medina"]
+
+    # Price caching
+    PRICE_CACHE_TTL_HOURS = 6
+    # Serve an expired price immediately and refresh it in the background
+    PRICE_STALE_WHILE_REVALIDATE = os.environ.get("FRJAR_PRICE_SWR", "0") == "1"
+    PRICE_MAX_STALE_HOURS = float(os.environ.get("FRJAR_PRICE_MAX_STALE_HOURS", "48"))
+    PRICE_REFRESH_WORKERS = 4
+    # On the first miss for a product, price every city in CITIES with one LLM request
+    PRICE_ALL_CITIES = os.environ.get("FRJAR_PRICE_ALL_CITIES", "1") == "1"
+
+    # Confidence router (ai_dev_app/helpers/price_router.py): a cache miss is priced from the
+    # local forecast instead of an LLM when its relative uncertainty is at most this.
+    # Off by default until the threshold is validated against LLM prices.
+    PRICE_ROUTER_ENABLED = os.environ.get("FRJAR_PRICE_ROUTER", "0") == "1"
+    PRICE_ROUTER_MAX_UNCERTAINTY = float(os.environ.get("FRJAR_PRICE_ROUTER_MAX_UNCERTAINTY", "0.03"))
+    PRICE_ROUTER_MIN_MONTHS = 6
+
+    # Startup warm-up (ai_dev_app/helpers/warmup.py): the API reports /ready once it has run
+    WARMUP_ON_START = os.environ.get("FRJAR_WARMUP", "1") == "1"
+    WARMUP_TOP_PRODUCTS = int(os.environ.get("FRJAR_WARMUP_TOP_PRODUCTS", "50"))
+    # Also price top products that have no price for today yet (costs LLM calls at every start)
+    WARMUP_PRICE_MISSING = os.environ.get("FRJAR_WARMUP_PRICE_MISSING", "0") == "1"
+
+    # Local price model (ai_dev_app/helpers/model_registry.py). Training publishes
+    # versioned files in MODEL_DIR; servers pick up a new version without a restart.
+    MODEL_DIR = "models"
+    MODEL_HOT_RELOAD = os.environ.get("FRJAR_MODEL_HOT_RELOAD", "1") == "1"
+    MODEL_RELOAD_INTERVAL_SECONDS = float(os.environ.get("FRJAR_MODEL_RELOAD_INTERVAL", "30"))
+    MODEL_KEEP_VERSIONS = 3
+    # CPU budget of the training process: threads for XGBoost and nice level
+    TRAIN_THREADS = int(os.environ.get("FRJAR_TRAIN_THREADS", "2"))
+    TRAIN_NICE = int(os.environ.get("FRJAR_TRAIN_NICE", "10"))
+
+    # Write-behind JSON persistence (ai_dev_app/helpers/persistence.py).
+    # FRJAR_PERSIST_WRITE_BEHIND=0 writes every record synchronously instead.
+    PERSIST_WRITE_BEHIND = os.environ.get("FRJAR_PERSIST_WRITE_BEHIND", "1") == "1"
+    PERSIST_FLUSH_INTERVAL_MS = int(os.environ.get("FRJAR_PERSIST_FLUSH_INTERVAL_MS", "500"))
+    PERSIST_MAX_PENDING = 200
+
+    # Metrics (ai_dev_app/helpers/metrics.py); near-zero cost while disabled
+    METRICS_ENABLED = os.environ.get("FRJAR_METRICS", "0") == "1"
+    METRICS_JSON_LOGS = os.environ.get("FRJAR_METRICS_JSON_LOGS", "0") == "1"
+
+    # Per-rerun profiling (HomeScreen/utils/profiler.py)
+    PROFILE_DIR = "profiles"
+    # ?profile=1 / ?profile=summary in the page URL only work when the operator allows it
+    PROFILE_ALLOW_QUERY = os.environ.get("FRJAR_PROFILE_ALLOW_QUERY", "0") == "1"
+    PROFILE_TOP_N = 25
+
+    # Headless pricing API
+    API_HOST = os.environ.get("FRJAR_API_HOST", "0.0.0.0")
+    API_PORT = int(os.environ.get("FRJAR_API_PORT", "8080"))
+    API_WORKERS = int(os.environ.get("FRJAR_API_WORKERS", "32"))
+    API_MAX_BATCH = 500
+
+    # Replace the LLM providers with local stubs (offline runs)
+    STUB_PROVIDERS = os.environ.get("FRJAR_STUB_PROVIDERS", "0") == "1"
@@ -0,0 +1,253 @@
+import time
+import asyncio
+import weakref
+import aiohttp
+from ai_dev_app.constants.app_constants import AppConstants
+from ai_dev_app.helpers import metrics
+from ai_dev_app.helpers import openai_helpers
+from ai_dev_app.helpers import rate_limiter
+from ai_dev_app.helpers import llm_cache
+
+# Non-blocking versions of the LLM providers and of today's price lookup for
+# the aiohttp API. Provider calls share one pooled ClientSession per event
+# loop, so hundreds of lookups can wait on the network without a thread each.
+# Cache checks, prompt building and the local-model/fallback tiers are the
+# same code openai_helpers uses; only file writes go to the loop's executor.
+# The Streamlit pages keep calling the synchronous functions in openai_helpers.
+
+_sessions = weakref.WeakKeyDictionary()
+_price_tasks = weakref.WeakKeyDictionary()
+
+
+def get_http_session():
+    """Shared ClientSession for the running event loop, created on first use."""
+    loop = asyncio.get_running_loop()
+    session = _sessions.get(loop)
+    if session is None or session.closed:
+        session = aiohttp.ClientSession(
+            timeout=aiohttp.ClientTimeout(total=AppConstants.LLM_TIMEOUT_SECONDS),
+            connector=aiohttp.TCPConnector(limit=AppConstants.LLM_MAX_CONNECTIONS)
+        )
+        _sessions[loop] = session
+    return session
+
+
+async def close_http_session():
+    session = _sessions.pop(asyncio.get_running_loop(), None)
+    if session is not None and not session.closed:
+        await session.close()
+
+
+async def _post_json(url, payload, headers=None, params=None):
+    async with get_http_session().post(url, json=payload, headers=headers, params=params) as r:
+        r.raise_for_status()
+        return await r.json(content_type=None)
+
+
+async def _chat_completion(base_url, api_key, model, prompt):
+    data = {
+        "model": model,
+        "messages": [{"role": "user", "content": prompt}],
+        "temperature": 0.3,
+        "max_tokens": 300
+    }
+    headers = {"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"}
+    body = await _post_json(f"{base_url}/chat/completions", data, headers=headers)
+    return body["choices"][0]["message"]["content"].strip()
+
+
+async def ask_openai_async(prompt):
+    try:
+        base_url = AppConstants.OPENAI_BASE_URL or "https://api.openai.com/v1"
+        return await _chat_completion(base_url, AppConstants.OPENAI_API_KEY, AppConstants.OPENAI_MODEL, prompt)
+    except Exception as e:
+        rate_limiter.note_error("openai", e)
+        print(f"⚠️ OpenAI error: {e}")
+        return None
+
+
+async def ask_gemini_async(prompt, model="gemini-2.0-flash"):
+    try:
+        url = f"{AppConstants.GEMINI_BASE_URL}/v1beta/models/{model}:generateContent"
+        params = {"key": AppConstants.GEMINI_API_KEY}
+        data = {"contents": [{"parts": [{"text": prompt}]}]}
+        body = await _post_json(url, data, headers={"Content-Type": "application/json"}, params=params)
+        return body["candidates"][0]["content"]["parts"][0]["text"].strip()
+    except Exception as e:
+        rate_limiter.note_error("gemini", e)
+        print(f"⚠️ Gemini error: {e}")
+        return None
+
+
+async def ask_deepseek_async(prompt):
+    try:
+        return await _chat_completion(
+            AppConstants.DEEPSEEK_BASE_URL, AppConstants.DEEPSEEK_API_KEY, AppConstants.DEEPSEEK_MODEL, prompt
+        )
+    except Exception as e:
+        rate_limiter.note_error("deepseek", e)
+        print(f"⚠️ DeepSeek error: {e}")
+        return None
+
+
+async def ask_groq_async(prompt):
+    try:
+        return await _chat_completion(
+            AppConstants.GROQ_BASE_URL, AppConstants.GROQ_API_KEY, AppConstants.GROQ_MODEL, prompt
+        )
+    except Exception as e:
+        rate_limiter.note_error("groq", e)
+        print(f"⚠️ Groq error: {e}")
+        return None
+
+
+async def _call_provider(ai_func, provider, prompt):
+    started = time.perf_counter()
+    try:
+        reply = await ai_func(prompt)
+    except Exception as e:
+        print(f"⚠️ {ai_func.__name__} failed: {e}")
+        reply = None
+    metrics.observe("llm_request_seconds", time.perf_counter() - started, provider=provider)
+    metrics.inc("llm_requests_total", provider=provider, outcome="ok" if reply else "error")
+    return reply.strip() if reply else None
+
+
+async def ask_ai_async(prompt, accept=bool):
+    """Async ask_ai: same response cache, provider order, rate limits and metrics, without blocking the event loop."""
+    # The response cache is SQLite; reads and writes both run off the loop
+    loop = asyncio.get_running_loop()
+    reply = await loop.run_in_executor(None, llm_cache.lookup, prompt)
+    if reply is not None:
+        return reply
+    reply = await _ask_providers_async(prompt)
+    if reply and accept(reply):
+        await loop.run_in_executor(None, llm_cache.store, prompt, reply)
+    return reply
+
+
+async def _ask_providers_async(prompt):
+    ai_models = [ask_gemini_async, ask_groq_async, ask_deepseek_async, ask_openai_async]
+    tokens = rate_limiter.estimate_tokens(prompt)
+    throttled = {}
+    for ai_func in ai_models:
+        provider = openai_helpers.provider_name(ai_func)
+        if not rate_limiter.try_acquire(provider, tokens):
+            throttled[provider] = ai_func
+            continue
+        reply = await _call_provider(ai_func, provider, prompt)
+        if reply:
+            return reply
+
+    while throttled:
+        provider, wait = rate_limiter.reserve_any(list(throttled), tokens)
+        if provider is None:
+            break
+        await asyncio.sleep(wait)
+        reply = await _call_provider(throttled.pop(provider), provider, prompt)
+        if reply:
+            return reply
+    return None
+
+
+async def get_today_price_estimate_async(product, city=None):
+    result, _ = await estimate_today_price_async(product, city)
+    return result
+
+
+async def estimate_today_price_async(product, city=None):
+    """
+    Async estimate_today_price: same tiers, cache, history and metrics.
+
+    Concurrent misses for one product and city on this event loop share a
+    single AI round trip (tier "coalesced" for the waiters).
+
+    Returns:
+        Tuple of (price summary dict, tier name from PRICE_TIERS)
+    """
+    started = time.perf_counter()
+    result, tier = await _estimate_today_price_async(product, city)
+    metrics.observe("price_lookup_seconds", time.perf_counter() - started, tier=tier)
+    metrics.inc("price_lookups_total", tier=tier)
+    return result, tier
+
+
+async def _estimate_today_price_async(product, city=None):
+    product_name = product.get("name", "unknown")
+    cache_key = openai_helpers.price_cache_key(product_name, city)
+
+    cached = openai_helpers._lookup_cached_price(cache_key, product_name, city)
+    if cached:
+        return cached
+
+    if AppConstants.PRICE_STALE_WHILE_REVALIDATE:
+        stale = openai_helpers._lookup_stale_price(cache_key, product_name, city)
+        if stale:
+            openai_helpers._schedule_refresh(product, city, cache_key)
+            return stale, "stale"
+
+    routed = await asyncio.get_running_loop().run_in_executor(
+        None, openai_helpers.price_from_router, product, city, cache_key
+    )
+    if routed:
+        return routed
+
+    if AppConstants.PRICE_ALL_CITIES:
+        # One task per product prices every city; a city the reply left out is priced on its own below
+        priced, shared = await _run_shared(
+            openai_helpers.all_cities_flight_key(product_name), _price_all_cities_async, product
+        )
+        found = priced.get(city or "National Average")
+        if found:
+            return found[0], "coalesced" if shared else found[1]
+
+    (result, tier), shared = await _run_shared(cache_key, _price_on_miss_async, product, city, cache_key)
+    return result, "coalesced" if shared else tier
+
+
+async def _run_shared(key, fn, *args):
+    """Runs fn(*args) once per key on this loop; returns (result, shared) like SingleFlight.do."""
+    tasks = _price_tasks.setdefault(asyncio.get_running_loop(), {})
+    task = tasks.get(key)
+    if task is not None:
+        return await asyncio.shield(task), True
+
+    task = asyncio.ensure_future(fn(*args))
+    tasks[key] = task
+    task.add_done_callback(lambda _: tasks.pop(key, None))
+    # Shielded so a client disconnect does not cancel the lookup others are waiting on
+    return await asyncio.shield(task), False
+
+
+async def _price_all_cities_async(product):
+    loop = asyncio.get_running_loop()
+    city_bounds = await loop.run_in_executor(None, openai_helpers.cities_to_price, product)
+    if len(city_bounds) <= 1:
+        return {}
+
+    prompt = openai_helpers.build_multi_city_price_prompt(product.get("name", "unknown"), city_bounds)
+    reply = await ask_ai_async(prompt, accept=openai_helpers.has_json_object)
+    if not reply:
+        return await loop.run_in_executor(None, openai_helpers.prices_without_ai, product, city_bounds)
+    return await loop.run_in_executor(None, openai_helpers.prices_from_multi_city_reply, product, reply, city_bounds)
+
+
+async def _price_on_miss_async(product, city, cache_key):
+    # A task for this key may have finished between our cache check and this one starting
+    cached = openai_helpers._lookup_cached_price(cache_key, product.get("name", "unknown"), city)
+    if cached:
+        return cached
+
+    loop = asyncio.get_running_loop()
+    bounds = openai_helpers.price_bounds(product, city)
+    prompt = openai_helpers.build_price_prompt(product.get("name", "unknown"), city, bounds)
+
+    # Step 3: Ask AI; storing the result writes JSON files, so it runs off the loop
+    reply = await ask_ai_async(prompt, accept=openai_helpers.has_json_object)
+    priced = await loop.run_in_executor(
+        None, openai_helpers.price_from_reply, product, city, cache_key, reply, bounds
+    )
+    if priced:
+        return priced
+
+    return await loop.run_in_executor(None, openai_helpers.price_without_ai, product, city, cache_key, bounds)
@@ -0,0 +1,417 @@
+import os
+import json
+import time
+import hashlib
+import threading
+import numpy as np
+from ai_dev_app.constants.app_constants import AppConstants
+from ai_dev_app.helpers import metrics
+from ai_dev_app.helpers.records import ProductSuppliers, Supplier, intern_catalog_strings
+
+CATALOG_FILE = AppConstants.CATALOG_FILE
+
+_catalog = None
+_catalog_lock = threading.Lock()
+_reload_lock = threading.Lock()
+_listeners = []
+_watcher = None
+
+# Columns of PriceMatrix.values
+MIN, MAX, MEDIAN, AVG = range(4)
+
+
+class Catalog:
+    """Parsed materials catalog with lookup indexes, shared by the UI, API and CLI."""
+
+    def __init__(self, categories, version, path=None, previous=None, unchanged=()):
+        self.categories = categories
+        self.version = version
+        self.path = path
+        self.products_by_name = {}
+        self.category_by_product = {}
+        # Supplier records are built on first use; unchanged products keep theirs across reloads
+        self.suppliers = {}
+        if previous is not None:
+            self.suppliers = {key: found for key, found in previous.suppliers.items() if key in unchanged}
+
+        for category in categories:
+            for product in category.get("products", []):
+                key = product_key(product.get("name", ""))
+                self.products_by_name[key] = product
+                self.category_by_product[key] = category.get("name", "")
+
+        # On reload, unchanged products keep their matrix rows from the previous version
+        self.prices = PriceMatrix(
+            (p for _, p in self.iter_products()),
+            previous=previous.prices if previous else None,
+            reuse=unchanged
+        )
+
+    def get_product(self, name):
+        return self.products_by_name.get(product_key(name))
+
+    def iter_products(self):
+        for category in self.categories:
+            for product in category.get("products", []):
+                yield category, product
+
+    def category_names(self):
+        return [category.get("name", "") for category in self.categories]
+
+
+def product_key(name):
+    return (name or "").strip().lower()
+
+
+def compute_city_bounds(product, city=None):
+    """Min/max/median/average of one product dict with the city's margins applied."""
+    base_min = product.get("min_price", 0)
+    base_max = product.get("max_price", 0)
+    average = product.get("average", 0)
+    median = product.get("median", average)
+
+    if city and city != "National Average":
+        city_margin = product.get("city_margins", {}).get(city, {})
+        base_min += base_min * city_margin.get("min_margin_percent", 0) / 100
+        base_max += base_max * city_margin.get("max_margin_percent", 0) / 100
+        average = (base_min + base_max) / 2
+        median = average
+
+    return base_min, base_max, median, average
+
+
+class PriceMatrix:
+    """
+    City-adjusted price bounds for every product × city, computed once per catalog.
+
+    values[row, city, column] holds MIN, MAX, MEDIAN and AVG. National Average
+    keeps the catalog's own average/median; for a city both are the midpoint
+    of the margin-adjusted min and max.
+    """
+
+    def __init__(self, products, cities=None, previous=None, reuse=()):
+        self.cities = list(cities or AppConstants.CITIES)
+        self.city_index = {city: i for i, city in enumerate(self.cities)}
+        self.rows = {}
+
+        if previous is not None and previous.cities != self.cities:
+            previous = None
+
+        products = list(products)
+        self.values = np.zeros((len(products), len(self.cities), 4))
+        self._bounds = [None] * len(products)
+        fresh_rows = []
+        for row, product in enumerate(products):
+            key = product_key(product.get("name", ""))
+            self.rows[key] = row
+            old_row = previous.rows.get(key) if previous is not None and key in reuse else None
+            if old_row is None:
+                fresh_rows.append(row)
+            else:
+                self.values[row] = previous.values[old_row]
+                self._bounds[row] = previous._bounds[old_row]
+
+        self.computed_rows = len(fresh_rows)
+        if fresh_rows:
+            computed = self._compute([products[row] for row in fresh_rows])
+            self.values[fresh_rows] = computed
+            # Per-request lookups read plain tuples; indexing NumPy scalars is slower than the math it replaces
+            for row, cells in zip(fresh_rows, computed.tolist()):
+                self._bounds[row] = [tuple(cell) for cell in cells]
+
+    def _compute(self, products):
+        base = np.zeros((len(products), 4))
+        margins = np.zeros((len(products), len(self.cities), 2))
+        for row, product in enumerate(products):
+            average = product.get("average", 0)
+            base[row] = (product.get("min_price", 0), product.get("max_price", 0), product.get("median", average), average)
+            city_margins = product.get("city_margins", {})
+            for city, col in self.city_index.items():
+                margin = city_margins.get(city, {}) if city != "National Average" else {}
+                margins[row, col] = (margin.get("min_margin_percent", 0), margin.get("max_margin_percent", 0))
+
+        adjusted_min = base[:, None, MIN] + base[:, None, MIN] * margins[:, :, 0] / 100
+        adjusted_max = base[:, None, MAX] + base[:, None, MAX] * margins[:, :, 1] / 100
+        midpoint = (adjusted_min + adjusted_max) / 2
+        national = np.array([city == "National Average" for city in self.cities])
+
+        return np.stack([
+            adjusted_min,
+            adjusted_max,
+            np.where(national, base[:, None, MEDIAN], midpoint),
+            np.where(national, base[:, None, AVG], midpoint)
+        ], axis=-1)
+
+    def bounds(self, name, city=None):
+        """Returns (min, max, median, average) as floats, or None for an unknown product or city."""
+        return self.bounds_for_key(product_key(name), city)
+
+    def bounds_for_key(self, key, city=None):
+        row = self.rows.get(key)
+        col = self.city_index.get(city or "National Average")
+        if row is None or col is None:
+            return None
+        return self._bounds[row][col]
+
+    def compare_cities(self, name):
+        """{city: {"min_price", "max_price", "average"}} for one product, e.g. for a city comparison view."""
+        row = self.rows.get(product_key(name))
+        if row is None:
+            return {}
+        return {
+            city: {
+                "min_price": float(self.values[row, col, MIN]),
+                "max_price": float(self.values[row, col, MAX]),
+                "average": float(self.values[row, col, AVG])
+            }
+            for city, col in self.city_index.items()
+        }
+
+
+def _read_catalog_file(path):
+    with open(path, "rb") as f:
+        raw = f.read()
+    return intern_catalog_strings(json.loads(raw)["materials"]), hashlib.sha1(raw).hexdigest()[:12]
+
+
+@metrics.timed("catalog_load_seconds")
+def load_catalog(path=CATALOG_FILE):
+    categories, version = _read_catalog_file(path)
+    return Catalog(categories, version, path=path)
+
+
+def get_catalog(path=CATALOG_FILE):
+    """Returns the process-wide catalog, parsing the file only once."""
+    global _catalog
+    if _catalog is None:
+        with _catalog_lock:
+            if _catalog is None:
+                _catalog = load_catalog(path)
+                if AppConstants.CATALOG_HOT_RELOAD:
+                    start_catalog_watcher(path)
+    return _catalog
+
+
+class CatalogDiff:
+    """Product keys and category names that differ between two catalog versions."""
+
+    def __init__(self, added=(), removed=(), changed=(), categories=()):
+        self.added = set(added)
+        self.removed = set(removed)
+        self.changed = set(changed)
+        self.categories = set(categories)
+
+    @property
+    def touched(self):
+        return self.added | self.removed | self.changed
+
+    def is_empty(self):
+        return not (self.touched or self.categories)
+
+    def summary(self):
+        return {
+            "added": len(self.added),
+            "removed": len(self.removed),
+            "changed": len(self.changed),
+            "categories": sorted(self.categories)
+        }
+
+
+def _products_by_key(categories):
+    return {
+        product_key(product.get("name", "")): product
+        for category in categories
+        for product in category.get("products", [])
+    }
+
+
+def _category_outline(category):
+    # Everything about a category except its products' contents
+    fields = {k: v for k, v in category.items() if k != "products"}
+    return fields, [product_key(p.get("name", "")) for p in category.get("products", [])]
+
+
+def diff_catalog_categories(old_categories, new_categories):
+    """
+    Compares two category lists by product and category.
+
+    Returns:
+        CatalogDiff; categories holds every category that was added, removed
+        or whose own fields, product list or products changed
+    """
+    old_products = _products_by_key(old_categories)
+    new_products = _products_by_key(new_categories)
+    diff = CatalogDiff(
+        added=new_products.keys() - old_products.keys(),
+        removed=old_products.keys() - new_products.keys(),
+        changed={k for k in old_products.keys() & new_products.keys() if old_products[k] != new_products[k]}
+    )
+
+    old_outline = {c.get("name", ""): _category_outline(c) for c in old_categories}
+    new_outline = {c.get("name", ""): _category_outline(c) for c in new_categories}
+    for name in old_outline.keys() | new_outline.keys():
+        if old_outline.get(name) != new_outline.get(name):
+            diff.categories.add(name)
+    for category in new_categories:
+        if any(product_key(p.get("name", "")) in diff.touched for p in category.get("products", [])):
+            diff.categories.add(category.get("name", ""))
+    return diff
+
+
+def _reuse_unchanged(old, categories, diff):
+    # Keep the previous dict objects for untouched products (and fully untouched
+    # categories), so sessions holding them and per-product memos stay valid
+    old_categories = {c.get("name", ""): c for c in old.categories}
+    merged = []
+    for category in categories:
+        name = category.get("name", "")
+        if name not in diff.categories and name in old_categories:
+            merged.append(old_categories[name])
+            continue
+        products = []
+        for product in category.get("products", []):
+            key = product_key(product.get("name", ""))
+            products.append(product if key in diff.touched else old.products_by_name.get(key, product))
+        merged.append({**category, "products": products})
+    return merged
+
+
+def add_catalog_listener(listener):
+    """Registers listener(old_catalog, new_catalog, diff), called after every reload that changed something."""
+    if listener not in _listeners:
+        _listeners.append(listener)
+
+
+def reload_catalog(path=None):
+    """
+    Re-reads the catalog file and swaps in the new version if its content changed.
+
+    Only changed products get new dicts and price-matrix rows; listeners then
+    drop or rebuild their own per-product state for diff.touched. Readers see
+    either the old or the new catalog, never a mix.
+
+    Returns:
+        CatalogDiff, or None if the file content is unchanged
+    """
+    global _catalog
+    with _reload_lock:
+        old = get_catalog(path or CATALOG_FILE)
+        path = path or old.path or CATALOG_FILE
+        started = time.perf_counter()
+        categories, version = _read_catalog_file(path)
+        if version == old.version:
+            return None
+
+        diff = diff_catalog_categories(old.categories, categories)
+        unchanged = old.products_by_name.keys() - diff.touched
+        new = Catalog(_reuse_unchanged(old, categories, diff), version, path=path, previous=old, unchanged=unchanged)
+        with _catalog_lock:
+            _catalog = new
+
+    for listener in list(_listeners):
+        try:
+            listener(old, new, diff)
+        except Exception as e:
+            print(f"⚠️ Catalog listener {getattr(listener, '__name__', listener)} failed: {e}")
+
+    metrics.inc("catalog_reloads_total")
+    metrics.observe("catalog_reload_seconds", time.perf_counter() - started)
+    metrics.log_event("catalog_reloaded", old_version=old.version, new_version=version, **diff.summary())
+    print(f"🔄 Catalog reloaded {old.version} → {version}: {diff.summary()}")
+    return diff
+
+
+class CatalogWatcher(threading.Thread):
+    """Polls the catalog file's mtime and size and reloads it when they change."""
+
+    def __init__(self, path, interval):
+        super().__init__(name="catalog-watcher", daemon=True)
+        self.path = path
+        self.interval = interval
+        self.signature = self._signature()
+        self._stop_event = threading.Event()
+
+    def _signature(self):
+        try:
+            stat = os.stat(self.path)
+            return stat.st_mtime_ns, stat.st_size
+        except OSError:
+            return None
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            signature = self._signature()
+            if signature is None or signature == self.signature:
+                continue
+            try:
+                reload_catalog(self.path)
+                self.signature = signature
+            except Exception as e:
+                # Half-written file: keep serving the old version and retry on the next tick
+                print(f"⚠️ Catalog reload failed, keeping version {_catalog.version if _catalog else '?'}: {e}")
+
+    def stop(self):
+        self._stop_event.set()
+
+
+def start_catalog_watcher(path=CATALOG_FILE, interval=None):
+    global _watcher
+    if _watcher is None or not _watcher.is_alive():
+        _watcher = CatalogWatcher(path, interval or AppConstants.CATALOG_RELOAD_INTERVAL_SECONDS)
+        _watcher.start()
+    return _watcher
+
+
+def city_price_bounds(product, city=None):
+    """
+    Min/max/median/average of a product for the city, read from the catalog's price matrix.
+
+    Product dicts that are not the loaded catalog's own (uploaded or edited
+    copies) are computed directly, so the result always matches the dict.
+
+    Returns:
+        Tuple of (min, max, median, average)
+    """
+    catalog = _catalog or get_catalog()
+    key = product_key(product.get("name", ""))
+    if catalog.products_by_name.get(key) is product:
+        bounds = catalog.prices.bounds_for_key(key, city)
+        if bounds is not None:
+            return bounds
+    return compute_city_bounds(product, city)
+
+
+def filter_suppliers_by_city(suppliers, selected_city):
+    if not selected_city or selected_city == "National Average":
+        return suppliers
+    return [s for s in suppliers if selected_city.lower() in s.get("location", "").lower()]
+
+
+def supplier_records(product, city=None):
+    """
+    (wholesale, retail) Supplier records of a product dict for the city.
+
+    Catalog products build their records once and partition them once per
+    city; any other dict is converted on the fly.
+    """
+    catalog = _catalog or get_catalog()
+    key = product_key(product.get("name", ""))
+    if catalog.products_by_name.get(key) is product:
+        found = catalog.suppliers.get(key)
+        if found is None:
+            found = catalog.suppliers[key] = ProductSuppliers(product)
+        return found.for_city(city)
+    found = get_product_suppliers(product, city)
+    return (
+        tuple(Supplier.from_dict(s) for s in found["wholesale"]),
+        tuple(Supplier.from_dict(s) for s in found["retail"])
+    )
+
+
+def get_product_suppliers(product, city=None):
+    wholesale = product.get("suppliers", []) + product.get("second_layer_wholesale_suppliers", [])
+    retail = product.get("retail_suppliers", [])
+    return {
+        "wholesale": filter_suppliers_by_city(wholesale, city),
+        "retail": filter_suppliers_by_city(retail, city)
+    }
@@ -1,13 +1,18 @@
 import os
+import re
 import json
+import time
+import threading
 from datetime import datetime
 from ai_dev_app.constants.app_constants import AppConstants
-from openai import OpenAI
-
-client = OpenAI(api_key=AppConstants.OPENAI_API_KEY)
+from ai_dev_app.helpers.openai_helpers import get_openai_client, ask_ai, has_json_object
+from ai_dev_app.helpers import llm_cache
+from ai_dev_app.helpers import persistence
+from ai_dev_app.helpers.forecast_engine import get_forecast_engine
 
 # --- Translation cache ---
 _translation_cache = {}
+_translation_lock = threading.Lock()
 TRANSLATION_FILE = "ai_dev_app/cache/translations.json"
 
 # --- Load existing cache ---
@@ -18,11 +23,14 @@ if os.path.exists(TRANSLATION_FILE):
     except Exception as e:
         print(f"⚠️ Could not load translation cache: {e}")
 
-# --- Save to cache ---
+# --- Save to cache (written in the background by the persistence writer) ---
+persistence.register(
+    "translations", lambda: TRANSLATION_FILE, lambda: _translation_cache, _translation_lock,
+    ensure_ascii=False, indent=2
+)
+
 def save_translation_cache():
-    os.makedirs(os.path.dirname(TRANSLATION_FILE), exist_ok=True)
-    with open(TRANSLATION_FILE, "w", encoding="utf-8") as f:
-        json.dump(_translation_cache, f, ensure_ascii=False, indent=2)
+    persistence.mark_dirty("translations")
 
 # --- Translate Arabic to English using AI (cached) ---
 def translate_to_english(product_name):
@@ -39,26 +47,40 @@ Return ONLY the translated English name, no explanation.
 """
 
     try:
-        response = client.chat.completions.create(
-            model=AppConstants.OPENAI_MODEL,
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0.2,
-            max_tokens=50
-        )
-        translation = response.choices[0].message.content.strip()
-        _translation_cache[product_name] = translation
+        translation = llm_cache.cached_call(prompt, _ask_translation)
+        with _translation_lock:
+            _translation_cache[product_name] = translation
         save_translation_cache()
         return translation
     except Exception as e:
         print(f"⚠️ Translation failed: {e}")
         return product_name  # fallback
 
-# --- Simulate forecast if AI fails ---
+def _ask_translation(prompt):
+    response = get_openai_client().chat.completions.create(
+        model=AppConstants.OPENAI_MODEL,
+        messages=[{"role": "user", "content": prompt}],
+        temperature=0.2,
+        max_tokens=50
+    )
+    return response.choices[0].message.content.strip()
+
+# --- Yearly past/future prices: local forecast engine first, AI for products without monthly data ---
 def generate_forecast_from_openai(product_name, country, past_years, future_years):
-    current_year = datetime.datetime.now().year
+    current_year = datetime.now().year
+
+    engine = get_forecast_engine()
+    if engine.has_product(product_name):
+        forecast = engine.yearly_forecast(product_name, current_year, past_years, future_years)
+        if forecast and forecast["future_prices"]:
+            return forecast
+
     prompt = f"""
 You are an expert in Saudi construction pricing.
 
+Product: "{product_name}"
+Country: {country}
+
 Estimate:
 - Past {past_years} years
 - Future {future_years} years
@@ -80,7 +102,7 @@ Respond ONLY JSON:
 """
 
     for _ in range(3):
-        reply = ask_ai(prompt)
+        reply = ask_ai(prompt, accept=has_json_object)
         if reply:
             match = re.search(r'\{.*\}', reply, re.DOTALL)
             if match:
@@ -91,8 +113,23 @@ Respond ONLY JSON:
         time.sleep(1)
 
     # 🔁 Fallback
-    return simulate_forecast(base_price=100)  # you can pass a better base if available
+    return simulate_forecast(base_price=100, past_years=past_years, future_years=future_years)
 
+# --- Simulate forecast if AI fails ---
+def simulate_forecast(base_price, past_years=AppConstants.PAST_YEARS, future_years=AppConstants.FUTURE_YEARS,
+                      yearly_change=0.03):
+    current_year = datetime.now().year
+    return {
+        "past_prices": {
+            str(current_year - k): round(base_price * (1 - yearly_change * k), 2)
+            for k in range(past_years, 0, -1)
+        },
+        "future_prices": {
+            str(current_year + k): round(base_price * (1 + yearly_change * k), 2)
+            for k in range(1, future_years + 1)
+        },
+        "source": "Simulated"
+    }
 
 
 def fallback_today_price(min_price, max_price, median, average):
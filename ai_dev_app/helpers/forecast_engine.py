@@ -0,0 +1,259 @@
+import threading
+import numpy as np
+from ai_dev_app.constants.app_constants import AppConstants
+from ai_dev_app.helpers.catalog import get_catalog, product_key, add_catalog_listener
+
+# Local forecasts for every product carrying a monthly_prices series.
+# All series are fitted together as one (products × months) matrix with
+# damped-trend exponential smoothing (Holt), plus additive month-of-year
+# seasonality once a series spans two full years. Forecasts for the whole
+# horizon are precomputed at fit time, so lookups are an index and a slice.
+
+ALPHAS = np.array([0.2, 0.4, 0.6, 0.8])
+BETAS = np.array([0.0, 0.1, 0.3])
+DAMPING = 0.9
+MIN_SEASONAL_MONTHS = 24
+
+_engines = {}
+_engines_lock = threading.Lock()
+
+
+def _month_index(month_key):
+    year, month = month_key.split("-")[:2]
+    return int(year) * 12 + int(month) - 1
+
+
+def _month_key(index):
+    return f"{index // 12:04d}-{index % 12 + 1:02d}"
+
+
+def _smooth(Y, alpha, beta, phi):
+    """
+    Runs damped Holt smoothing over all rows at once, skipping NaN months.
+
+    Returns:
+        Tuple of (level, trend, sum of squared one-step errors, error count), one entry per row
+    """
+    n_rows, n_months = Y.shape
+    level = np.full(n_rows, np.nan)
+    trend = np.zeros(n_rows)
+    sse = np.zeros(n_rows)
+    count = np.zeros(n_rows)
+
+    for t in range(n_months):
+        y = Y[:, t]
+        observed = ~np.isnan(y)
+        started = ~np.isnan(level)
+
+        first = observed & ~started
+        level[first] = y[first]
+
+        update = observed & started
+        forecast = level + phi * trend
+        error = np.where(update, y - forecast, 0.0)
+        sse += error ** 2
+        count += update
+
+        new_level = np.where(update, forecast + alpha * error, level)
+        new_trend = np.where(update, phi * trend + beta * (new_level - level), trend)
+        # Months without an observation carry the damped trend forward
+        carry = started & ~observed
+        new_level = np.where(carry, level + phi * trend, new_level)
+        new_trend = np.where(carry, phi * trend, new_trend)
+
+        level, trend = new_level, new_trend
+
+    return level, trend, sse, count
+
+
+class ForecastEngine:
+    def __init__(self, catalog_version, horizon=None):
+        self.catalog_version = catalog_version
+        self.horizon = horizon or AppConstants.FORECAST_HORIZON_MONTHS
+        self.rows = {}
+        self.first_month = 0
+        self.last_month = 0
+        self.observed = np.empty((0, 0))
+        self.forecasts = np.empty((0, 0))
+        self.seasonal = np.empty((0, 12))
+        self.residual_std = np.empty(0)
+        self.level = np.empty(0)
+        self._yearly = {}
+
+    def fit(self, products):
+        """Fits every product with a monthly_prices series in one batch."""
+        series = [(p.get("name", ""), p["monthly_prices"]) for p in products if p.get("monthly_prices")]
+        if not series:
+            return self
+
+        months = {_month_index(m) for _, prices in series for m in prices}
+        self.first_month, self.last_month = min(months), max(months)
+        n_months = self.last_month - self.first_month + 1
+
+        Y = np.full((len(series), n_months), np.nan)
+        for row, (name, prices) in enumerate(series):
+            self.rows[product_key(name)] = row
+            for month, price in prices.items():
+                Y[row, _month_index(month) - self.first_month] = float(price)
+        self.observed = Y
+
+        self.seasonal = self._fit_seasonal(Y)
+        deseasonalized = Y - self.seasonal[:, self._calendar_months(0, n_months)]
+
+        # Grid-search alpha/beta per row, vectorized across rows
+        best = None
+        for alpha in ALPHAS:
+            for beta in BETAS:
+                level, trend, sse, count = _smooth(deseasonalized, alpha, beta, DAMPING)
+                mse = np.where(count > 0, sse / np.maximum(count, 1), 0.0)
+                if best is None:
+                    best = [level, trend, mse]
+                    continue
+                better = mse < best[2]
+                best[0] = np.where(better, level, best[0])
+                best[1] = np.where(better, trend, best[1])
+                best[2] = np.where(better, mse, best[2])
+
+        level, trend, mse = best
+        self.level = level
+        self.residual_std = np.sqrt(mse)
+
+        steps = np.arange(1, self.horizon + 1)
+        damped = np.cumsum(DAMPING ** steps)
+        future_months = self._calendar_months(n_months, n_months + self.horizon)
+        self.forecasts = level[:, None] + trend[:, None] * damped[None, :] + self.seasonal[:, future_months]
+        return self
+
+    def _calendar_months(self, start, stop):
+        return (np.arange(start, stop) + self.first_month) % 12
+
+    def _fit_seasonal(self, Y):
+        seasonal = np.zeros((Y.shape[0], 12))
+        observed_months = (~np.isnan(Y)).sum(axis=1)
+        seasonal_rows = observed_months >= MIN_SEASONAL_MONTHS
+        if not seasonal_rows.any():
+            return seasonal
+
+        calendar = self._calendar_months(0, Y.shape[1])
+        row_mean = np.nanmean(Y[seasonal_rows], axis=1, keepdims=True)
+        deviations = Y[seasonal_rows] - row_mean
+        for month in range(12):
+            columns = deviations[:, calendar == month]
+            if columns.size:
+                seasonal[seasonal_rows, month] = np.nan_to_num(np.nanmean(columns, axis=1))
+        seasonal[seasonal_rows] -= seasonal[seasonal_rows].mean(axis=1, keepdims=True)
+        return seasonal
+
+    def has_product(self, name):
+        return product_key(name) in self.rows
+
+    def forecast(self, name, months):
+        """Returns [("YYYY-MM", price), ...] for the next `months` months after the series ends."""
+        row = self.rows.get(product_key(name))
+        if row is None:
+            return []
+        months = min(months, self.horizon)
+        values = self.forecasts[row, :months]
+        return [(_month_key(self.last_month + 1 + i), round(float(v), 2)) for i, v in enumerate(values)]
+
+    def price_at(self, name, month_key):
+        """Observed price for a month inside the series, forecast after it, None for gaps or unknown months."""
+        row = self.rows.get(product_key(name))
+        if row is None:
+            return None
+        index = _month_index(month_key)
+        if index < self.first_month:
+            return None
+        if index <= self.last_month:
+            value = self.observed[row, index - self.first_month]
+            return None if np.isnan(value) else float(value)
+        step = index - self.last_month - 1
+        if step >= self.horizon:
+            return None
+        return float(self.forecasts[row, step])
+
+    def relative_uncertainty(self, name):
+        """One-step residual std as a share of the current level (None if not fitted)."""
+        row = self.rows.get(product_key(name))
+        if row is None or not self.level[row]:
+            return None
+        return float(self.residual_std[row] / abs(self.level[row]))
+
+    def observed_months(self, name):
+        """Number of months with an observed price (0 if not fitted)."""
+        row = self.rows.get(product_key(name))
+        if row is None:
+            return 0
+        return int((~np.isnan(self.observed[row])).sum())
+
+    def last_observed_month(self, name):
+        """Month index of the product's last observed price (None if not fitted or never observed)."""
+        row = self.rows.get(product_key(name))
+        if row is None:
+            return None
+        observed = np.flatnonzero(~np.isnan(self.observed[row]))
+        return int(self.first_month + observed[-1]) if observed.size else None
+
+    def yearly_forecast(self, name, current_year, past_years, future_years):
+        """
+        Yearly mean prices in the shape generate_forecast_from_openai returns.
+
+        Past years use observed months (filled with forecasts where the year is
+        only partly observed); years before the series starts are left out.
+        """
+        row = self.rows.get(product_key(name))
+        if row is None:
+            return None
+        cache_key = (row, current_year, past_years, future_years)
+        if cache_key in self._yearly:
+            return self._yearly[cache_key]
+
+        def year_mean(year):
+            values = [self.price_at(name, f"{year:04d}-{month:02d}") for month in range(1, 13)]
+            values = [v for v in values if v is not None]
+            return round(sum(values) / len(values), 2) if values else None
+
+        past = {str(y): year_mean(y) for y in range(current_year - past_years, current_year)}
+        future = {str(y): year_mean(y) for y in range(current_year + 1, current_year + future_years + 1)}
+        result = {
+            "past_prices": {y: v for y, v in past.items() if v is not None},
+            "future_prices": {y: v for y, v in future.items() if v is not None},
+            "source": "LocalForecast"
+        }
+        self._yearly[cache_key] = result
+        return result
+
+
+def get_forecast_engine(catalog=None):
+    """Engine fitted on the given (default: current) catalog, cached per catalog version."""
+    catalog = catalog or get_catalog()
+    engine = _engines.get(catalog.version)
+    if engine is None:
+        with _engines_lock:
+            engine = _engines.get(catalog.version)
+            if engine is None:
+                engine = ForecastEngine(catalog.version).fit(p for _, p in catalog.iter_products())
+                # Only the current catalog version is worth keeping
+                _engines.clear()
+                _engines[catalog.version] = engine
+    return engine
+
+
+def _on_catalog_change(old, new, diff):
+    # Refit only if some product's monthly series changed; otherwise the fit carries over
+    engine = _engines.get(old.version)
+    if engine is None:
+        return
+    refit = any(
+        (old.products_by_name.get(key) or {}).get("monthly_prices")
+        != (new.products_by_name.get(key) or {}).get("monthly_prices")
+        for key in diff.touched
+    )
+    with _engines_lock:
+        _engines.clear()
+        if not refit:
+            engine.catalog_version = new.version
+            _engines[new.version] = engine
+
+
+add_catalog_listener(_on_catalog_change)
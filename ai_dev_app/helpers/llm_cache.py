@@ -0,0 +1,171 @@
+import os
+import time
+import sqlite3
+import hashlib
+import threading
+from ai_dev_app.constants.app_constants import AppConstants
+from ai_dev_app.helpers import metrics
+
+# Persistent prompt-hash -> reply cache in front of every LLM call (pricing,
+# forecasts, translations). Prompts are canonicalized before hashing, so only
+# prompts that ask the same question share a reply. Stored in SQLite so the
+# Streamlit app, the API and the CLI can share it without rewriting a file
+# per insert. Entries expire after LLM_CACHE_TTL_HOURS; beyond
+# LLM_CACHE_MAX_ENTRIES the oldest are evicted.
+
+PRUNE_EVERY = 100
+
+_enabled = AppConstants.LLM_CACHE_ENABLED
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def canonical_prompt(prompt):
+    """Prompt with per-line indentation and blank lines removed."""
+    return "\n".join(line.strip() for line in prompt.strip().splitlines() if line.strip())
+
+
+def prompt_hash(prompt):
+    return hashlib.sha256(canonical_prompt(prompt).encode("utf-8")).hexdigest()
+
+
+class LLMResponseCache:
+    def __init__(self, path, ttl_seconds, max_entries):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._puts = 0
+
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._db = sqlite3.connect(path, timeout=5, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, reply TEXT NOT NULL, created_at REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS responses_created ON responses (created_at)")
+        self._db.commit()
+
+    def get(self, prompt):
+        key = prompt_hash(prompt)
+        with self._lock:
+            row = self._db.execute(
+                "SELECT reply FROM responses WHERE key = ? AND created_at > ?",
+                (key, time.time() - self.ttl_seconds)
+            ).fetchone()
+        return row[0] if row else None
+
+    def put(self, prompt, reply):
+        key = prompt_hash(prompt)
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses (key, reply, created_at) VALUES (?, ?, ?)",
+                (key, reply, time.time())
+            )
+            self._puts += 1
+            if self._puts % PRUNE_EVERY == 0:
+                self._prune()
+            self._db.commit()
+
+    def discard(self, prompt):
+        with self._lock:
+            self._db.execute("DELETE FROM responses WHERE key = ?", (prompt_hash(prompt),))
+            self._db.commit()
+
+    def _prune(self):
+        self._db.execute("DELETE FROM responses WHERE created_at <= ?", (time.time() - self.ttl_seconds,))
+        self._db.execute(
+            "DELETE FROM responses WHERE key IN ("
+            "SELECT key FROM responses ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,)
+        )
+
+    def size(self):
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+def enable():
+    global _enabled
+    _enabled = True
+
+
+def disable():
+    global _enabled
+    _enabled = False
+
+
+def is_enabled():
+    return _enabled
+
+
+def get_llm_cache():
+    """Process-wide cache on AppConstants.LLM_CACHE_FILE, or None while disabled."""
+    global _cache
+    if not _enabled:
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                try:
+                    _cache = LLMResponseCache(
+                        AppConstants.LLM_CACHE_FILE,
+                        AppConstants.LLM_CACHE_TTL_HOURS * 3600,
+                        AppConstants.LLM_CACHE_MAX_ENTRIES
+                    )
+                except sqlite3.Error as e:
+                    print(f"⚠️ LLM response cache unavailable: {e}")
+                    disable()
+                    return None
+    return _cache
+
+
+def lookup(prompt):
+    cache = get_llm_cache()
+    if cache is None:
+        return None
+    try:
+        reply = cache.get(prompt)
+    except sqlite3.Error as e:
+        print(f"⚠️ LLM cache read failed: {e}")
+        return None
+    metrics.inc("llm_cache_total", outcome="hit" if reply is not None else "miss")
+    return reply
+
+
+def store(prompt, reply):
+    cache = get_llm_cache()
+    if cache is None or not reply:
+        return
+    try:
+        cache.put(prompt, reply)
+    except sqlite3.Error as e:
+        print(f"⚠️ LLM cache write failed: {e}")
+
+
+def cached_call(prompt, ask, accept=bool):
+    """
+    Returns the cached reply for the prompt, or calls ask(prompt) and caches its reply.
+
+    Args:
+        prompt: Prompt text, hashed after canonical_prompt()
+        ask: Callable sending the prompt to an LLM and returning the reply (or None)
+        accept: Predicate a reply must pass to be cached, e.g. "contains a JSON object"
+
+    Returns:
+        Reply text or None
+    """
+    reply = lookup(prompt)
+    if reply is not None:
+        return reply
+    reply = ask(prompt)
+    if reply and accept(reply):
+        store(prompt, reply)
+    return reply
@@ -0,0 +1,255 @@
+import json
+import time
+import logging
+import threading
+from bisect import bisect_left
+from functools import wraps
+from ai_dev_app.constants.app_constants import AppConstants
+
+# Process-wide counters and latency histograms for the pricing path.
+# Every entry point returns immediately while metrics are disabled, so the
+# instrumentation can stay on the hot paths permanently.
+
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_enabled = AppConstants.METRICS_ENABLED
+_json_logs = AppConstants.METRICS_JSON_LOGS
+_lock = threading.Lock()
+_counters = {}
+_histograms = {}
+_help = {}
+
+_logger = logging.getLogger("frjar.metrics")
+
+
+class _Histogram:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class _Timer:
+    __slots__ = ("name", "labels", "started")
+
+    def __init__(self, name, labels):
+        self.name = name
+        self.labels = labels
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        observe(self.name, time.perf_counter() - self.started, **self.labels)
+        return False
+
+
+class _NoopTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NOOP_TIMER = _NoopTimer()
+
+
+def _ensure_log_handler():
+    if _logger.handlers:
+        return
+    handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    _logger.addHandler(handler)
+    _logger.setLevel(logging.INFO)
+    _logger.propagate = False
+
+
+def enable(json_logs=None):
+    global _enabled, _json_logs
+    _enabled = True
+    if json_logs is not None:
+        _json_logs = json_logs
+    if _json_logs:
+        _ensure_log_handler()
+
+
+def disable():
+    global _enabled
+    _enabled = False
+
+
+def is_enabled():
+    return _enabled
+
+
+def describe(name, help_text):
+    _help[name] = help_text
+
+
+def _key(name, labels):
+    return name, tuple(sorted(labels.items()))
+
+
+def inc(name, value=1, **labels):
+    if not _enabled:
+        return
+    key = _key(name, labels)
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+
+def observe(name, seconds, **labels):
+    if not _enabled:
+        return
+    key = _key(name, labels)
+    with _lock:
+        histogram = _histograms.get(key)
+        if histogram is None:
+            histogram = _histograms[key] = _Histogram(DEFAULT_BUCKETS)
+        histogram.observe(seconds)
+
+
+def timer(name, **labels):
+    """Context manager recording the block's duration into a histogram."""
+    if not _enabled:
+        return _NOOP_TIMER
+    return _Timer(name, labels)
+
+
+def timed(name, **labels):
+    """Decorator form of timer()."""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            with _Timer(name, labels):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def log_event(event, **fields):
+    """Emits one structured JSON log line when metrics and JSON logs are enabled."""
+    if not (_enabled and _json_logs):
+        return
+    _logger.info(json.dumps({"ts": round(time.time(), 3), "event": event, **fields}, default=str))
+
+
+def reset():
+    with _lock:
+        _counters.clear()
+        _histograms.clear()
+
+
+def snapshot():
+    """Counters and histogram summaries as plain JSON-serialisable data."""
+    with _lock:
+        counters = [
+            {"name": name, "labels": dict(labels), "value": value}
+            for (name, labels), value in sorted(_counters.items())
+        ]
+        histograms = [
+            {
+                "name": name,
+                "labels": dict(labels),
+                "count": h.count,
+                "sum": round(h.sum, 6),
+                "avg": round(h.sum / h.count, 6) if h.count else 0.0,
+                "p50": _quantile(h, 0.5),
+                "p95": _quantile(h, 0.95),
+                "p99": _quantile(h, 0.99)
+            }
+            for (name, labels), h in sorted(_histograms.items())
+        ]
+    return {"enabled": _enabled, "counters": counters, "histograms": histograms}
+
+
+def _quantile(histogram, q):
+    # Upper bound of the bucket holding the q-th observation
+    if not histogram.count:
+        return 0.0
+    target = q * histogram.count
+    seen = 0
+    for bound, count in zip(histogram.buckets, histogram.counts):
+        seen += count
+        if seen >= target:
+            return bound
+    return float("inf")
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels, extra=None):
+    items = list(labels) + (extra or [])
+    if not items:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in items) + "}"
+
+
+def render_prometheus():
+    """All metrics in the Prometheus text exposition format (version 0.0.4)."""
+    lines = []
+    with _lock:
+        counters = sorted(_counters.items())
+        histograms = sorted(_histograms.items())
+
+        seen = set()
+        for (name, labels), value in counters:
+            if name not in seen:
+                seen.add(name)
+                if name in _help:
+                    lines.append(f"# HELP {name} {_help[name]}")
+                lines.append(f"# TYPE {name} counter")
+            lines.append(f"{name}{_format_labels(labels)} {value}")
+
+        for (name, labels), h in histograms:
+            if name not in seen:
+                seen.add(name)
+                if name in _help:
+                    lines.append(f"# HELP {name} {_help[name]}")
+                lines.append(f"# TYPE {name} histogram")
+            cumulative = 0
+            for bound, count in zip(h.buckets, h.counts):
+                cumulative += count
+                lines.append(f"{name}_bucket{_format_labels(labels, [('le', bound)])} {cumulative}")
+            lines.append(f"{name}_bucket{_format_labels(labels, [('le', '+Inf')])} {h.count}")
+            lines.append(f"{name}_sum{_format_labels(labels)} {h.sum}")
+            lines.append(f"{name}_count{_format_labels(labels)} {h.count}")
+    return "\n".join(lines) + "\n"
+
+
+if _enabled and _json_logs:
+    _ensure_log_handler()
+
+describe("llm_requests_total", "LLM provider calls by provider and outcome")
+describe("llm_request_seconds", "LLM provider call latency")
+describe("llm_rate_limited_total", "Provider calls skipped, queued, rejected or answered 429 by the rate limiter")
+describe("llm_rate_limit_wait_seconds", "Time spent queued for provider budget")
+describe("llm_cache_total", "LLM response cache lookups by outcome")
+describe("price_lookups_total", "Price lookups by answering tier")
+describe("price_lookup_seconds", "End-to-end price lookup latency by tier")
+describe("price_parse_failures_total", "AI replies without a usable price")
+describe("persist_flush_seconds", "Background JSON document write time")
+describe("persist_records_total", "Records persisted by the background writer")
+describe("catalog_load_seconds", "Catalog file parse time")
+describe("catalog_reloads_total", "Catalog versions swapped in by hot reload")
+describe("catalog_reload_seconds", "Catalog reload time (parse, diff, incremental rebuild)")
+describe("model_load_seconds", "Local model unpickle time")
+describe("render_seconds", "Streamlit render stage latency")
+describe("http_request_seconds", "Pricing API request latency by route")
+describe("http_requests_total", "Pricing API requests by route and status")
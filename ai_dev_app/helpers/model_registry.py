@@ -0,0 +1,204 @@
+import os
+import re
+import pickle
+import threading
+from datetime import datetime
+import numpy as np
+from ai_dev_app.constants.app_constants import AppConstants
+from ai_dev_app.helpers import metrics
+
+# Versioned local price models. The trainer (ModelTrainer/train_price_model.py,
+# in its own process) writes ai_price_model-<version>.pkl with an atomic
+# rename and then repoints ai_price_model.current at it. Serving processes
+# read the model through get_local_model(): a single global tuple that a
+# watcher thread replaces once the new version is loaded and warmed, so
+# requests never take a lock and never see a half-loaded model.
+
+MODEL_NAME = "ai_price_model"
+LEGACY_MODEL_FILE = f"{MODEL_NAME}.pkl"
+
+_state = (None, None)   # (version, model); replaced whole, never mutated
+_load_lock = threading.Lock()
+_loaded = False
+_watcher = None
+_signature = None
+
+
+def pointer_path(directory=None):
+    return os.path.join(directory or AppConstants.MODEL_DIR, f"{MODEL_NAME}.current")
+
+
+def _write_atomic(path, data):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def publish_model(model, directory=None, keep=None):
+    """
+    Saves a trained model as a new version and makes it current.
+
+    The model file is complete on disk before the pointer names it, so a
+    reader never loads a partial file.
+
+    Returns:
+        Version string
+    """
+    directory = directory or AppConstants.MODEL_DIR
+    os.makedirs(directory, exist_ok=True)
+    version = datetime.utcnow().strftime("%Y%m%d%H%M%S%f")
+    filename = f"{MODEL_NAME}-{version}.pkl"
+    _write_atomic(os.path.join(directory, filename), pickle.dumps(model))
+    _write_atomic(pointer_path(directory), filename.encode("utf-8"))
+    prune_versions(directory, keep or AppConstants.MODEL_KEEP_VERSIONS)
+    return version
+
+
+def prune_versions(directory, keep):
+    pattern = re.compile(rf"^{MODEL_NAME}-(\d+)\.pkl$")
+    versions = sorted(name for name in os.listdir(directory) if pattern.match(name))
+    for name in versions[:-keep] if keep > 0 else []:
+        try:
+            os.remove(os.path.join(directory, name))
+        except OSError:
+            pass
+
+
+def current_model_file(directory=None):
+    """(version, path) of the current model: the published pointer, else the legacy ai_price_model.pkl."""
+    directory = directory or AppConstants.MODEL_DIR
+    try:
+        with open(pointer_path(directory), "r", encoding="utf-8") as f:
+            filename = f.read().strip()
+        match = re.match(rf"^{MODEL_NAME}-(\d+)\.pkl$", filename)
+        if match and os.path.exists(os.path.join(directory, filename)):
+            return match.group(1), os.path.join(directory, filename)
+    except OSError:
+        pass
+    legacy = os.path.join(directory, LEGACY_MODEL_FILE)
+    if os.path.exists(legacy):
+        return "legacy", legacy
+    return None, None
+
+
+def _file_signature(directory=None):
+    signature = []
+    for path in (pointer_path(directory), os.path.join(directory or AppConstants.MODEL_DIR, LEGACY_MODEL_FILE)):
+        try:
+            stat = os.stat(path)
+            signature.append((stat.st_mtime_ns, stat.st_size))
+        except OSError:
+            signature.append(None)
+    return tuple(signature)
+
+
+def load_model_file(path):
+    with open(path, "rb") as f, metrics.timer("model_load_seconds"):
+        model = pickle.load(f)
+    # One prediction builds the booster's internal state before requests use it
+    n_features = getattr(model, "n_features_in_", None)
+    if n_features:
+        model.predict(np.zeros((1, n_features)))
+    return model
+
+
+def get_local_model():
+    """The current local model, or None. Lock-free: one read of a global tuple."""
+    if not _loaded:
+        load_current_model()
+    return _state[1]
+
+
+def get_model_version():
+    if not _loaded:
+        load_current_model()
+    return _state[0]
+
+
+def set_local_model(model, version="manual"):
+    """Swaps in a model object directly (benchmarks, tests, notebooks)."""
+    global _state, _loaded
+    _state = (version, model)
+    _loaded = True
+
+
+def load_current_model(directory=None):
+    """Loads the current model file once per process and starts the watcher if MODEL_HOT_RELOAD is on."""
+    global _state, _loaded, _signature
+    with _load_lock:
+        if _loaded:
+            return _state[1]
+        _signature = _file_signature(directory)
+        version, path = current_model_file(directory)
+        if path:
+            try:
+                _state = (version, load_model_file(path))
+            except Exception as e:
+                print(f"⚠️ Could not load local model {path}: {e}")
+        _loaded = True
+    if AppConstants.MODEL_HOT_RELOAD:
+        start_model_watcher(directory)
+    return _state[1]
+
+
+def refresh_model(directory=None):
+    """
+    Loads and swaps in a newly published model version, if there is one.
+
+    Returns:
+        The new version, or None if nothing changed or the new file failed to load
+    """
+    global _state, _signature
+    with _load_lock:
+        signature = _file_signature(directory)
+        if signature == _signature:
+            return None
+        _signature = signature
+        version, path = current_model_file(directory)
+        if path is None or version == _state[0]:
+            return None
+        try:
+            model = load_model_file(path)
+        except Exception as e:
+            # Keep serving the previous version
+            print(f"⚠️ Could not load model version {version}, keeping {_state[0]}: {e}")
+            metrics.inc("model_swaps_total", outcome="failed")
+            return None
+        old_version = _state[0]
+        _state = (version, model)
+
+    metrics.inc("model_swaps_total", outcome="swapped")
+    metrics.log_event("model_swapped", old_version=old_version, new_version=version)
+    print(f"🔄 Local model {old_version} → {version}")
+    return version
+
+
+class ModelWatcher(threading.Thread):
+    """Polls the model pointer and swaps in new versions."""
+
+    def __init__(self, directory, interval):
+        super().__init__(name="model-watcher", daemon=True)
+        self.directory = directory
+        self.interval = interval
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            try:
+                refresh_model(self.directory)
+            except Exception as e:
+                print(f"⚠️ Model refresh failed: {e}")
+
+    def stop(self):
+        self._stop_event.set()
+
+
+def start_model_watcher(directory=None, interval=None):
+    global _watcher
+    if _watcher is None or not _watcher.is_alive():
+        _watcher = ModelWatcher(directory, interval or AppConstants.MODEL_RELOAD_INTERVAL_SECONDS)
+        _watcher.start()
+    return _watcher
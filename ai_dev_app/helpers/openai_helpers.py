@@ -3,49 +3,64 @@ import json
 import time
 import requests
 import random
-import os
-import pickle
+import threading
 import numpy as np
 from datetime import datetime, timedelta, date
+from concurrent.futures import ThreadPoolExecutor
 from openai import OpenAI
 from ai_dev_app.constants.app_constants import AppConstants
+from ai_dev_app.helpers import metrics
+from ai_dev_app.helpers import rate_limiter
+from ai_dev_app.helpers import llm_cache
+from ai_dev_app.helpers import persistence
+from ai_dev_app.helpers import price_router
+from ai_dev_app.helpers.single_flight import SingleFlight
+from ai_dev_app.helpers.pricing_state import PriceCache, PriceHistoryStore, TrainingLog
+from ai_dev_app.helpers.records import PriceSummary
+from ai_dev_app.helpers.model_registry import get_local_model, load_current_model
+from ai_dev_app.helpers.catalog import city_price_bounds, get_catalog, product_key, add_catalog_listener
 from utils.feature_extractor import extract_features
 
-client = OpenAI(api_key=AppConstants.OPENAI_API_KEY)
-_ai_price_cache = {}
+_client = None
+_ai_price_cache = PriceCache()
+_price_flights = SingleFlight()
+_refresh_executor = None
+_pending_refreshes = set()
+_refresh_lock = threading.Lock()
+# Per catalog version: feature vectors by product and summary templates by (product, city)
+_product_features = {}
+_summary_templates = {}
+_memo_version = None
 
-FALLBACK_MODEL_PATH = "models/ai_price_model.pkl"
-if os.path.exists(FALLBACK_MODEL_PATH):
-    with open(FALLBACK_MODEL_PATH, "rb") as f:
-        print("Local Model")
-        _local_model = pickle.load(f)
-else:
-    _local_model = None
+# Versioned and hot-swapped by the registry; read it through get_local_model()
+load_current_model()
 
 PRICE_HISTORY_FILE = "assets/price_history.json"
-if os.path.exists(PRICE_HISTORY_FILE):
-    with open(PRICE_HISTORY_FILE, "r") as f:
-        _daily_price_history = json.load(f)
-else:
-    _daily_price_history = {}
+_daily_price_history = PriceHistoryStore.load(PRICE_HISTORY_FILE)
 
 TRAINING_FILE = "assets/cloud_ai_training.json"
-if os.path.exists(TRAINING_FILE):
-    with open(TRAINING_FILE, "r") as f:
-        try:
-            _training_data = json.load(f)
-            if not isinstance(_training_data, list):
-                _training_data = []
-        except json.JSONDecodeError:
-            print(f"⚠️ Error decoding JSON from {TRAINING_FILE}. Initializing empty training data.")
-            _training_data = []
-else:
-    _training_data = []
+_training_data = TrainingLog.load(TRAINING_FILE)
+
+persistence.register(
+    "price_history", lambda: PRICE_HISTORY_FILE, _daily_price_history.raw, _daily_price_history.lock, indent=2
+)
+persistence.register("training", lambda: TRAINING_FILE, _training_data.raw, _training_data.lock, indent=2)
+
+def get_openai_client():
+    # Created lazily so processes without an OpenAI key can still import this module
+    global _client
+    if _client is None:
+        _client = OpenAI(
+            # The mock server accepts any key, so a missing one is fine there
+            api_key=AppConstants.OPENAI_API_KEY or ("mock" if AppConstants.LLM_BASE_URL else None),
+            base_url=AppConstants.OPENAI_BASE_URL,
+            timeout=AppConstants.LLM_TIMEOUT_SECONDS
+        )
+    return _client
 
 def ask_openai(prompt):
-    print("O Model")
     try:
-        response = client.chat.completions.create(
+        response = get_openai_client().chat.completions.create(
             model=AppConstants.OPENAI_MODEL,
             messages=[{"role": "user", "content": prompt}],
             temperature=0.3,
@@ -53,27 +68,27 @@ def ask_openai(prompt):
         )
         return response.choices[0].message.content.strip()
     except Exception as e:
+        rate_limiter.note_error("openai", e)
         print(f"⚠️ OpenAI error: {e}")
         return None
 
 def ask_gemini(prompt, model="gemini-2.0-flash"):
-    print("G Model")
     try:
-        url = f"https://generativelanguage.googleapis.com/v1beta/models/{model}:generateContent"
+        url = f"{AppConstants.GEMINI_BASE_URL}/v1beta/models/{model}:generateContent"
         headers = {"Content-Type": "application/json"}
         params = {"key": AppConstants.GEMINI_API_KEY}
         data = {"contents": [{"parts": [{"text": prompt}]}]}
-        r = requests.post(url, headers=headers, params=params, json=data)
+        r = requests.post(url, headers=headers, params=params, json=data, timeout=AppConstants.LLM_TIMEOUT_SECONDS)
         r.raise_for_status()
         return r.json()["candidates"][0]["content"]["parts"][0]["text"].strip()
     except Exception as e:
+        rate_limiter.note_error("gemini", e)
         print(f"⚠️ Gemini error: {e}")
         return None
 
 def ask_deepseek(prompt):
-    print("D Model")
     try:
-        url = "https://api.deepseek.com/v1/chat/completions"
+        url = f"{AppConstants.DEEPSEEK_BASE_URL}/chat/completions"
         headers = {
             "Authorization": f"Bearer {AppConstants.DEEPSEEK_API_KEY}",
             "Content-Type": "application/json"
@@ -84,18 +99,17 @@ def ask_deepseek(prompt):
             "temperature": 0.3,
             "max_tokens": 300
         }
-        r = requests.post(url, headers=headers, json=data)
+        r = requests.post(url, headers=headers, json=data, timeout=AppConstants.LLM_TIMEOUT_SECONDS)
         r.raise_for_status()
         return r.json()["choices"][0]["message"]["content"].strip()
     except Exception as e:
+        rate_limiter.note_error("deepseek", e)
         print(f"⚠️ DeepSeek error: {e}")
         return None
 
 def ask_groq(prompt):
-    print("Gr Model")
-
     try:
-        url = "https://api.groq.com/openai/v1/chat/completions"
+        url = f"{AppConstants.GROQ_BASE_URL}/chat/completions"
         headers = {"Authorization": f"Bearer {AppConstants.GROQ_API_KEY}"}
         data = {
             "model": AppConstants.GROQ_MODEL,
@@ -103,74 +117,315 @@ def ask_groq(prompt):
             "temperature": 0.3,
             "max_tokens": 300
         }
-        r = requests.post(url, headers=headers, json=data)
+        r = requests.post(url, headers=headers, json=data, timeout=AppConstants.LLM_TIMEOUT_SECONDS)
         r.raise_for_status()
         return r.json()["choices"][0]["message"]["content"].strip()
     except Exception as e:
+        rate_limiter.note_error("groq", e)
         print(f"⚠️ Groq error: {e}")
         return None
 
-def ask_ai(prompt):
+def provider_name(ai_func):
+    return ai_func.__name__.replace("ask_", "").replace("_async", "")
+
+def _call_provider(ai_func, provider, prompt):
+    started = time.perf_counter()
+    try:
+        reply = ai_func(prompt)
+    except Exception as e:
+        print(f"⚠️ {ai_func.__name__} failed: {e}")
+        reply = None
+    metrics.observe("llm_request_seconds", time.perf_counter() - started, provider=provider)
+    metrics.inc("llm_requests_total", provider=provider, outcome="ok" if reply else "error")
+    return reply.strip() if reply else None
+
+def has_json_object(reply):
+    return re.search(r'\{.*\}', reply, re.DOTALL) is not None
+
+def ask_ai(prompt, accept=bool):
+    """
+    Sends the prompt to the first provider that answers, via the LLM response cache.
+
+    Args:
+        prompt: Prompt text; identical (canonicalized) prompts share one cached reply
+        accept: Predicate a reply must pass to be cached (e.g. has_json_object)
+
+    Returns:
+        Reply text or None if every provider failed
+    """
+    return llm_cache.cached_call(prompt, _ask_providers, accept)
+
+def _ask_providers(prompt):
     ai_models = [ask_gemini, ask_groq,ask_deepseek,ask_openai]  # List of AI functions to try
+    tokens = rate_limiter.estimate_tokens(prompt)
+    throttled = {}
     for ai_func in ai_models:
-        try:
-            reply = ai_func(prompt)
-            if reply:
-                return reply.strip()
-        except Exception as e:
-            print(f"⚠️ {ai_func.__name__} failed: {e}")
+        provider = provider_name(ai_func)
+        # Out of budget: move on to the next provider instead of drawing a 429
+        if not rate_limiter.try_acquire(provider, tokens):
+            throttled[provider] = ai_func
+            continue
+        reply = _call_provider(ai_func, provider, prompt)
+        if reply:
+            return reply
+
+    # Every provider with budget failed; wait briefly for a throttled one to free up
+    while throttled:
+        provider, wait = rate_limiter.reserve_any(list(throttled), tokens)
+        if provider is None:
+            break
+        time.sleep(wait)
+        reply = _call_provider(throttled.pop(provider), provider, prompt)
+        if reply:
+            return reply
     return None
 
+PRICE_TIERS = ["memory", "history", "stale", "local_forecast", "coalesced", "ai", "local_model", "fallback"]
+
+# Day-to-day movement added to an AI price, so the prompt itself can stay deterministic
+PRICE_DAILY_FLUCTUATION_SAR = 1.5
+# In a multi-city reply, a city's price may sit this fraction of its min-max span outside
+# its bounds and still be clamped in; anything further off is treated as a wrong answer
+PRICE_MULTI_CITY_TOLERANCE = 0.5
+
 def get_today_price_estimate_from_ai(product, city=None):
-    now = datetime.utcnow()
-    today_key = date.today().isoformat()
-    product_name = product.get("name", "unknown")
+    result, _ = estimate_today_price(product, city)
+    return result
 
-    # Base stats
-    base_min = product.get("min_price", 0)
-    base_max = product.get("max_price", 0)
-    average = product.get("average", 0)
-    median = product.get("median", average)
+def get_history_entry(product_name, day_key, city=None):
+    return _daily_price_history.get(product_name, day_key, city)
 
-    # Apply city margins if city is selected
-    if city and city != "National Average":
-        city_margin = product.get("city_margins", {}).get(city, {})
-        min_margin = city_margin.get("min_margin_percent", 0)
-        max_margin = city_margin.get("max_margin_percent", 0)
+def price_cache_key(product_name, city=None):
+    return f"{product_name.strip().lower()}_{city or 'national'}"
 
-        base_min += base_min * min_margin / 100
-        base_max += base_max * max_margin / 100
-        average = (base_min + base_max) / 2
-        median = average
+def estimate_today_price(product, city=None):
+    """
+    Prices a product for today, trying each tier in order: memory cache,
+    today's file history, AI providers, local model and the average fallback.
+
+    Misses the confidence router trusts the local forecast with are priced
+    locally (tier "local_forecast") without an LLM call. Other concurrent
+    misses for the same product and city are coalesced: one caller runs the
+    AI/model/fallback steps and the others wait for it.
+    With PRICE_STALE_WHILE_REVALIDATE on, an expired price younger than
+    PRICE_MAX_STALE_HOURS is returned at once (tier "stale", marked with
+    "stale", "age_seconds" and "cache_source") and refreshed in the background.
+
+    Returns:
+        Tuple of (price summary dict, tier name from PRICE_TIERS)
+    """
+    started = time.perf_counter()
+    result, tier = _estimate_today_price(product, city)
+    metrics.observe("price_lookup_seconds", time.perf_counter() - started, tier=tier)
+    metrics.inc("price_lookups_total", tier=tier)
+    return result, tier
 
-    min_price = base_min
-    max_price = base_max
+def _estimate_today_price(product, city=None):
+    product_name = product.get("name", "unknown")
 
     # Cache key includes city
-    cache_key = f"{product_name.strip().lower()}_{city or 'national'}"
+    cache_key = price_cache_key(product_name, city)
+
+    cached = _lookup_cached_price(cache_key, product_name, city)
+    if cached:
+        return cached
+
+    if AppConstants.PRICE_STALE_WHILE_REVALIDATE:
+        stale = _lookup_stale_price(cache_key, product_name, city)
+        if stale:
+            _schedule_refresh(product, city, cache_key)
+            return stale, "stale"
+
+    routed = price_from_router(product, city, cache_key)
+    if routed:
+        return routed
+
+    if AppConstants.PRICE_ALL_CITIES:
+        # One flight per product prices every city; a city the reply left out is priced on its own below
+        priced, shared = _price_flights.do(all_cities_flight_key(product_name), _price_all_cities, product)
+        found = priced.get(city or "National Average")
+        if found:
+            return found[0], "coalesced" if shared else found[1]
+
+    (result, tier), shared = _price_flights.do(cache_key, _price_on_miss, product, city, cache_key)
+    return result, "coalesced" if shared else tier
+
+def _lookup_cached_price(cache_key, product_name, city=None):
+    now = datetime.utcnow()
+    today_key = date.today().isoformat()
 
     # Step 1: In-memory cache
-    if cache_key in _ai_price_cache:
-        cached_time, cached_data = _ai_price_cache[cache_key]
-        if now - cached_time < timedelta(hours=6):
-            return cached_data
+    entry = _ai_price_cache.get(cache_key)
+    if entry:
+        cached_time, cached_data = entry
+        if now - cached_time < timedelta(hours=AppConstants.PRICE_CACHE_TTL_HOURS):
+            return cached_data, "memory"
 
     # Step 2: File-based history
-    if product_name in _daily_price_history and today_key in _daily_price_history[product_name]:
-        city_key = city or "National Average"
-        if city_key in _daily_price_history[product_name][today_key]:
-            cached_data = _daily_price_history[product_name][today_key][city_key]
-            _ai_price_cache[cache_key] = (now, cached_data)
-            return cached_data
+    cached_data = get_history_entry(product_name, today_key, city)
+    if cached_data:
+        _ai_price_cache.put(cache_key, now, cached_data)
+        return cached_data, "history"
+
+    return None
+
+def get_price_history_index():
+    """(product, city, date) index over the daily price history, kept in sync by save_price_history."""
+    return _daily_price_history.index()
+
+def get_latest_history_entry(product_name, city=None):
+    """Returns (day key, summary) of the most recent history entry for the city, or (None, None)."""
+    latest = get_price_history_index().latest(product_name, city or "National Average", 1)
+    return latest[0] if latest else (None, None)
+
+def _lookup_stale_price(cache_key, product_name, city=None):
+    now = datetime.utcnow()
+    max_age = timedelta(hours=AppConstants.PRICE_MAX_STALE_HOURS)
+
+    entry = _ai_price_cache.get(cache_key)
+    if entry:
+        cached_time, cached_data = entry
+        if now - cached_time < max_age:
+            return _mark_stale(cached_data, now - cached_time, "memory")
+
+    day_key, cached_data = get_latest_history_entry(product_name, city)
+    if cached_data:
+        # History only records the day, so age is counted from its start
+        age = now - datetime.fromisoformat(day_key)
+        if age < max_age:
+            return _mark_stale(cached_data, age, "history")
+
+    return None
+
+def _mark_stale(cached_data, age, source):
+    return {**cached_data, "stale": True, "age_seconds": int(age.total_seconds()), "cache_source": source}
+
+def _schedule_refresh(product, city, cache_key):
+    global _refresh_executor
+    with _refresh_lock:
+        if cache_key in _pending_refreshes:
+            return
+        _pending_refreshes.add(cache_key)
+        if _refresh_executor is None:
+            _refresh_executor = ThreadPoolExecutor(
+                max_workers=AppConstants.PRICE_REFRESH_WORKERS, thread_name_prefix="price-refresh"
+            )
+    _refresh_executor.submit(_refresh_price, product, city, cache_key)
+
+def _refresh_price(product, city, cache_key):
+    try:
+        if not price_from_router(product, city, cache_key):
+            _price_flights.do(cache_key, _price_on_miss, product, city, cache_key)
+    except Exception as e:
+        print(f"⚠️ Background price refresh failed for {cache_key}: {e}")
+    finally:
+        with _refresh_lock:
+            _pending_refreshes.discard(cache_key)
+
+def price_from_router(product, city, cache_key):
+    """Prices a miss from the local forecast when the confidence router allows it; (result, "local_forecast") or None."""
+    routed = price_router.route(product, city)
+    if routed is None:
+        return None
+    price, uncertainty = routed
+    product_name = product.get("name", "unknown")
+    min_price, max_price, _, average = price_bounds(product, city)
+    final_price = adjust_today_price(price, min_price, max_price, average)
+    result = build_price_summary(product, final_price, "LocalForecast", city=city)
+    metrics.log_event("local_price", product=product_name, city=city, uncertainty=round(uncertainty, 4), final=final_price)
+    _store_price(cache_key, product_name, result)
+    return result, "local_forecast"
+
+def _price_on_miss(product, city, cache_key):
+    product_name = product.get("name", "unknown")
+
+    # A flight for this key may have finished between our cache check and this one starting
+    cached = _lookup_cached_price(cache_key, product_name, city)
+    if cached:
+        return cached
+
+    bounds = price_bounds(product, city)
 
     # Step 3: Ask AI
-    today = now.strftime("%A, %d %B %Y")
-    random_hint = round(random.uniform(-1.5, 1.5), 2)
+    reply = ask_ai(build_price_prompt(product_name, city, bounds), accept=has_json_object)
+    priced = price_from_reply(product, city, cache_key, reply, bounds)
+    if priced:
+        return priced
+
+    return price_without_ai(product, city, cache_key, bounds)
+
+def all_cities_flight_key(product_name):
+    return f"{product_name.strip().lower()}_all-cities"
+
+def cities_to_price(product):
+    """Cities in AppConstants.CITIES with no price for today yet, with their (min, max, median, average)."""
+    product_name = product.get("name", "unknown")
+    return {
+        city: price_bounds(product, city)
+        for city in AppConstants.CITIES
+        if not _lookup_cached_price(price_cache_key(product_name, city), product_name, city)
+    }
 
-    prompt = f"""
+def _price_all_cities(product):
+    """
+    Prices every city still missing today with one multi-city prompt.
+
+    Returns:
+        {city: (result, tier)} for the cities priced; empty when at most one city
+        is missing, which the single-city path prices with its own prompt
+    """
+    city_bounds = cities_to_price(product)
+    if len(city_bounds) <= 1:
+        return {}
+
+    reply = ask_ai(build_multi_city_price_prompt(product.get("name", "unknown"), city_bounds), accept=has_json_object)
+    if not reply:
+        return prices_without_ai(product, city_bounds)
+    return prices_from_multi_city_reply(product, reply, city_bounds)
+
+def prices_without_ai(product, city_bounds):
+    """
+    Prices every city of a failed multi-city request with the local model or fallback.
+
+    Providers are down, so waiters for the product's other cities read these
+    cached prices instead of each asking the providers again.
+
+    Returns:
+        {city: (result, tier)}
+    """
+    product_name = product.get("name", "unknown")
+    priced = {}
+    for city, bounds in city_bounds.items():
+        result, tier = price_without_ai(product, city, price_cache_key(product_name, city), bounds)
+        if city == "National Average":
+            # Callers without a city use the bare key
+            _ai_price_cache.put(price_cache_key(product_name), datetime.utcnow(), result)
+        priced[city] = (result, tier)
+    return priced
+
+def price_bounds(product, city=None):
+    """Returns (min, max, median, average) of the product, with the city's margins applied."""
+    return city_price_bounds(product, city)
+
+def price_date_bucket(day=None):
+    """Date as written into pricing prompts, at LLM_PROMPT_DATE_BUCKET granularity."""
+    day = day or datetime.utcnow().date()
+    bucket = AppConstants.LLM_PROMPT_DATE_BUCKET
+    if bucket == "month":
+        return day.strftime("%Y-%m")
+    if bucket == "week":
+        year, week, _ = day.isocalendar()
+        return f"{year}-W{week:02d}"
+    return day.isoformat()
+
+def build_price_prompt(product_name, city, bounds):
+    # Deterministic for a product, city and date bucket, so replies can be cached by prompt
+    min_price, max_price, median, average = bounds
+
+    return f"""
     You are a senior construction pricing analyst in Saudi Arabia.
 
-    📅 Date: {today}
+    📅 Date: {price_date_bucket()}
     📦 Product: "{product_name}"
     📍 City: {city or 'National Average'}
 
@@ -183,53 +438,143 @@ def get_today_price_estimate_from_ai(product, city=None):
     📌 Market Context:
     - Price must be > min_price and < max_price
     - Price must not equal average
-    - Slight fluctuation: ~{random_hint} SAR allowed
 
     🎯 Rules:
     - Today's price must be BETWEEN min and max
     - Use all stats (median, average, volatility, etc.)
     - If average ≈ median → stable market
     - If average ≫ median → skewed by outliers
-    - Add daily fluctuation of ~{random_hint} SAR
     - Reflect Saudi construction market realities
 
     Return JSON only:
     {{ "today_price_sar": 123.45 }}
     """
 
-    reply = ask_ai(prompt)
-    if reply:
-        try:
-            match = re.search(r'\{.*\}', reply, re.DOTALL)
-            print(f" AI Full data : {match.group(0)}" if match else "❌ No valid match found")
-            if match:
-                ai_data = json.loads(match.group(0))
-                raw_price = float(ai_data.get("today_price_sar", 0.0))
-                final_price = adjust_today_price(raw_price, min_price, max_price, average)
+def build_multi_city_price_prompt(product_name, city_bounds):
+    # Deterministic like build_price_prompt; city_bounds maps each city to (min, max, median, average)
+    city_lines = "\n".join(
+        f"    - {city}: Min {min_price:.2f} / Max {max_price:.2f} / Median {median:.2f} / Average {average:.2f}"
+        for city, (min_price, max_price, median, average) in city_bounds.items()
+    )
+    example = ", ".join(f'"{city}": 123.45' for city in city_bounds)
+
+    return f"""
+    You are a senior construction pricing analyst in Saudi Arabia.
 
-                # ✅ Save for training
-                save_training_example(product, final_price, city=city)
+    📅 Date: {price_date_bucket()}
+    📦 Product: "{product_name}"
 
-                result = build_price_summary(product, final_price, "AI", city=city)
-                _ai_price_cache[cache_key] = (now, result)
-                _daily_price_history.setdefault(product_name, {})[today_key] = result
+    📊 12-Year Summary per city (SAR):
+{city_lines}
 
-                with open(PRICE_HISTORY_FILE, "w") as f:
-                    json.dump(_daily_price_history, f, indent=2)
+    🎯 Rules:
+    - Give one price for EVERY city listed
+    - Each city's price must be BETWEEN that city's own min and max
+    - A price must not equal that city's average
+    - Use all stats (median, average, volatility, etc.)
+    - Reflect Saudi construction market realities and differences between cities
 
-                return result
-        except Exception as e:
-            print(f"❌ AI parse failed: {e}")
+    Return JSON only:
+    {{ "today_price_sar": {{ {example} }} }}
+    """
+
+def prices_from_multi_city_reply(product, reply, city_bounds):
+    """
+    Stores each city's price from a multi-city reply, checked against that city's own bounds.
+
+    Returns:
+        {city: (result, "ai")} for every city with a usable price
+    """
+    product_name = product.get("name", "unknown")
+    try:
+        match = re.search(r'\{.*\}', reply or "", re.DOTALL)
+        prices = json.loads(match.group(0)).get("today_price_sar") if match else None
+        if not isinstance(prices, dict):
+            raise ValueError("no per-city prices")
+    except (ValueError, AttributeError) as e:
+        metrics.inc("price_parse_failures_total", reason="no_json")
+        metrics.log_event("ai_price_unparsed", product=product_name, city="all", reply=(reply or "")[:200])
+        print(f"❌ Multi-city AI parse failed: {e}")
+        return {}
+
+    by_name = {str(name).strip().lower(): value for name, value in prices.items()}
+    priced = {}
+    for city, bounds in city_bounds.items():
+        min_price, max_price, median, average = bounds
+        try:
+            raw_price = float(by_name.get(city.lower()))
+        except (TypeError, ValueError):
+            metrics.inc("price_parse_failures_total", reason="missing_city")
+            continue
+        slack = (max_price - min_price) * PRICE_MULTI_CITY_TOLERANCE
+        if raw_price <= 0 or not min_price - slack <= raw_price <= max_price + slack:
+            metrics.inc("price_parse_failures_total", reason="out_of_bounds")
+            metrics.log_event("ai_price_rejected", product=product_name, city=city, raw=raw_price)
+            continue
+
+        fluctuation = random.uniform(-PRICE_DAILY_FLUCTUATION_SAR, PRICE_DAILY_FLUCTUATION_SAR)
+        final_price = adjust_today_price(raw_price + fluctuation, min_price, max_price, average)
+        save_training_example(product, final_price, city=city)
+        result = build_price_summary(product, final_price, "AI", city=city)
+        metrics.log_event("ai_price", product=product_name, city=city, raw=raw_price, final=final_price)
+        _store_price(price_cache_key(product_name, city), product_name, result)
+        if city == "National Average":
+            # Callers without a city use the bare key
+            _ai_price_cache.put(price_cache_key(product_name), datetime.utcnow(), result)
+        priced[city] = (result, "ai")
+
+    metrics.inc("multi_city_prices_total", len(priced))
+    return priced
+
+def _store_price(cache_key, product_name, result):
+    _ai_price_cache.put(cache_key, datetime.utcnow(), result)
+    save_price_history(product_name, date.today().isoformat(), result)
+
+def price_from_reply(product, city, cache_key, reply, bounds):
+    """Turns an AI reply into a stored price summary; (result, "ai") or None if it holds no usable price."""
+    if not reply:
+        return None
+    product_name = product.get("name", "unknown")
+    min_price, max_price, median, average = bounds
+    try:
+        match = re.search(r'\{.*\}', reply, re.DOTALL)
+        if not match:
+            metrics.inc("price_parse_failures_total", reason="no_json")
+            metrics.log_event("ai_price_unparsed", product=product_name, city=city, reply=reply[:200])
+            return None
+        ai_data = json.loads(match.group(0))
+        raw_price = float(ai_data.get("today_price_sar", 0.0))
+        # Daily fluctuation is applied here rather than asked of the model
+        fluctuation = random.uniform(-PRICE_DAILY_FLUCTUATION_SAR, PRICE_DAILY_FLUCTUATION_SAR)
+        final_price = adjust_today_price(raw_price + fluctuation, min_price, max_price, average)
+
+        # ✅ Save for training
+        save_training_example(product, final_price, city=city)
+
+        result = build_price_summary(product, final_price, "AI", city=city)
+        metrics.log_event("ai_price", product=product_name, city=city, raw=raw_price, final=final_price)
+        _store_price(cache_key, product_name, result)
+
+        return result, "ai"
+    except Exception as e:
+        metrics.inc("price_parse_failures_total", reason="invalid")
+        print(f"❌ AI parse failed: {e}")
+        return None
+
+def price_without_ai(product, city, cache_key, bounds):
+    """Local model, then average fallback; returns (result, tier)."""
+    product_name = product.get("name", "unknown")
+    min_price, max_price, median, average = bounds
 
     # Step 4: Local model fallback
-    if _local_model:
+    local_model = get_local_model()
+    if local_model:
         try:
-            features = extract_features(product)
-            print(f" AI Features : {features}")
+            features = product_features(product)
             if len(features) != 31:
                 print(f"⚠️ Feature mismatch: expected 31, got {len(features)}. Skipping local model.")
             else:
-                prediction = _local_model.predict(np.array([features]))[0]
+                prediction = local_model.predict(np.array([features]))[0]
 
                 base_price = (0.25 * min_price) + (0.25 * median) + (0.4 * average) + (0.1 * max_price)
                 adjusted = (prediction + base_price) / 2
@@ -237,28 +582,27 @@ def get_today_price_estimate_from_ai(product, city=None):
                 raw_price = adjusted * (1 + fluctuation)
 
                 final_price = adjust_today_price(raw_price, min_price, max_price, average)
-                result = build_price_summary(product, final_price, "LocalModel")
-
-                _ai_price_cache[cache_key] = (now, result)
-                _daily_price_history.setdefault(product_name, {})[today_key] = result
+                result = build_price_summary(product, final_price, "LocalModel", city=city)
+                _store_price(cache_key, product_name, result)
 
-                with open(PRICE_HISTORY_FILE, "w") as f:
-                    json.dump(_daily_price_history, f, indent=2)
-
-                return result
+                return result, "local_model"
         except Exception as e:
             print(f"⚠️ Local model fallback failed: {e}")
 
     # Step 5: Fallback to average
     fallback_price = average or median or (min_price + max_price) / 2
     final_price = adjust_today_price(fallback_price, min_price, max_price, average)
-    result = build_price_summary(product, final_price, "Fallback")
-    print("Fallback Model")
-    _ai_price_cache[cache_key] = (now, result)
-    _daily_price_history.setdefault(product_name, {})[today_key] = result
-    with open(PRICE_HISTORY_FILE, "w") as f:
-        json.dump(_daily_price_history, f, indent=2)
-    return result
+    result = build_price_summary(product, final_price, "Fallback", city=city)
+    _store_price(cache_key, product_name, result)
+    return result, "fallback"
+
+def save_price_history(product_name, day_key, result):
+    city = result.get("city", "National Average")
+
+    _daily_price_history.put(product_name, day_key, city, result)
+
+    # Written by the background persistence writer, batched with other lookups
+    persistence.mark_dirty("price_history")
 
 def adjust_today_price(price, min_price, max_price, average):
     epsilon = 0.01
@@ -285,23 +629,79 @@ def adjust_today_price(price, min_price, max_price, average):
 
     return round(corrected_price, 2)
 
-def build_price_summary(product, today_price, model_source, city=None):
-    # Base prices
-    base_min = product.get("min_price", 0)
-    base_max = product.get("max_price", 0)
-    average = product.get("average", 0)
-
-    # Apply city margins if provided
-    if city and city != "National Average":
-        city_margin = product.get("city_margins", {}).get(city, {})
-        min_margin = city_margin.get("min_margin_percent", 0)
-        max_margin = city_margin.get("max_margin_percent", 0)
-
-        base_min += base_min * min_margin / 100
-        base_max += base_max * max_margin / 100
-        average = (base_min + base_max) / 2
-
-    features = extract_features(product)
+def _catalog_memo_key(product):
+    """(catalog version, product key) for the loaded catalog's own products, None for any other dict."""
+    global _memo_version
+    catalog = get_catalog()
+    key = product_key(product.get("name", ""))
+    if catalog.products_by_name.get(key) is not product:
+        return None
+    if catalog.version != _memo_version:
+        _product_features.clear()
+        _summary_templates.clear()
+        _memo_version = catalog.version
+    return catalog.version, key
+
+def _on_catalog_change(old, new, diff):
+    global _memo_version
+    touched = diff.touched
+
+    # Memos of untouched products carry over to the new catalog version
+    features = {
+        (new.version, key): value for (version, key), value in list(_product_features.items())
+        if version == old.version and key not in touched
+    }
+    templates = {
+        ((new.version, key), city): value for ((version, key), city), value in list(_summary_templates.items())
+        if version == old.version and key not in touched
+    }
+    _product_features.clear()
+    _product_features.update(features)
+    _summary_templates.clear()
+    _summary_templates.update(templates)
+    _memo_version = new.version
+
+    # Cached prices of changed products may fall outside their new bounds
+    for key in touched:
+        for city in [None] + AppConstants.CITIES:
+            _ai_price_cache.pop(price_cache_key(key, city))
+        product = new.products_by_name.get(key)
+        if product is not None:
+            _reclamp_today_history(product)
+
+def _reclamp_today_history(product):
+    """Rebuilds today's history summaries of a changed product on its new bounds, clamping the price into them."""
+    product_name = product.get("name", "unknown")
+    today_key = date.today().isoformat()
+    updated = 0
+    for city in AppConstants.CITIES:
+        entry = get_history_entry(product_name, today_key, city)
+        if not entry or "today_price" not in entry:
+            continue
+        min_price, max_price, _, _ = city_price_bounds(product, city)
+        price = round(min(max(float(entry["today_price"]), min_price), max_price), 2)
+        summary = build_price_summary(product, price, entry.get("model_source", "AI"), city=city)
+        _daily_price_history.put(product_name, today_key, city, summary)
+        updated += 1
+    if updated:
+        persistence.mark_dirty("price_history", updated)
+
+add_catalog_listener(_on_catalog_change)
+
+def product_features(product):
+    """extract_features(product), memoized per catalog version for catalog products."""
+    memo_key = _catalog_memo_key(product)
+    if memo_key is None:
+        return extract_features(product)
+    features = _product_features.get(memo_key)
+    if features is None:
+        features = _product_features[memo_key] = tuple(extract_features(product))
+    return features
+
+def _summary_template(product, city):
+    # Everything in a summary except today's price and its source
+    base_min, base_max, _, average = city_price_bounds(product, city)
+    features = product_features(product)
 
     def get_feature(index, default=0.0, cast=float):
         try:
@@ -309,39 +709,34 @@ def build_price_summary(product, today_price, model_source, city=None):
         except (IndexError, TypeError, ValueError):
             return default
 
-    return {
-        "today_price": float(today_price),
-        "min_price": float(base_min),
-        "max_price": float(base_max),
-        "average_price": float(average),
-        "volatility": get_feature(8),
-        "symmetry_index": get_feature(9),
-        "monthly_volatility": get_feature(10),
-        "source_score": get_feature(11),
-        "supplier_counts": {
-            "wholesale": get_feature(12, 0, int),
-            "second_layer": get_feature(13, 0, int),
-            "retail": get_feature(14, 0, int)
-        },
-        "model_source": model_source,
-        "city": city or "National Average"
-    }
+    return PriceSummary(
+        float(base_min),
+        float(base_max),
+        float(average),
+        volatility=get_feature(8),
+        symmetry_index=get_feature(9),
+        monthly_volatility=get_feature(10),
+        source_score=get_feature(11),
+        wholesale_count=get_feature(12, 0, int),
+        second_layer_count=get_feature(13, 0, int),
+        retail_count=get_feature(14, 0, int)
+    )
 
-def save_training_example(product, ai_price, city=None):
-    # Base prices
-    base_min = product.get("min_price", 0)
-    base_max = product.get("max_price", 0)
-    average = product.get("average", 0)
+def build_price_summary(product, today_price, model_source, city=None):
+    city = city or "National Average"
+    memo_key = _catalog_memo_key(product)
+    if memo_key is None:
+        template = _summary_template(product, city)
+    else:
+        template = _summary_templates.get((memo_key, city))
+        if template is None:
+            template = _summary_templates[(memo_key, city)] = _summary_template(product, city)
 
-    # Apply city margins if city is selected
-    if city and city != "National Average":
-        city_margin = product.get("city_margins", {}).get(city, {})
-        min_margin = city_margin.get("min_margin_percent", 0)
-        max_margin = city_margin.get("max_margin_percent", 0)
+    return template.to_dict(today_price, model_source, city)
 
-        base_min += base_min * min_margin / 100
-        base_max += base_max * max_margin / 100
-        average = (base_min + base_max) / 2
+def save_training_example(product, ai_price, city=None):
+    # City-adjusted base prices
+    base_min, base_max, _, average = city_price_bounds(product, city)
 
     record = {
         "name": product.get("name"),
@@ -354,8 +749,5 @@ def save_training_example(product, ai_price, city=None):
         "ai_price": round(float(ai_price), 2)
     }
 
-    global _training_data
     _training_data.append(record)
-
-    with open(TRAINING_FILE, "w") as f:
-        json.dump(_training_data, f, indent=2)
+    persistence.mark_dirty("training")
@@ -0,0 +1,140 @@
+import os
+import json
+import time
+import atexit
+import threading
+from ai_dev_app.constants.app_constants import AppConstants
+from ai_dev_app.helpers import metrics
+
+# Write-behind persistence for the JSON files the pricing path keeps in memory
+# (price history, AI training examples, translations). Request threads only
+# update the in-memory data and mark the document dirty; a background thread
+# writes each dirty document once per batch, every PERSIST_FLUSH_INTERVAL_MS
+# or as soon as PERSIST_MAX_PENDING records are waiting. Files are replaced
+# atomically (temp file + fsync + rename) and everything left is flushed at exit.
+
+
+class _Document:
+    __slots__ = ("name", "get_path", "get_data", "lock", "dump_kwargs", "pending", "write_lock")
+
+    def __init__(self, name, get_path, get_data, lock, dump_kwargs):
+        self.name = name
+        self.get_path = get_path
+        self.get_data = get_data
+        self.lock = lock
+        self.dump_kwargs = dump_kwargs
+        self.pending = 0
+        # One writer per file at a time, so snapshots land in the order they were taken
+        self.write_lock = threading.Lock()
+
+
+_documents = {}
+_condition = threading.Condition()
+_writer = None
+_stopping = False
+
+
+def write_json_atomic(path, text):
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def register(name, get_path, get_data, lock, **dump_kwargs):
+    """
+    Registers an in-memory JSON document for write-behind persistence.
+
+    Args:
+        name: Document name used by mark_dirty()/flush()
+        get_path: Callable returning the file path (read at every flush)
+        get_data: Callable returning the live data
+        lock: Lock the owners hold while mutating the data; held while serializing it
+        dump_kwargs: Extra json.dumps arguments (indent, ensure_ascii, ...)
+    """
+    with _condition:
+        _documents[name] = _Document(name, get_path, get_data, lock, dump_kwargs)
+
+
+def mark_dirty(name, records=1):
+    """Schedules the document for the next batch write (written at once if write-behind is off)."""
+    if not AppConstants.PERSIST_WRITE_BEHIND or _stopping:
+        _flush_document(_documents[name], force=True)
+        return
+
+    with _condition:
+        _documents[name].pending += records
+        _ensure_writer()
+        if sum(d.pending for d in _documents.values()) >= AppConstants.PERSIST_MAX_PENDING:
+            _condition.notify()
+
+
+def _ensure_writer():
+    global _writer
+    if _writer is None or not _writer.is_alive():
+        _writer = threading.Thread(target=_run_writer, name="persistence-writer", daemon=True)
+        _writer.start()
+
+
+def _run_writer():
+    interval = AppConstants.PERSIST_FLUSH_INTERVAL_MS / 1000
+    while True:
+        with _condition:
+            _condition.wait(timeout=interval)
+            if _stopping:
+                return
+        flush()
+
+
+def _flush_document(document, force=False):
+    with document.write_lock:
+        with _condition:
+            records = document.pending
+            if not records and not force:
+                return
+            document.pending = 0
+
+        started = time.perf_counter()
+        try:
+            with document.lock:
+                text = json.dumps(document.get_data(), **document.dump_kwargs)
+            write_json_atomic(document.get_path(), text)
+        except Exception as e:
+            print(f"⚠️ Could not write {document.name}: {e}")
+            with _condition:
+                document.pending += records  # retried on the next flush
+            return
+
+    metrics.observe("persist_flush_seconds", time.perf_counter() - started, document=document.name)
+    metrics.inc("persist_records_total", records, document=document.name)
+
+
+def flush(name=None):
+    """Writes dirty documents now (one document if a name is given)."""
+    with _condition:
+        documents = [_documents[name]] if name else list(_documents.values())
+    for document in documents:
+        _flush_document(document)
+
+
+def pending():
+    with _condition:
+        return {name: d.pending for name, d in _documents.items()}
+
+
+def shutdown():
+    """Stops the writer thread and flushes whatever is still pending."""
+    global _stopping
+    with _condition:
+        _stopping = True
+        _condition.notify_all()
+    if _writer is not None:
+        _writer.join(timeout=5)
+    flush()
+
+
+atexit.register(shutdown)
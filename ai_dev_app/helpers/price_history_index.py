@@ -0,0 +1,140 @@
+import threading
+from bisect import bisect_left, bisect_right, insort
+from datetime import date
+from ai_dev_app.helpers.catalog import product_key
+
+# In-memory index over the daily price history, keyed by (product, city) with
+# each series sorted by date. Range scans and latest-N lookups are bisections,
+# so trend queries never rescan or re-parse price_history.json.
+
+PERIODS = ("daily", "weekly", "monthly")
+
+
+def iter_history_entries(history):
+    """Yields (product name, day key, city, summary) for both history layouts."""
+    for product_name, days in history.items():
+        for day_key, entry in days.items():
+            if not isinstance(entry, dict):
+                continue
+            if "today_price" in entry:
+                # Legacy layout: one summary per day carrying its own city
+                yield product_name, day_key, entry.get("city", "National Average"), entry
+            else:
+                for city, summary in entry.items():
+                    if isinstance(summary, dict):
+                        yield product_name, day_key, city, summary
+
+
+def _period_key(day, period):
+    if period == "daily":
+        return day.isoformat()
+    if period == "weekly":
+        year, week, _ = day.isocalendar()
+        return f"{year}-W{week:02d}"
+    return f"{day.year:04d}-{day.month:02d}"
+
+
+class _Series:
+    __slots__ = ("days", "entries")
+
+    def __init__(self):
+        self.days = []
+        self.entries = []
+
+    def put(self, ordinal, summary):
+        i = bisect_left(self.days, ordinal)
+        if i < len(self.days) and self.days[i] == ordinal:
+            self.entries[i] = summary
+            return
+        self.days.insert(i, ordinal)
+        self.entries.insert(i, summary)
+
+
+class PriceHistoryIndex:
+    def __init__(self):
+        self._series = {}
+        self._products = {}
+        self._lock = threading.RLock()
+
+    @classmethod
+    def build(cls, history):
+        index = cls()
+        for product_name, day_key, city, summary in iter_history_entries(history):
+            index.add(product_name, day_key, city, summary)
+        return index
+
+    def add(self, product_name, day_key, city, summary):
+        key = (product_key(product_name), city or "National Average")
+        ordinal = date.fromisoformat(day_key).toordinal()
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = _Series()
+                insort(self._products.setdefault(key[0], []), key[1])
+            series.put(ordinal, summary)
+
+    def cities(self, product_name):
+        with self._lock:
+            return list(self._products.get(product_key(product_name), []))
+
+    def _slice(self, product_name, city, start=None, end=None):
+        series = self._series.get((product_key(product_name), city or "National Average"))
+        if series is None:
+            return [], []
+        lo = bisect_left(series.days, date.fromisoformat(start).toordinal()) if start else 0
+        hi = bisect_right(series.days, date.fromisoformat(end).toordinal()) if end else len(series.days)
+        return series.days[lo:hi], series.entries[lo:hi]
+
+    def range(self, product_name, city=None, start=None, end=None):
+        """Returns [(day key, summary), ...] for start <= day <= end (ISO dates, inclusive, either optional)."""
+        with self._lock:
+            days, entries = self._slice(product_name, city, start, end)
+        return [(date.fromordinal(d).isoformat(), e) for d, e in zip(days, entries)]
+
+    def latest(self, product_name, city=None, n=1):
+        """Returns the n most recent [(day key, summary), ...], newest first."""
+        with self._lock:
+            series = self._series.get((product_key(product_name), city or "National Average"))
+            if series is None or n <= 0:
+                return []
+            days, entries = series.days[-n:], series.entries[-n:]
+        return [(date.fromordinal(d).isoformat(), e) for d, e in zip(reversed(days), reversed(entries))]
+
+    def aggregate(self, product_name, city=None, start=None, end=None, period="daily", field="today_price"):
+        """
+        Mean/min/max of a summary field per day, ISO week or month.
+
+        Returns:
+            List of {"period", "mean", "min", "max", "count"} dicts in date order
+        """
+        if period not in PERIODS:
+            raise ValueError(f"period must be one of {PERIODS}")
+
+        with self._lock:
+            days, entries = self._slice(product_name, city, start, end)
+
+        buckets = []
+        current = None
+        for ordinal, entry in zip(days, entries):
+            value = entry.get(field)
+            if value is None:
+                continue
+            key = _period_key(date.fromordinal(ordinal), period)
+            if current is None or current["period"] != key:
+                current = {"period": key, "sum": 0.0, "min": value, "max": value, "count": 0}
+                buckets.append(current)
+            current["sum"] += value
+            current["count"] += 1
+            current["min"] = min(current["min"], value)
+            current["max"] = max(current["max"], value)
+
+        return [
+            {
+                "period": b["period"],
+                "mean": round(b["sum"] / b["count"], 4),
+                "min": b["min"],
+                "max": b["max"],
+                "count": b["count"]
+            }
+            for b in buckets
+        ]
@@ -0,0 +1,117 @@
+import math
+import threading
+import numpy as np
+from datetime import date
+from ai_dev_app.constants.app_constants import AppConstants
+from ai_dev_app.helpers import metrics
+from ai_dev_app.helpers.catalog import get_catalog, product_key, city_price_bounds
+from ai_dev_app.helpers.forecast_engine import get_forecast_engine, _month_index
+
+# Confidence router in front of the LLM tier. For a product with a monthly
+# price series, the forecast engine's one-step residual error, widened with
+# the number of months since that product's own series ended, estimates how
+# far off a local price would be. Short series fall back to the worst of their own error and
+# their category's median error. At or below PRICE_ROUTER_MAX_UNCERTAINTY the
+# miss is priced locally; anything else (or a product without a series)
+# still goes to the LLMs. Decisions are counted for the savings report.
+
+_memo = {"key": None, "values": {}}
+_memo_lock = threading.Lock()
+_decisions = {"local": 0, "llm": 0}
+_decisions_lock = threading.Lock()
+
+
+def _compute_uncertainties(engine, catalog, month):
+    own = {}
+    for key in engine.rows:
+        relative = engine.relative_uncertainty(key)
+        last_observed = engine.last_observed_month(key)
+        if relative is None or last_observed is None:
+            continue
+        # Forecast error grows with the distance from this series' own last observed month
+        steps = max(1, month - last_observed)
+        own[key] = relative * math.sqrt(steps)
+
+    by_category = {}
+    for key, value in own.items():
+        by_category.setdefault(catalog.category_by_product.get(key, ""), []).append(value)
+    category_error = {category: float(np.median(values)) for category, values in by_category.items()}
+
+    uncertainties = {}
+    for key, value in own.items():
+        if engine.observed_months(key) < AppConstants.PRICE_ROUTER_MIN_MONTHS:
+            value = max(value, category_error.get(catalog.category_by_product.get(key, ""), value))
+        uncertainties[key] = value
+    return uncertainties
+
+
+def uncertainties():
+    """{product key: relative uncertainty of a local price today}, per catalog version and month."""
+    catalog = get_catalog()
+    engine = get_forecast_engine(catalog)
+    month = _month_index(date.today().strftime("%Y-%m"))
+    memo_key = (catalog.version, id(engine), month)
+    if _memo["key"] != memo_key:
+        with _memo_lock:
+            if _memo["key"] != memo_key:
+                values = _compute_uncertainties(engine, catalog, month)
+                _memo["values"], _memo["key"] = values, memo_key
+    return _memo["values"]
+
+
+def local_price(product, city=None):
+    """Local forecast for this month, scaled from the national level to the city's price band; None if unavailable."""
+    engine = get_forecast_engine()
+    national = engine.price_at(product.get("name", ""), date.today().strftime("%Y-%m"))
+    if national is None or national <= 0:
+        return None
+    if city and city != "National Average":
+        national_average = city_price_bounds(product, None)[3]
+        city_average = city_price_bounds(product, city)[3]
+        if national_average:
+            return national * city_average / national_average
+    return national
+
+
+def route(product, city=None):
+    """
+    Decides whether a cache miss can be priced locally.
+
+    Returns:
+        (local price, uncertainty) when the router is on and confident enough, else None
+    """
+    if not AppConstants.PRICE_ROUTER_ENABLED:
+        return None
+    uncertainty = uncertainties().get(product_key(product.get("name", "")))
+    price = None
+    if uncertainty is not None and uncertainty <= AppConstants.PRICE_ROUTER_MAX_UNCERTAINTY:
+        price = local_price(product, city)
+
+    decision = "llm" if price is None else "local"
+    with _decisions_lock:
+        _decisions[decision] += 1
+    metrics.inc("price_router_total", route=decision)
+    if price is None:
+        return None
+    metrics.inc("llm_calls_saved_total")
+    return price, uncertainty
+
+
+def router_stats():
+    """Routing decisions so far and the share of misses that skipped an LLM call; {"enabled": False} while off."""
+    # Off, the router must not fit the forecast engine just to fill /metrics
+    if not AppConstants.PRICE_ROUTER_ENABLED:
+        return {"enabled": False}
+    with _decisions_lock:
+        local, llm = _decisions["local"], _decisions["llm"]
+    total = local + llm
+    return {
+        "enabled": AppConstants.PRICE_ROUTER_ENABLED,
+        "max_uncertainty": AppConstants.PRICE_ROUTER_MAX_UNCERTAINTY,
+        "local": local,
+        "llm": llm,
+        "llm_calls_saved_share": round(local / total, 3) if total else 0.0,
+        "confident_products": sum(
+            1 for value in uncertainties().values() if value <= AppConstants.PRICE_ROUTER_MAX_UNCERTAINTY
+        )
+    }
@@ -0,0 +1,163 @@
+import os
+import json
+import threading
+from ai_dev_app.helpers.price_history_index import PriceHistoryIndex
+
+# Shared pricing state: the in-memory price cache, the daily price history and
+# the AI training log. Streamlit sessions, API workers and CLI threads all go
+# through these classes; each store has its own lock, so cache hits never
+# wait on a history write and serializing one file never blocks the others.
+# Summaries handed out are shared between threads and must be treated as
+# read-only (copy before changing them, as _mark_stale does).
+
+
+class PriceCache:
+    """Today's price summaries by price_cache_key(), stored as immutable (stored_at, summary) tuples."""
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            return self._entries.get(key)
+
+    def put(self, key, stored_at, summary):
+        with self._lock:
+            self._entries[key] = (stored_at, summary)
+
+    def pop(self, key, default=None):
+        with self._lock:
+            return self._entries.pop(key, default)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+
+class PriceHistoryStore:
+    """
+    Daily price history as saved in price_history.json:
+    {product name: {day key: {city: summary}}}, with legacy flat days read as well.
+    """
+
+    def __init__(self, data=None):
+        self._data = data if isinstance(data, dict) else {}
+        self._index = None
+        self.lock = threading.RLock()
+
+    @classmethod
+    def load(cls, path):
+        if not os.path.exists(path):
+            return cls()
+        try:
+            with open(path, "r") as f:
+                return cls(json.load(f))
+        except json.JSONDecodeError:
+            print(f"⚠️ Error decoding JSON from {path}. Starting with an empty price history.")
+            return cls()
+
+    def raw(self):
+        """The underlying dict, for serialization while holding `lock`."""
+        return self._data
+
+    def get(self, product_name, day_key, city=None):
+        city_key = city or "National Average"
+        with self.lock:
+            day_entry = self._data.get(product_name, {}).get(day_key)
+            if not day_entry:
+                return None
+            if city_key in day_entry:
+                return day_entry[city_key]
+            # Older files hold a single summary per day carrying its own "city"
+            if day_entry.get("city") == city_key:
+                return day_entry
+        return None
+
+    def put(self, product_name, day_key, city, summary):
+        with self.lock:
+            days = self._data.setdefault(product_name, {})
+            day_entry = days.get(day_key)
+            if day_entry is None or "today_price" in day_entry:
+                # Upgrade legacy single-summary days to the per-city layout
+                day_entry = days[day_key] = {day_entry["city"]: day_entry} if day_entry else {}
+            day_entry[city] = summary
+            if self._index is not None:
+                self._index.add(product_name, day_key, city, summary)
+
+    def index(self):
+        """(product, city, date) index, built on first use and kept in sync by put()."""
+        if self._index is None:
+            with self.lock:
+                if self._index is None:
+                    self._index = PriceHistoryIndex.build(self._data)
+        return self._index
+
+    def most_priced(self, n):
+        """Names of the n products with the most (day, city) entries, i.e. the most looked-up ones."""
+        with self.lock:
+            counts = {
+                name: sum(1 if "today_price" in day_entry else len(day_entry) for day_entry in days.values())
+                for name, days in self._data.items()
+                if isinstance(days, dict)
+            }
+        return sorted(counts, key=lambda name: (-counts[name], name))[:n]
+
+    def remove_product(self, product_name):
+        with self.lock:
+            removed = self._data.pop(product_name, None)
+            if removed is not None:
+                self._index = None
+            return removed
+
+    def clear(self):
+        with self.lock:
+            self._data.clear()
+            self._index = None
+
+    def __len__(self):
+        return len(self._data)
+
+
+class TrainingLog:
+    """Append-only list of AI-priced examples saved to cloud_ai_training.json."""
+
+    def __init__(self, records=None):
+        self._records = records if isinstance(records, list) else []
+        self.lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path):
+        if not os.path.exists(path):
+            return cls()
+        try:
+            with open(path, "r") as f:
+                return cls(json.load(f))
+        except json.JSONDecodeError:
+            print(f"⚠️ Error decoding JSON from {path}. Initializing empty training data.")
+            return cls()
+
+    def raw(self):
+        """The underlying list, for serialization while holding `lock`."""
+        return self._records
+
+    def append(self, record):
+        with self.lock:
+            self._records.append(record)
+
+    def snapshot(self):
+        with self.lock:
+            return list(self._records)
+
+    def clear(self):
+        with self.lock:
+            self._records.clear()
+
+    def __len__(self):
+        return len(self._records)
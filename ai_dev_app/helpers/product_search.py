@@ -0,0 +1,225 @@
+import re
+import time
+import threading
+import unicodedata
+from ai_dev_app.helpers import metrics
+from ai_dev_app.helpers.catalog import get_catalog
+
+# Fuzzy product search over the catalog for the search box and GET /search.
+# Every product is indexed under its name, its category, its unit and any
+# Arabic aliases (cached translations plus a small glossary of trade terms),
+# as character trigrams of the normalized text. A query is scored against
+# each field by trigram overlap, so typos, missing spaces and Arabic spelling
+# variants still match. The index is rebuilt lazily when
+# the catalog version or the translation cache changes.
+
+MIN_SCORE = 0.3
+
+# Relative weight of a match in each field
+FIELD_WEIGHTS = {"name": 1.0, "alias": 0.9, "category": 0.6, "unit": 0.3}
+
+# English word in a product name -> Arabic terms a customer might type for it
+ARABIC_TERMS = {
+    "aluminum": ["ألمنيوم", "المنيوم"],
+    "block": ["بلك", "بلوك", "طابوق"],
+    "blocks": ["بلك", "بلوك", "طابوق"],
+    "cable": ["كيبل", "كابل"],
+    "cables": ["كيابل", "كابلات"],
+    "cement": ["اسمنت", "أسمنت"],
+    "concrete": ["خرسانة", "خرسانه"],
+    "gypsum": ["جبس"],
+    "marble": ["رخام"],
+    "tiles": ["بلاط"],
+    "iron": ["حديد"],
+    "reinforcing": ["حديد تسليح"],
+    "rebar": ["حديد تسليح"],
+    "steel": ["حديد", "ستيل"],
+    "sand": ["رمل"],
+    "wires": ["أسلاك"],
+    "wire": ["سلك"],
+    "pipes": ["أنابيب", "مواسير"],
+    "glass": ["زجاج"],
+    "wood": ["خشب"],
+    "plywood": ["خشب أبلكاش", "بليوود"],
+    "paint": ["دهان", "بوية"],
+    "insulation": ["عزل"],
+    "copper": ["نحاس"],
+    "doors": ["أبواب"],
+    "windows": ["نوافذ", "شبابيك"],
+    "screws": ["براغي"],
+    "sealant": ["سيليكون"],
+    "stone": ["حجر"],
+    "clay": ["طين", "فخار"],
+    "brick": ["طوب"],
+    "gravel": ["بحص", "حصى"],
+    "white": ["أبيض"],
+    "black": ["أسود"],
+    "red": ["أحمر"],
+}
+
+_ARABIC_DIACRITICS = re.compile("[\u0610-\u061a\u064b-\u065f\u0670\u06d6-\u06ed\u0640]")
+_ARABIC_LETTERS = str.maketrans({
+    "أ": "ا", "إ": "ا", "آ": "ا", "ٱ": "ا",
+    "ى": "ي", "ئ": "ي", "ؤ": "و", "ة": "ه",
+    "×": " x ",
+    **{chr(0x0660 + d): str(d) for d in range(10)},  # Arabic-Indic digits
+    **{chr(0x06f0 + d): str(d) for d in range(10)},  # Eastern Arabic-Indic digits
+})
+_NON_WORD = re.compile(r"[^\w]+")
+_DIGIT_BOUNDARY = re.compile(r"(?<=\d)(?=[^\W\d])|(?<=[^\W\d])(?=\d)")
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def normalize_text(text):
+    """
+    Lowercased search form of a name: Arabic diacritics and tatweel removed,
+    alef/ya/ta-marbuta variants unified, digits split from units ("25mm" -> "25 mm").
+    """
+    text = unicodedata.normalize("NFKC", text or "").lower()
+    text = _ARABIC_DIACRITICS.sub("", text).translate(_ARABIC_LETTERS)
+    text = _DIGIT_BOUNDARY.sub(" ", text)
+    tokens = []
+    for token in _NON_WORD.sub(" ", text).replace("_", " ").split():
+        # Light stemming of the Arabic definite article, so "الاسمنت" finds "اسمنت"
+        if token.startswith("ال") and len(token) > 4:
+            token = token[2:]
+        tokens.append(token)
+    return " ".join(tokens)
+
+
+def trigrams(normalized):
+    """Character trigrams of each space-padded token."""
+    grams = set()
+    for token in normalized.split():
+        padded = f" {token} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def _english_aliases(name, translations):
+    """Arabic names whose cached translation is this product's name."""
+    return [arabic for arabic, english in translations.items() if english and english.strip().lower() == name.lower()]
+
+
+class ProductSearchIndex:
+    """Trigram index over one catalog version."""
+
+    def __init__(self, catalog, translations=None):
+        translations = dict(translations or {})
+        self.version = catalog.version
+        self.translation_count = len(translations)
+        self.products = []
+        self._fields = []     # (product index, field kind, normalized text, trigram count)
+        self._postings = {}   # trigram -> [field ids]
+
+        for category, product in catalog.iter_products():
+            name = product.get("name", "")
+            if not name:
+                continue
+            product_id = len(self.products)
+            self.products.append({
+                "name": name,
+                "category": category.get("name", ""),
+                "unit": product.get("unit") or category.get("unit", "")
+            })
+
+            aliases = set(_english_aliases(name, translations))
+            if name in translations:
+                aliases.add(translations[name])
+            # Glossary terms form one field, so "اسمنت أبيض" matches "White ... Cement" as a whole
+            glossary = dict.fromkeys(term for word in normalize_text(name).split() for term in ARABIC_TERMS.get(word, ()))
+            if glossary:
+                aliases.add(" ".join(glossary))
+
+            self._add_field(product_id, "name", name)
+            self._add_field(product_id, "category", category.get("name", ""))
+            self._add_field(product_id, "unit", self.products[-1]["unit"])
+            for alias in sorted(aliases):
+                self._add_field(product_id, "alias", alias)
+
+    def _add_field(self, product_id, kind, text):
+        normalized = normalize_text(text)
+        grams = trigrams(normalized)
+        if not grams:
+            return
+        field_id = len(self._fields)
+        self._fields.append((product_id, kind, normalized, len(grams)))
+        for gram in grams:
+            self._postings.setdefault(gram, []).append(field_id)
+
+    def search(self, query, limit=10):
+        """
+        Ranks products by their best-matching field.
+
+        Args:
+            query: Free text in English or Arabic
+            limit: Maximum number of results
+
+        Returns:
+            List of {"name", "category", "unit", "score", "matched"} dicts, best first
+        """
+        normalized = normalize_text(query)
+        grams = trigrams(normalized)
+        if not grams:
+            return []
+
+        overlap = {}
+        for gram in grams:
+            for field_id in self._postings.get(gram, ()):
+                overlap[field_id] = overlap.get(field_id, 0) + 1
+
+        best = {}
+        for field_id, shared in overlap.items():
+            product_id, kind, text, size = self._fields[field_id]
+            # Mostly "how much of the query is in this field", with Dice to prefer tighter fields
+            score = 0.7 * shared / len(grams) + 0.3 * (2.0 * shared / (len(grams) + size))
+            if normalized in text:
+                # Exact substring (typed prefix, model number) outranks near misses
+                score = min(1.0, score + 0.25)
+            score *= FIELD_WEIGHTS[kind]
+            if score > best.get(product_id, (0.0, None))[0]:
+                best[product_id] = (score, kind)
+
+        ranked = sorted(
+            ((score, product_id, kind) for product_id, (score, kind) in best.items() if score >= MIN_SCORE),
+            key=lambda item: (-item[0], self.products[item[1]]["name"])
+        )
+        return [
+            {**self.products[product_id], "score": round(score, 3), "matched": kind}
+            for score, product_id, kind in ranked[:limit]
+        ]
+
+    def __len__(self):
+        return len(self.products)
+
+
+def _translations():
+    # Imported here: fallback_helpers pulls in the pricing and forecast modules
+    from ai_dev_app.helpers.fallback_helpers import _translation_cache
+    return _translation_cache
+
+
+def get_search_index():
+    """Index for the current catalog, rebuilt when the catalog or the translation cache changes."""
+    global _index
+    catalog = get_catalog()
+    translations = _translations()
+    index = _index
+    if index is None or index.version != catalog.version or index.translation_count != len(translations):
+        with _index_lock:
+            index = _index
+            if index is None or index.version != catalog.version or index.translation_count != len(translations):
+                started = time.perf_counter()
+                index = _index = ProductSearchIndex(catalog, translations)
+                metrics.observe("search_index_build_seconds", time.perf_counter() - started)
+    return index
+
+
+def search_products(query, limit=10):
+    """Fuzzy search over product names, Arabic aliases, categories and units."""
+    started = time.perf_counter()
+    results = get_search_index().search(query, limit)
+    metrics.observe("product_search_seconds", time.perf_counter() - started)
+    return results
@@ -0,0 +1,102 @@
+import os
+import time
+import random
+import asyncio
+import tempfile
+from ai_dev_app.helpers import openai_helpers
+from ai_dev_app.helpers import async_helpers
+from ai_dev_app.helpers import llm_cache
+from ai_dev_app.helpers.stub_replies import stub_reply
+
+PROVIDER_NAMES = ["ask_gemini", "ask_groq", "ask_deepseek", "ask_openai"]
+
+_original_providers = {}
+_llm_cache_was_enabled = None
+
+
+def make_stub_provider(name, latency=0.0, failure_rate=0.0):
+    """
+    Builds an offline stand-in for one of the ask_* provider functions.
+
+    Args:
+        name: Provider function name, used in log lines
+        latency: Seconds to sleep per call, to mimic a network round trip
+        failure_rate: Probability (0-1) that the call returns None like a failed request
+
+    Returns:
+        Callable with the same signature as the real provider
+    """
+    def stub(prompt, *args, **kwargs):
+        if latency:
+            time.sleep(latency)
+        if failure_rate and random.random() < failure_rate:
+            print(f"⚠️ {name} stub error")
+            return None
+
+        return stub_reply(prompt)
+
+    stub.__name__ = name
+    return stub
+
+
+def make_async_stub_provider(name, latency=0.0, failure_rate=0.0):
+    """Coroutine version of make_stub_provider for the async_helpers providers."""
+    async def stub(prompt, *args, **kwargs):
+        if latency:
+            await asyncio.sleep(latency)
+        if failure_rate and random.random() < failure_rate:
+            print(f"⚠️ {name} stub error")
+            return None
+
+        return stub_reply(prompt)
+
+    stub.__name__ = name
+    return stub
+
+
+def install_provider_stubs(latency=0.0, failure_rate=0.0):
+    """
+    Swaps the real LLM providers in openai_helpers and async_helpers for local stubs.
+
+    The LLM response cache is turned off while stubs are installed: it is keyed
+    by prompt only, so stub replies stored there would later be served as real
+    AI answers.
+    """
+    global _llm_cache_was_enabled
+    if _llm_cache_was_enabled is None:
+        _llm_cache_was_enabled = llm_cache.is_enabled()
+    llm_cache.disable()
+    for name in PROVIDER_NAMES:
+        _original_providers.setdefault((openai_helpers, name), getattr(openai_helpers, name))
+        setattr(openai_helpers, name, make_stub_provider(name, latency, failure_rate))
+
+        async_name = f"{name}_async"
+        _original_providers.setdefault((async_helpers, async_name), getattr(async_helpers, async_name))
+        setattr(async_helpers, async_name, make_async_stub_provider(async_name, latency, failure_rate))
+
+
+def restore_providers():
+    global _llm_cache_was_enabled
+    for (module, name), func in _original_providers.items():
+        setattr(module, name, func)
+    _original_providers.clear()
+    if _llm_cache_was_enabled:
+        llm_cache.enable()
+    _llm_cache_was_enabled = None
+
+
+def redirect_price_writes(directory=None):
+    """
+    Points price history and training writes at a scratch directory, for stubbed runs.
+
+    The loaded history stays readable; flushes write it, plus the stub prices,
+    to the scratch copies so the real assets and the local model's training
+    set never see stub replies.
+
+    Returns:
+        The directory written to
+    """
+    directory = directory or tempfile.mkdtemp(prefix="frjar-stub-")
+    openai_helpers.PRICE_HISTORY_FILE = os.path.join(directory, "price_history.json")
+    openai_helpers.TRAINING_FILE = os.path.join(directory, "cloud_ai_training.json")
+    return directory
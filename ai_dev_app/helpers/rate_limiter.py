@@ -0,0 +1,201 @@
+import time
+import threading
+from ai_dev_app.constants.app_constants import AppConstants
+from ai_dev_app.helpers import metrics
+
+# Client-side request/token budgets per LLM provider (AppConstants.LLM_RATE_LIMITS).
+# Budgets are token buckets refilled continuously over a minute. A caller
+# reserves capacity up front; if the bucket is short it gets the number of
+# seconds to sleep before its reservation is good, so the same limiter serves
+# threads (time.sleep) and the event loop (asyncio.sleep). Only a few callers
+# may wait per provider and never longer than LLM_RATE_LIMIT_MAX_WAIT_SECONDS.
+
+DEFAULT_MAX_TOKENS = 300
+
+_enabled = AppConstants.LLM_RATE_LIMITS_ENABLED
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+class TokenBucket:
+    __slots__ = ("capacity", "rate", "level", "updated")
+
+    def __init__(self, per_minute):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def wait_for(self, amount, now):
+        """Seconds until `amount` is available (negative levels are earlier reservations)."""
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+        deficit = amount - self.level
+        return deficit / self.rate if deficit > 0 else 0.0
+
+    def take(self, amount):
+        self.level -= amount
+
+
+class ProviderLimiter:
+    def __init__(self, name, rpm=0, tpm=0, max_waiters=AppConstants.LLM_RATE_LIMIT_MAX_WAITERS):
+        self.name = name
+        self.requests = TokenBucket(rpm) if rpm else None
+        self.tokens = TokenBucket(tpm) if tpm else None
+        self.max_waiters = max_waiters
+        self.blocked_until = 0.0
+        self._waiting = []
+        self._lock = threading.Lock()
+
+    def _needs(self, tokens):
+        if self.requests:
+            yield self.requests, 1
+        if self.tokens:
+            # A request bigger than the whole bucket waits for a full bucket, not forever
+            yield self.tokens, min(tokens, self.tokens.capacity)
+
+    def _wait_time(self, tokens, now):
+        waits = [bucket.wait_for(amount, now) for bucket, amount in self._needs(tokens)]
+        return max([self.blocked_until - now, 0.0] + waits)
+
+    def wait_time(self, tokens):
+        with self._lock:
+            return self._wait_time(tokens, time.monotonic())
+
+    def reserve(self, tokens, max_wait=0.0):
+        """
+        Takes one request and `tokens` tokens from the budget.
+
+        Returns:
+            Seconds to sleep before calling the provider (0.0 if there is capacity now),
+            or None if that would exceed max_wait or the wait queue is full
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._waiting = [t for t in self._waiting if t > now]
+            wait = self._wait_time(tokens, now)
+            if wait > max_wait or (wait > 0 and len(self._waiting) >= self.max_waiters):
+                return None
+            for bucket, amount in self._needs(tokens):
+                bucket.take(amount)
+            if wait > 0:
+                self._waiting.append(now + wait)
+            return wait
+
+    def penalize(self, seconds):
+        """Blocks the provider for `seconds` after it answered 429."""
+        with self._lock:
+            self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+
+    def snapshot(self):
+        with self._lock:
+            now = time.monotonic()
+            return {
+                "requests_available": round(self.requests.level, 2) if self.requests else None,
+                "tokens_available": round(self.tokens.level, 2) if self.tokens else None,
+                "blocked_for_s": round(max(0.0, self.blocked_until - now), 2),
+                "waiting": len([t for t in self._waiting if t > now])
+            }
+
+
+def enable():
+    global _enabled
+    _enabled = True
+
+
+def disable():
+    global _enabled
+    _enabled = False
+
+
+def get_limiter(provider):
+    """
+    Limiter for the provider, or None when limits are off.
+
+    A provider without a configured budget still gets one, with no buckets,
+    so its 429 Retry-After pauses it like any other provider.
+    """
+    if not _enabled:
+        return None
+    limiter = _limiters.get(provider)
+    if limiter is None:
+        limits = AppConstants.LLM_RATE_LIMITS.get(provider, {})
+        with _limiters_lock:
+            limiter = _limiters.setdefault(provider, ProviderLimiter(provider, limits.get("rpm", 0), limits.get("tpm", 0)))
+    return limiter
+
+
+def reset():
+    with _limiters_lock:
+        _limiters.clear()
+
+
+def estimate_tokens(prompt, max_tokens=DEFAULT_MAX_TOKENS):
+    # ~4 characters per token plus the completion budget
+    return len(prompt) // 4 + max_tokens
+
+
+def try_acquire(provider, tokens):
+    """True if the provider can be called right now (and takes the budget for it)."""
+    limiter = get_limiter(provider)
+    if limiter is None:
+        return True
+    if limiter.reserve(tokens) is not None:
+        return True
+    metrics.inc("llm_rate_limited_total", provider=provider, action="skipped")
+    return False
+
+
+def reserve_any(providers, tokens, max_wait=None):
+    """
+    Reserves budget on whichever of the providers frees up first.
+
+    Returns:
+        Tuple of (provider, seconds to sleep), or (None, None) if none frees up within max_wait
+    """
+    if max_wait is None:
+        max_wait = AppConstants.LLM_RATE_LIMIT_MAX_WAIT_SECONDS
+    candidates = []
+    for provider in providers:
+        limiter = get_limiter(provider)
+        if limiter is None:
+            return provider, 0.0
+        candidates.append((limiter.wait_time(tokens), provider, limiter))
+
+    for _, provider, limiter in sorted(candidates, key=lambda c: c[0]):
+        wait = limiter.reserve(tokens, max_wait)
+        if wait is not None:
+            metrics.inc("llm_rate_limited_total", provider=provider, action="waited")
+            metrics.observe("llm_rate_limit_wait_seconds", wait, provider=provider)
+            return provider, wait
+
+    for provider in providers:
+        metrics.inc("llm_rate_limited_total", provider=provider, action="rejected")
+    return None, None
+
+
+def retry_after_seconds(error):
+    """Back-off in seconds if the exception is an HTTP 429 (requests, aiohttp or openai), else None."""
+    response = getattr(error, "response", None)
+    status = getattr(error, "status", None) or getattr(error, "status_code", None) or getattr(response, "status_code", None)
+    if status != 429:
+        return None
+    headers = getattr(error, "headers", None) or getattr(response, "headers", None) or {}
+    try:
+        return float(headers.get("Retry-After", 1))
+    except (TypeError, ValueError):
+        return 1.0
+
+
+def note_error(provider, error):
+    """Pauses the provider's limiter when the provider answered 429."""
+    seconds = retry_after_seconds(error)
+    limiter = get_limiter(provider)
+    if seconds is None or limiter is None:
+        return
+    limiter.penalize(seconds)
+    metrics.inc("llm_rate_limited_total", provider=provider, action="429")
+
+
+def snapshot():
+    return {provider: limiter.snapshot() for provider, limiter in list(_limiters.items())}
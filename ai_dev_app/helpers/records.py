@@ -0,0 +1,131 @@
+import sys
+
+# Compact read-only records for the hot paths that read the same fields on
+# every rerun or request (supplier lists, price summaries). Products and price
+# summaries are still dicts in memory: the API serves them, the pricing code
+# keys its caches by them and history stores them as JSON. So these records
+# do not replace the dicts. They are only built for what is actually read,
+# use __slots__ and share interned strings with the dicts. The catalog's
+# memory saving comes from intern_catalog_strings(). PriceSummary.to_dict()
+# still returns a new dict per price.
+
+NATIONAL_AVERAGE = sys.intern("National Average")
+
+
+def intern_str(value):
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+class Supplier:
+    __slots__ = ("name", "location", "verified", "description", "website", "email", "sales_email",
+                 "phone", "landline", "toll_free", "_location_lower")
+
+    def __init__(self, name, location="", verified=False, description="", website=None, email=None,
+                 sales_email=None, phone=None, landline=None, toll_free=None):
+        self.name = intern_str(name)
+        self.location = intern_str(location or "")
+        self.verified = bool(verified)
+        self.description = description or ""
+        self.website = website
+        self.email = email
+        self.sales_email = sales_email
+        self.phone = phone
+        self.landline = landline
+        self.toll_free = toll_free
+        self._location_lower = self.location.lower()
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**{field: data.get(field) for field in cls.__slots__[:-1] if field in data})
+
+    def in_city(self, city):
+        """Same rule as catalog.filter_suppliers_by_city: the city name appears in the location."""
+        return not city or city == NATIONAL_AVERAGE or city.lower() in self._location_lower
+
+    def to_dict(self):
+        return {
+            field: getattr(self, field) for field in self.__slots__[:-1]
+            if getattr(self, field) not in (None, "")
+        }
+
+
+class ProductSuppliers:
+    """A product's Supplier records, partitioned by city on first use."""
+
+    __slots__ = ("wholesale", "retail", "_by_city")
+
+    def __init__(self, data):
+        self.wholesale = tuple(
+            Supplier.from_dict(s)
+            for s in (data.get("suppliers") or []) + (data.get("second_layer_wholesale_suppliers") or [])
+        )
+        self.retail = tuple(Supplier.from_dict(s) for s in data.get("retail_suppliers") or [])
+        self._by_city = {}
+
+    def for_city(self, city=None):
+        """(wholesale, retail) Supplier tuples for the city, partitioned once per city."""
+        city = city or NATIONAL_AVERAGE
+        found = self._by_city.get(city)
+        if found is None:
+            found = self._by_city[city] = (
+                tuple(s for s in self.wholesale if s.in_city(city)),
+                tuple(s for s in self.retail if s.in_city(city))
+            )
+        return found
+
+
+class PriceSummary:
+    """Everything in a price summary except today's price, its source and the city; memoized per product × city."""
+
+    __slots__ = ("min_price", "max_price", "average_price", "volatility", "symmetry_index",
+                 "monthly_volatility", "source_score", "wholesale_count", "second_layer_count", "retail_count")
+
+    def __init__(self, min_price, max_price, average_price, volatility=0.0, symmetry_index=0.0,
+                 monthly_volatility=0.0, source_score=0.0, wholesale_count=0, second_layer_count=0, retail_count=0):
+        self.min_price = min_price
+        self.max_price = max_price
+        self.average_price = average_price
+        self.volatility = volatility
+        self.symmetry_index = symmetry_index
+        self.monthly_volatility = monthly_volatility
+        self.source_score = source_score
+        self.wholesale_count = wholesale_count
+        self.second_layer_count = second_layer_count
+        self.retail_count = retail_count
+
+    def to_dict(self, today_price, model_source, city):
+        """The summary dict stored in the price cache and history and returned by the API."""
+        return {
+            "today_price": float(today_price),
+            "min_price": self.min_price,
+            "max_price": self.max_price,
+            "average_price": self.average_price,
+            "volatility": self.volatility,
+            "symmetry_index": self.symmetry_index,
+            "monthly_volatility": self.monthly_volatility,
+            "source_score": self.source_score,
+            "supplier_counts": {
+                "wholesale": self.wholesale_count,
+                "second_layer": self.second_layer_count,
+                "retail": self.retail_count
+            },
+            "model_source": model_source,
+            "city": city
+        }
+
+
+def intern_catalog_strings(categories):
+    """Interns the strings repeated across products (units, cities, supplier names and locations) in place."""
+    for category in categories:
+        category["name"] = intern_str(category.get("name", ""))
+        for product in category.get("products", []):
+            if "unit" in product:
+                product["unit"] = intern_str(product["unit"])
+            if isinstance(product.get("city_margins"), dict):
+                product["city_margins"] = {intern_str(city): m for city, m in product["city_margins"].items()}
+            for field in ("suppliers", "second_layer_wholesale_suppliers", "retail_suppliers"):
+                for supplier in product.get(field) or []:
+                    for key in ("name", "location", "website"):
+                        if key in supplier:
+                            supplier[key] = intern_str(supplier[key])
+    return categories
@@ -0,0 +1,350 @@
+import re
+import csv
+import json
+import time
+from array import array
+from ai_dev_app.constants.app_constants import AppConstants
+from ai_dev_app.helpers import metrics
+from ai_dev_app.helpers.catalog import get_catalog, product_key, reload_catalog
+from ai_dev_app.helpers.persistence import write_json_atomic
+
+# Streaming import of supplier price sheets (CSV or XLSX) into the catalog.
+# Rows are read one at a time (openpyxl read-only mode for XLSX) and folded
+# into per-product, per-city aggregates, so memory grows with the number of
+# products in the sheet, not with its rows (--replace also keeps the national
+# prices themselves, 8 bytes each, for the median). Prices are converted to the
+# catalog unit of each product and cities are normalized to AppConstants.CITIES.
+# Applying the result rewrites the catalog file and goes through
+# reload_catalog(), which rebuilds only the touched products' rows, records
+# and cached prices.
+
+# Sheet header -> field; headers are matched case-insensitively
+COLUMN_ALIASES = {
+    "product": "product", "product_name": "product", "name": "product", "item": "product", "المنتج": "product",
+    "unit": "unit", "uom": "unit", "الوحدة": "unit",
+    "city": "city", "location": "city", "region": "city", "المدينة": "city",
+    "price": "price", "unit_price": "price", "price_sar": "price", "today_price": "price", "السعر": "price",
+    "supplier": "supplier", "supplier_name": "supplier", "المورد": "supplier",
+    "supplier_location": "supplier_location",
+    "supplier_type": "supplier_type",
+}
+
+CITY_ALIASES = {
+    "": "National Average", "national": "National Average", "national average": "National Average",
+    "saudi arabia": "National Average", "ksa": "National Average", "المملكة": "National Average",
+    "riyadh": "Riyadh", "الرياض": "Riyadh",
+    "jeddah": "Jeddah", "jiddah": "Jeddah", "jedda": "Jeddah", "جدة": "Jeddah", "جده": "Jeddah",
+    "makkah": "Makkah", "mecca": "Makkah", "makka": "Makkah", "مكة": "Makkah", "مكه": "Makkah",
+    "dammam": "Dammam", "الدمام": "Dammam",
+    "medina": "Medina", "madinah": "Medina", "al madinah": "Medina", "المدينة": "Medina", "المدينة المنورة": "Medina",
+}
+
+# Unit name -> (dimension, size in the dimension's base unit)
+UNIT_ALIASES = {
+    "kg": ("mass", 1.0), "kilogram": ("mass", 1.0), "كجم": ("mass", 1.0), "كيلو": ("mass", 1.0),
+    "g": ("mass", 0.001), "gram": ("mass", 0.001),
+    "ton": ("mass", 1000.0), "tonne": ("mass", 1000.0), "t": ("mass", 1000.0), "طن": ("mass", 1000.0),
+    "m": ("length", 1.0), "meter": ("length", 1.0), "metre": ("length", 1.0), "متر": ("length", 1.0),
+    "cm": ("length", 0.01), "mm": ("length", 0.001),
+    "m2": ("area", 1.0), "sqm": ("area", 1.0), "square meter": ("area", 1.0), "متر مربع": ("area", 1.0),
+    "m3": ("volume", 1.0), "cbm": ("volume", 1.0), "cubic meter": ("volume", 1.0), "متر مكعب": ("volume", 1.0),
+    "l": ("liquid", 1.0), "liter": ("liquid", 1.0), "litre": ("liquid", 1.0), "لتر": ("liquid", 1.0),
+    "piece": ("count", 1.0), "pieces": ("count", 1.0), "pcs": ("count", 1.0), "pc": ("count", 1.0),
+    "each": ("count", 1.0), "unit": ("count", 1.0), "حبة": ("count", 1.0),
+    "bag": ("bag", 1.0), "كيس": ("bag", 1.0),
+    "roll": ("roll", 1.0), "set": ("set", 1.0), "kit": ("kit", 1.0), "drum": ("drum", 1.0),
+}
+
+_UNIT_PATTERN = re.compile(r"^\s*([\d.,]+)?\s*(.*?)\s*$")
+
+
+def normalize_city(value):
+    """City name from AppConstants.CITIES, or None for a city the catalog does not price."""
+    city = CITY_ALIASES.get(str(value or "").strip().lower())
+    return city if city in AppConstants.CITIES else None
+
+
+def parse_unit(value):
+    """
+    Parses a unit such as "50 Kg", "1 M3" or "m³" into (dimension, size in base units).
+
+    Returns:
+        Tuple, or None for an empty or unknown unit
+    """
+    text = str(value or "").strip().lower().replace("²", "2").replace("³", "3")
+    match = _UNIT_PATTERN.match(text)
+    if not text or not match:
+        return None
+    quantity, name = match.groups()
+    unit = UNIT_ALIASES.get(name)
+    if unit is None:
+        return None
+    try:
+        size = float(quantity.replace(",", "")) if quantity else 1.0
+    except ValueError:
+        return None
+    return unit[0], unit[1] * size
+
+
+def parse_price(value):
+    if isinstance(value, (int, float)):
+        return float(value)
+    text = re.sub(r"(?i)sar|ر\.?س|,|\s", "", str(value or ""))
+    try:
+        return float(text)
+    except ValueError:
+        return None
+
+
+def iter_sheet_rows(path):
+    """Yields each data row as {field: value}, streaming CSV or XLSX (read-only mode)."""
+    if path.lower().endswith(".csv"):
+        with open(path, newline="", encoding="utf-8-sig") as f:
+            reader = csv.reader(f)
+            header = next(reader, None)
+            yield from _rows_with_fields(header, reader)
+    elif path.lower().endswith(".xlsx"):
+        from openpyxl import load_workbook
+
+        workbook = load_workbook(path, read_only=True, data_only=True)
+        try:
+            rows = workbook.active.iter_rows(values_only=True)
+            header = next(rows, None)
+            yield from _rows_with_fields(header, rows)
+        finally:
+            workbook.close()
+    else:
+        raise ValueError(f"Unsupported sheet format: {path} (use .csv or .xlsx)")
+
+
+def _rows_with_fields(header, rows):
+    if not header:
+        return
+    fields = [COLUMN_ALIASES.get(str(h or "").strip().lower().replace(" ", "_")) for h in header]
+    if "product" not in fields or "price" not in fields:
+        raise ValueError("Sheet needs at least a product and a price column")
+    for row in rows:
+        yield {field: value for field, value in zip(fields, row) if field}
+
+
+class _PriceStats:
+    __slots__ = ("count", "low", "high", "total", "prices")
+
+    def __init__(self, keep_prices=False):
+        self.count = 0
+        self.low = float("inf")
+        self.high = float("-inf")
+        self.total = 0.0
+        self.prices = array("d") if keep_prices else None
+
+    def add(self, price):
+        self.count += 1
+        self.low = min(self.low, price)
+        self.high = max(self.high, price)
+        self.total += price
+        if self.prices is not None:
+            self.prices.append(price)
+
+    def median(self):
+        ordered = sorted(self.prices)
+        middle = len(ordered) // 2
+        return ordered[middle] if len(ordered) % 2 else (ordered[middle - 1] + ordered[middle]) / 2
+
+
+def _rebased_margin(margin_percent, old_base, new_base):
+    """Margin on new_base that gives the same price as margin_percent on old_base."""
+    if not old_base:
+        return margin_percent
+    return round((old_base * (1 + margin_percent / 100) / new_base - 1) * 100, 4)
+
+
+class SheetImport:
+    """
+    Folds sheet rows into per-product updates against one catalog version.
+
+    Only aggregates are kept: price stats per (product, city) and the new
+    suppliers per product.
+    """
+
+    MAX_EXAMPLES = 10
+
+    def __init__(self, catalog, replace=False):
+        self.catalog = catalog
+        self.replace = replace
+        self.rows = 0
+        self.accepted = 0
+        self.rejected = {}
+        self.examples = []
+        self._stats = {}       # (product key, city) -> _PriceStats
+        self._suppliers = {}   # product key -> {(name, kind): location}
+        self._units = {}       # product key -> parsed catalog unit
+
+    def _reject(self, reason, row):
+        self.rejected[reason] = self.rejected.get(reason, 0) + 1
+        if len(self.examples) < self.MAX_EXAMPLES:
+            self.examples.append({"row": self.rows + 1, "reason": reason, "product": row.get("product")})
+
+    def _catalog_unit(self, key, product):
+        if key not in self._units:
+            self._units[key] = parse_unit(product.get("unit"))
+        return self._units[key]
+
+    def add_row(self, row):
+        self.rows += 1
+        key = product_key(str(row.get("product") or ""))
+        product = self.catalog.products_by_name.get(key)
+        if product is None:
+            self._reject("unknown_product", row)
+            return
+
+        price = parse_price(row.get("price"))
+        if price is None or price <= 0:
+            self._reject("invalid_price", row)
+            return
+
+        city = normalize_city(row.get("city"))
+        if city is None:
+            self._reject("unknown_city", row)
+            return
+
+        if row.get("unit"):
+            sheet_unit = parse_unit(row["unit"])
+            catalog_unit = self._catalog_unit(key, product)
+            if sheet_unit is None:
+                self._reject("unknown_unit", row)
+                return
+            if catalog_unit is not None and sheet_unit != catalog_unit:
+                if sheet_unit[0] != catalog_unit[0]:
+                    self._reject("unit_mismatch", row)
+                    return
+                # Same dimension, different size: convert to the catalog unit ("ton" -> "50 Kg" bag price)
+                price = price / sheet_unit[1] * catalog_unit[1]
+
+        stats = self._stats.get((key, city))
+        if stats is None:
+            # Replacing national prices sets the median, which needs the prices themselves
+            stats = self._stats[(key, city)] = _PriceStats(self.replace and city == "National Average")
+        stats.add(price)
+
+        supplier = str(row.get("supplier") or "").strip()
+        if supplier:
+            kind = "retail" if str(row.get("supplier_type") or "").strip().lower() == "retail" else "wholesale"
+            location = str(row.get("supplier_location") or "").strip() or (
+                f"{city}, Saudi Arabia" if city != "National Average" else "Saudi Arabia"
+            )
+            self._suppliers.setdefault(key, {}).setdefault((supplier, kind), location)
+        self.accepted += 1
+
+    def touched(self):
+        return {key for key, _ in self._stats} | set(self._suppliers)
+
+    def _updated_product(self, key, product):
+        updated = {**product}
+        national = self._stats.get((key, "National Average"))
+        if national is not None:
+            if self.replace:
+                updated["min_price"] = round(national.low, 2)
+                updated["max_price"] = round(national.high, 2)
+                updated["average"] = round(national.total / national.count, 2)
+                updated["median"] = round(national.median(), 2)
+            else:
+                updated["min_price"] = round(min(product.get("min_price", national.low), national.low), 2)
+                updated["max_price"] = round(max(product.get("max_price", national.high), national.high), 2)
+
+        # City prices are kept as margins on the national min/max, as the catalog stores them
+        old_min, old_max = product.get("min_price", 0), product.get("max_price", 0)
+        base_min, base_max = updated.get("min_price", 0), updated.get("max_price", 0)
+        margins = dict(product.get("city_margins") or {})
+        if base_min and base_max and (base_min, base_max) != (old_min, old_max):
+            # Cities the sheet does not price keep their absolute prices against the new base
+            for city, margin in margins.items():
+                margins[city] = {
+                    **margin,
+                    "min_margin_percent": _rebased_margin(margin.get("min_margin_percent", 0), old_min, base_min),
+                    "max_margin_percent": _rebased_margin(margin.get("max_margin_percent", 0), old_max, base_max)
+                }
+        for city in AppConstants.CITIES:
+            stats = self._stats.get((key, city))
+            if city == "National Average" or stats is None or not base_min or not base_max:
+                continue
+            low, high = stats.low, stats.high
+            if not self.replace:
+                # Merge like the national band: the sheet widens the city's band, never narrows it
+                margin = margins.get(city, {})
+                low = min(low, base_min * (1 + margin.get("min_margin_percent", 0) / 100))
+                high = max(high, base_max * (1 + margin.get("max_margin_percent", 0) / 100))
+            margins[city] = {
+                "min_margin_percent": round((low / base_min - 1) * 100, 4),
+                "max_margin_percent": round((high / base_max - 1) * 100, 4)
+            }
+        if margins:
+            updated["city_margins"] = margins
+
+        for (name, kind), location in self._suppliers.get(key, {}).items():
+            field = "retail_suppliers" if kind == "retail" else "suppliers"
+            existing = list(updated.get(field) or [])
+            if not any(s.get("name", "").strip().lower() == name.lower() for s in existing):
+                existing.append({"name": name, "location": location, "verified": False})
+                updated[field] = existing
+        return updated
+
+    def updated_categories(self):
+        """Catalog categories with the touched products replaced by updated copies."""
+        touched = self.touched()
+        categories = []
+        for category in self.catalog.categories:
+            products = category.get("products", [])
+            if any(product_key(p.get("name", "")) in touched for p in products):
+                products = [
+                    self._updated_product(product_key(p.get("name", "")), p)
+                    if product_key(p.get("name", "")) in touched else p
+                    for p in products
+                ]
+                category = {**category, "products": products}
+            categories.append(category)
+        return categories
+
+    def report(self):
+        return {
+            "rows": self.rows,
+            "accepted": self.accepted,
+            "rejected": dict(self.rejected),
+            "products": len(self.touched()),
+            "examples": list(self.examples)
+        }
+
+
+def import_price_sheet(path, dry_run=False, replace=False, catalog_path=None):
+    """
+    Streams a price sheet into the catalog.
+
+    Args:
+        path: .csv or .xlsx sheet with product and price columns (city, unit,
+            supplier, supplier_location and supplier_type are optional)
+        dry_run: Validate and report without changing the catalog
+        replace: Set national min/max/average/median from the sheet instead of widening them
+        catalog_path: Catalog file to update (the loaded catalog's file by default)
+
+    Returns:
+        Report dict with row counts, rejections by reason and the reload diff summary
+    """
+    started = time.perf_counter()
+    catalog = get_catalog(catalog_path) if catalog_path else get_catalog()
+    sheet = SheetImport(catalog, replace=replace)
+    for row in iter_sheet_rows(path):
+        sheet.add_row(row)
+
+    report = sheet.report()
+    if not dry_run and sheet.touched():
+        catalog_path = catalog_path or catalog.path or AppConstants.CATALOG_FILE
+        text = json.dumps({"materials": sheet.updated_categories()}, ensure_ascii=False, indent=2)
+        write_json_atomic(catalog_path, text)
+        diff = reload_catalog(catalog_path)
+        report["catalog"] = diff.summary() if diff else None
+
+    elapsed = time.perf_counter() - started
+    report["elapsed_s"] = elapsed
+    metrics.inc("sheet_import_rows_total", sheet.accepted, outcome="accepted")
+    metrics.inc("sheet_import_rows_total", sheet.rows - sheet.accepted, outcome="rejected")
+    metrics.observe("sheet_import_seconds", elapsed)
+    return report
@@ -0,0 +1,37 @@
+import re
+import json
+import random
+
+# Canned LLM replies for offline runs. Kept free of project imports so the
+# mock LLM server can use it without loading the catalog or the local model.
+
+
+def _price_bounds(prompt):
+    low = re.search(r"Min Price:\s*([\d.]+)", prompt)
+    high = re.search(r"Max Price:\s*([\d.]+)", prompt)
+    if not low or not high:
+        return None
+    return float(low.group(1)), float(high.group(1))
+
+
+def _city_price_bounds(prompt):
+    # Multi-city prompts list "- City: Min x / Max y / ..." per city
+    return {
+        city.strip(): (float(low), float(high))
+        for city, low, high in re.findall(r"-\s*([^:\n]+):\s*Min\s*([\d.]+)\s*/\s*Max\s*([\d.]+)", prompt)
+    }
+
+
+def stub_reply(prompt):
+    """Plausible model reply: a price inside the prompt's min/max for pricing prompts, "{}" otherwise."""
+    city_bounds = _city_price_bounds(prompt)
+    if city_bounds:
+        return json.dumps({"today_price_sar": {
+            city: round(random.uniform(low, high), 2) for city, (low, high) in city_bounds.items()
+        }})
+
+    bounds = _price_bounds(prompt)
+    if not bounds:
+        return "{}"
+    low, high = bounds
+    return json.dumps({"today_price_sar": round(random.uniform(low, high), 2)})
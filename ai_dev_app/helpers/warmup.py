@@ -0,0 +1,143 @@
+import time
+import threading
+import numpy as np
+from ai_dev_app.constants.app_constants import AppConstants
+from ai_dev_app.helpers import metrics
+
+# Startup warm-up for the API server and containers. Loads everything the
+# first requests would otherwise pay for (catalog and price matrix, the local
+# model and xgboost, the history and search indexes, the LLM cache) and puts
+# today's prices of the most looked-up products into the memory cache.
+# Readiness probes should use is_ready() (GET /ready in the API), so a new
+# instance only takes traffic once this has finished.
+
+PENDING, RUNNING, READY, FAILED = "pending", "running", "ready", "failed"
+
+_state = {"status": PENDING, "steps": {}, "preloaded": 0, "error": None, "seconds": None}
+_state_lock = threading.Lock()
+_thread = None
+
+
+def _warm_catalog():
+    from ai_dev_app.helpers.catalog import get_catalog
+    catalog = get_catalog()
+    return {"version": catalog.version, "products": len(catalog.products_by_name)}
+
+
+def _warm_model():
+    # Loading unpickles the local model (and imports xgboost); one prediction
+    # builds the booster's internal caches
+    from ai_dev_app.helpers import model_registry
+    model = model_registry.get_local_model()
+    if model is None:
+        return {"local_model": False}
+    model.predict(np.zeros((1, getattr(model, "n_features_in_", 31))))
+    return {"local_model": True, "version": model_registry.get_model_version()}
+
+
+def _warm_indexes():
+    from ai_dev_app.helpers import openai_helpers
+    from ai_dev_app.helpers.catalog import get_catalog
+    from ai_dev_app.helpers.product_search import get_search_index
+    from ai_dev_app.helpers import llm_cache
+
+    llm_cache.get_llm_cache()
+    search = get_search_index()
+    openai_helpers.get_price_history_index()
+    # Feature vectors and summary templates are memoized per catalog version
+    for _, product in get_catalog().iter_products():
+        openai_helpers.product_features(product)
+    return {"search_products": len(search)}
+
+
+def _warm_prices(top_n):
+    from ai_dev_app.helpers import openai_helpers
+    from ai_dev_app.helpers.catalog import get_catalog
+
+    catalog = get_catalog()
+    loaded = missing = 0
+    for name in openai_helpers._daily_price_history.most_priced(top_n):
+        product = catalog.get_product(name)
+        if product is None:
+            continue
+        for city in AppConstants.CITIES:
+            cache_key = openai_helpers.price_cache_key(product["name"], city)
+            if openai_helpers._lookup_cached_price(cache_key, product["name"], city):
+                loaded += 1
+            elif AppConstants.WARMUP_PRICE_MISSING:
+                openai_helpers.estimate_today_price(product, city)
+                loaded += 1
+            else:
+                missing += 1
+    return {"prices_loaded": loaded, "prices_missing": missing}
+
+
+def run_warmup(top_n=None):
+    """
+    Runs every warm-up step once; later calls return the recorded status.
+
+    Args:
+        top_n: How many of the most looked-up products to preload (WARMUP_TOP_PRODUCTS)
+
+    Returns:
+        status() after the run
+    """
+    with _state_lock:
+        if _state["status"] != PENDING:
+            return status()
+        _state["status"] = RUNNING
+
+    started = time.perf_counter()
+    steps = [
+        ("catalog", _warm_catalog),
+        ("model", _warm_model),
+        ("indexes", _warm_indexes),
+        ("prices", lambda: _warm_prices(top_n or AppConstants.WARMUP_TOP_PRODUCTS)),
+    ]
+    try:
+        for name, step in steps:
+            step_started = time.perf_counter()
+            details = step()
+            elapsed = time.perf_counter() - step_started
+            metrics.observe("warmup_seconds", elapsed, step=name)
+            with _state_lock:
+                _state["steps"][name] = {"seconds": round(elapsed, 3), **details}
+    except Exception as e:
+        with _state_lock:
+            _state["status"], _state["error"] = FAILED, f"{type(e).__name__}: {e}"
+        print(f"❌ Warm-up failed: {e}")
+        return status()
+
+    with _state_lock:
+        _state["status"] = READY
+        _state["seconds"] = round(time.perf_counter() - started, 3)
+        _state["preloaded"] = _state["steps"]["prices"]["prices_loaded"]
+    print(f"✅ Warm-up finished in {_state['seconds']}s ({_state['preloaded']} prices preloaded)")
+    return status()
+
+
+def start_warmup(top_n=None):
+    """Runs the warm-up on a background thread (once per process)."""
+    global _thread
+    with _state_lock:
+        if _thread is None:
+            _thread = threading.Thread(target=run_warmup, args=(top_n,), name="warmup", daemon=True)
+            _thread.start()
+    return _thread
+
+
+def is_ready():
+    return _state["status"] == READY
+
+
+def status():
+    with _state_lock:
+        return {**_state, "steps": dict(_state["steps"])}
+
+
+if __name__ == "__main__":
+    # Pre-flight check for images and deploy scripts: exits non-zero if warm-up fails
+    import sys
+    result = run_warmup()
+    print(result)
+    sys.exit(0 if result["status"] == READY else 1)
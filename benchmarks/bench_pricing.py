@@ -0,0 +1,242 @@
+import sys
+import os
+
+# Add the root project folder (one level up from benchmarks) to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import json
+import time
+import argparse
+import platform
+import tempfile
+import statistics
+from datetime import datetime
+from ai_dev_app.constants.app_constants import AppConstants
+from ai_dev_app.helpers import openai_helpers
+from ai_dev_app.helpers import model_registry
+from ai_dev_app.helpers.catalog import load_catalog, get_catalog, reload_catalog
+from ai_dev_app.helpers.provider_stubs import install_provider_stubs
+from ai_dev_app.helpers import rate_limiter
+from ai_dev_app.helpers import llm_cache
+from utils.feature_extractor import extract_features
+
+# Offline benchmarks for the pricing hot paths. LLM providers are stubbed and
+# history/training writes go to a temp dir, so assets/ is never touched.
+#
+#   python benchmarks/bench_pricing.py --output bench.json
+#   python benchmarks/bench_pricing.py --compare bench.json --latency 0.05 --failure-rate 0.1
+
+DEFAULT_THRESHOLD = 0.10
+
+
+def _summarize(samples, tiers=None):
+    samples = sorted(samples)
+    total = sum(samples)
+    result = {
+        "iterations": len(samples),
+        "mean_us": round(total / len(samples) * 1e6, 2),
+        "p50_us": round(samples[len(samples) // 2] * 1e6, 2),
+        "p95_us": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))] * 1e6, 2),
+        "min_us": round(samples[0] * 1e6, 2),
+        "stdev_us": round(statistics.pstdev(samples) * 1e6, 2),
+        "ops_per_s": round(len(samples) / total, 1) if total else None
+    }
+    if tiers is not None:
+        result["tiers"] = tiers
+    return result
+
+
+def _time_calls(fn, iterations, setup=None):
+    samples = []
+    for i in range(iterations):
+        if setup:
+            setup(i)
+        started = time.perf_counter()
+        fn(i)
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+class PricingBench:
+    def __init__(self, catalog_path, iterations, latency, failure_rate):
+        self.catalog_path = catalog_path
+        self.iterations = iterations
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.catalog = self._global_catalog(catalog_path)
+        self.products = [product for _, product in self.catalog.iter_products()]
+        self.cities = AppConstants.CITIES
+        self.local_model = model_registry.get_local_model()
+        self.workdir = tempfile.mkdtemp(prefix="frjar-bench-")
+        self.skipped = {}
+
+    @staticmethod
+    def _global_catalog(catalog_path):
+        # Price the process-wide catalog, so lookups go through its price matrix
+        # and per-version memos like production; another file is swapped in
+        catalog = get_catalog(catalog_path)
+        if os.path.abspath(catalog.path) != os.path.abspath(catalog_path):
+            reload_catalog(catalog_path)
+            catalog = get_catalog()
+        return catalog
+
+    def _job(self, i):
+        return self.products[i % len(self.products)], self.cities[i % len(self.cities)]
+
+    def _isolate(self):
+        # Keep the benchmark's writes and cache state away from the real assets
+        openai_helpers.PRICE_HISTORY_FILE = os.path.join(self.workdir, "price_history.json")
+        openai_helpers.TRAINING_FILE = os.path.join(self.workdir, "cloud_ai_training.json")
+        openai_helpers._daily_price_history.clear()
+        openai_helpers._training_data.clear()
+        openai_helpers._ai_price_cache.clear()
+        AppConstants.PRICE_STALE_WHILE_REVALIDATE = False
+        AppConstants.PRICE_ROUTER_ENABLED = False
+        # Measure the pricing code, not the provider quotas or reply cache
+        rate_limiter.disable()
+        llm_cache.disable()
+
+    def _price_tier(self, failure_rate, local_model, clear_memory, clear_history):
+        self._isolate()
+        install_provider_stubs(latency=self.latency, failure_rate=failure_rate)
+        model_registry.set_local_model(local_model)
+        tiers = {}
+
+        # Warm every (product, city) once so memory/history tiers have something to hit
+        if not (clear_memory and clear_history):
+            for i in range(len(self.products) * len(self.cities)):
+                openai_helpers.estimate_today_price(*self._job(i))
+
+        def setup(i):
+            product, city = self._job(i)
+            key = openai_helpers.price_cache_key(product.get("name", "unknown"), city)
+            if clear_memory:
+                openai_helpers._ai_price_cache.pop(key, None)
+            if clear_history:
+                openai_helpers._daily_price_history.remove_product(product.get("name"))
+
+        def call(i):
+            _, tier = openai_helpers.estimate_today_price(*self._job(i))
+            tiers[tier] = tiers.get(tier, 0) + 1
+
+        samples = _time_calls(call, self.iterations, setup)
+        model_registry.set_local_model(self.local_model)
+        return _summarize(samples, tiers)
+
+    def run(self):
+        results = {}
+        stdout = sys.stdout
+        # The pricing path prints a breadcrumb per call; keep it out of the timings output
+        sys.stdout = open(os.devnull, "w")
+        try:
+            results["price.memory_hit"] = self._price_tier(0.0, self.local_model, False, False)
+            results["price.history_hit"] = self._price_tier(0.0, self.local_model, True, False)
+            results["price.ai"] = self._price_tier(self.failure_rate, self.local_model, True, True)
+            local_model = self._price_tier(1.0, self.local_model, True, True)
+            if local_model["tiers"].get("local_model"):
+                results["price.local_model"] = local_model
+            else:
+                # No model, or one whose inputs no longer match extract_features: the
+                # timings would be the fallback path under another name
+                self.skipped["price.local_model"] = f"local model never answered, tiers={local_model['tiers']}"
+            results["price.fallback"] = self._price_tier(1.0, None, True, True)
+
+            results["extract_features"] = _summarize(_time_calls(
+                lambda i: extract_features(self._job(i)[0]), self.iterations
+            ))
+            results["build_price_summary"] = _summarize(_time_calls(
+                lambda i: openai_helpers.build_price_summary(self._job(i)[0], 100.0, "AI", city=self._job(i)[1]),
+                self.iterations
+            ))
+            results["catalog_load"] = _summarize(_time_calls(
+                lambda i: load_catalog(self.catalog_path), max(3, self.iterations // 50)
+            ))
+            _, model_path = model_registry.current_model_file()
+            if model_path:
+                results["model_load"] = _summarize(_time_calls(
+                    lambda i: model_registry.load_model_file(model_path), max(3, self.iterations // 50)
+                ))
+        finally:
+            sys.stdout.close()
+            sys.stdout = stdout
+        return results
+
+
+def compare(results, baseline, threshold=DEFAULT_THRESHOLD):
+    """
+    Prints mean-time ratios against a baseline run.
+
+    Returns:
+        List of benchmark names slower than the baseline by more than threshold
+    """
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get("results", {}).get(name)
+        if not previous or not previous.get("mean_us"):
+            print(f"  {name:<22} {current['mean_us']:>12.2f} us   (new)")
+            continue
+        ratio = current["mean_us"] / previous["mean_us"]
+        flag = ""
+        if ratio > 1 + threshold:
+            flag = "⚠️ slower"
+            regressions.append(name)
+        elif ratio < 1 - threshold:
+            flag = "✅ faster"
+        print(f"  {name:<22} {current['mean_us']:>12.2f} us   x{ratio:.2f} vs {previous['mean_us']:.2f} us  {flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline benchmarks for the pricing path")
+    parser.add_argument("--iterations", "-n", type=int, default=500)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds per stubbed provider call")
+    parser.add_argument("--failure-rate", type=float, default=0.0,
+                        help="Probability a stubbed provider call fails (AI tier)")
+    parser.add_argument("--catalog", default=AppConstants.CATALOG_FILE)
+    parser.add_argument("--output", "-o", help="Write results JSON here")
+    parser.add_argument("--compare", help="Baseline results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Relative slowdown reported as a regression")
+    args = parser.parse_args()
+
+    bench = PricingBench(args.catalog, args.iterations, args.latency, args.failure_rate)
+    results = bench.run()
+
+    report = {
+        "meta": {
+            "timestamp": datetime.utcnow().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "iterations": args.iterations,
+            "latency_s": args.latency,
+            "failure_rate": args.failure_rate,
+            "skipped": bench.skipped
+        },
+        "results": results
+    }
+
+    if args.compare:
+        with open(args.compare, "r") as f:
+            baseline = json.load(f)
+        print(f"📊 Compared with {args.compare}")
+        regressions = compare(results, baseline, args.threshold)
+    else:
+        regressions = []
+        for name, result in results.items():
+            tiers = f"  tiers={result['tiers']}" if "tiers" in result else ""
+            print(f"  {name:<22} mean {result['mean_us']:>12.2f} us   p95 {result['p95_us']:>12.2f} us{tiers}")
+
+    for name, reason in bench.skipped.items():
+        print(f"  {name:<22} skipped: {reason}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"💾 Results saved to {args.output}")
+
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
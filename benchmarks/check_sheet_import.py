@@ -0,0 +1,120 @@
+import sys
+import os
+
+# Add the root project folder (one level up from benchmarks) to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import csv
+import argparse
+import tempfile
+from ai_dev_app.constants.app_constants import AppConstants
+from ai_dev_app.helpers.catalog import load_catalog, compute_city_bounds, product_key
+from ai_dev_app.helpers.sheet_import import SheetImport, iter_sheet_rows
+
+# Checks how price sheets change city and national bands, without touching
+# the catalog file. One-row sheets are the edge case: merging must only widen
+# a band, --replace sets it, and cities the sheet does not price keep their
+# absolute prices.
+#
+#   python benchmarks/check_sheet_import.py --product "Aluminum (Saudi, Arch side)"
+#
+# Exits with status 1 if any check fails.
+
+TOLERANCE = 0.01
+
+
+def _bands(product):
+    return {city: compute_city_bounds(product, city)[:2] for city in AppConstants.CITIES}
+
+
+def _apply(catalog, product, rows, replace=False):
+    """Runs the rows through a CSV sheet and returns the updated copy of the product."""
+    with tempfile.NamedTemporaryFile("w", suffix=".csv", newline="", encoding="utf-8", delete=False) as f:
+        writer = csv.writer(f)
+        writer.writerow(["product", "price", "city"])
+        writer.writerows([product["name"], price, city] for city, price in rows)
+        path = f.name
+    try:
+        sheet = SheetImport(catalog, replace=replace)
+        for row in iter_sheet_rows(path):
+            sheet.add_row(row)
+    finally:
+        os.remove(path)
+    for category in sheet.updated_categories():
+        for updated in category.get("products", []):
+            if product_key(updated.get("name", "")) == product_key(product["name"]):
+                return updated
+    return product
+
+
+def check(catalog, product):
+    problems = []
+    before = _bands(product)
+    city = AppConstants.CITIES[1]
+    low, high = before[city]
+    inside = round((low + high) / 2, 2)
+
+    def expect(label, condition):
+        print(f"   {'✅' if condition else '❌'} {label}")
+        if not condition:
+            problems.append(label)
+
+    # One city row inside the band: the band must not shrink to that price
+    after = _bands(_apply(catalog, product, [(city, inside)]))
+    expect(f"merge keeps {city} band {before[city]} (got {after[city]})",
+           after[city][0] <= low + TOLERANCE and after[city][1] >= high - TOLERANCE)
+    expect("merge leaves other cities unchanged", all(
+        abs(after[c][0] - before[c][0]) <= TOLERANCE and abs(after[c][1] - before[c][1]) <= TOLERANCE
+        for c in AppConstants.CITIES if c != city
+    ))
+
+    # One city row above the band: merging widens only the top
+    above = round(high * 1.2, 2)
+    after = _bands(_apply(catalog, product, [(city, above)]))
+    expect(f"merge widens {city} max to {above} (got {after[city]})",
+           abs(after[city][0] - low) <= TOLERANCE and abs(after[city][1] - above) <= TOLERANCE)
+
+    # One national row below the band: national min drops, cities keep their prices
+    national_low = round(product["min_price"] * 0.5, 2)
+    after = _bands(_apply(catalog, product, [("National Average", national_low)]))
+    expect(f"merge lowers national min to {national_low} (got {after['National Average']})",
+           abs(after["National Average"][0] - national_low) <= TOLERANCE)
+    expect("cities not in the sheet keep their prices after the national band moves", all(
+        abs(after[c][0] - before[c][0]) <= TOLERANCE and abs(after[c][1] - before[c][1]) <= TOLERANCE
+        for c in AppConstants.CITIES if c != "National Average"
+    ))
+
+    # --replace sets the city's band from the sheet
+    after = _bands(_apply(catalog, product, [(city, inside)], replace=True))
+    expect(f"replace sets {city} band to {inside} (got {after[city]})",
+           abs(after[city][0] - inside) <= TOLERANCE and abs(after[city][1] - inside) <= TOLERANCE)
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check how price sheet imports change price bands")
+    parser.add_argument("--catalog", default=AppConstants.CATALOG_FILE)
+    parser.add_argument("--product", action="append", help="Product to check (repeatable; default: first 5 priced)")
+    args = parser.parse_args()
+
+    catalog = load_catalog(args.catalog)
+    if args.product:
+        products = [catalog.get_product(name) for name in args.product]
+        if None in products:
+            sys.exit(f"❌ Unknown product in {args.product}")
+    else:
+        products = [p for _, p in catalog.iter_products() if p.get("min_price") and p.get("max_price")][:5]
+
+    problems = []
+    for product in products:
+        print(f"📄 {product['name']}")
+        problems += check(catalog, product)
+
+    if problems:
+        print(f"❌ {len(problems)} problems")
+        sys.exit(1)
+    print("✅ Sheet imports only widen bands unless --replace")
+
+
+if __name__ == "__main__":
+    main()
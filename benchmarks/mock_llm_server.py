@@ -0,0 +1,225 @@
+import sys
+import os
+
+# Add the root project folder (one level up from benchmarks) to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import json
+import time
+import random
+import asyncio
+import argparse
+from aiohttp import web
+from ai_dev_app.helpers.stub_replies import stub_reply
+
+# Local stand-in for Gemini, Groq, DeepSeek and OpenAI. Start it, then point the
+# helpers at it with FRJAR_LLM_BASE_URL:
+#
+#   python benchmarks/mock_llm_server.py --port 8765 --latency lognormal:-1.5,0.6 --error-rate 0.05
+#   FRJAR_LLM_BASE_URL=http://localhost:8765 python price_sheet.py -o prices.csv
+#
+# Behaviour can be set per provider with --config scenario.json, e.g.
+#   {"default": {"latency": "fixed:0.2"}, "gemini": {"rate_limit_rate": 0.5}}
+# and changed while running:  curl -XPOST localhost:8765/_mock/config -d @brownout.json
+
+PROVIDERS = ["gemini", "groq", "deepseek", "openai"]
+
+DEFAULT_BEHAVIOUR = {
+    "latency": "fixed:0",
+    "error_rate": 0.0,
+    "malformed_rate": 0.0,
+    "garbage_rate": 0.0,
+    "rate_limit_rate": 0.0,
+    "rpm": 0
+}
+
+
+def sample_latency(spec):
+    """
+    Draws a delay in seconds from a latency spec string.
+
+    Args:
+        spec: "fixed:S", "uniform:LOW,HIGH", "normal:MEAN,STD",
+              "lognormal:MU,SIGMA" or "exp:MEAN" (all in seconds)
+
+    Returns:
+        Non-negative delay in seconds
+    """
+    kind, _, raw = spec.partition(":")
+    args = [float(v) for v in raw.split(",") if v]
+    if kind == "fixed":
+        value = args[0] if args else 0.0
+    elif kind == "uniform":
+        value = random.uniform(args[0], args[1])
+    elif kind == "normal":
+        value = random.gauss(args[0], args[1])
+    elif kind == "lognormal":
+        value = random.lognormvariate(args[0], args[1])
+    elif kind == "exp":
+        value = random.expovariate(1 / args[0]) if args[0] else 0.0
+    else:
+        raise ValueError(f"Unknown latency distribution: {spec}")
+    return max(0.0, value)
+
+
+class MockState:
+    def __init__(self, config):
+        self.behaviour = {}
+        self.stats = {p: {"requests": 0, "ok": 0, "errors": 0, "malformed": 0, "garbage": 0, "rate_limited": 0}
+                      for p in PROVIDERS}
+        self._windows = {p: [] for p in PROVIDERS}
+        self.configure(config)
+
+    def configure(self, config):
+        default = {**DEFAULT_BEHAVIOUR, **config.get("default", {})}
+        for provider in PROVIDERS:
+            self.behaviour[provider] = {**default, **config.get(provider, {})}
+        for behaviour in self.behaviour.values():
+            sample_latency(behaviour["latency"])  # fail fast on a bad spec
+
+    def over_rpm(self, provider):
+        rpm = self.behaviour[provider]["rpm"]
+        if not rpm:
+            return False
+        now = time.monotonic()
+        window = [t for t in self._windows[provider] if now - t < 60]
+        self._windows[provider] = window
+        if len(window) >= rpm:
+            return True
+        window.append(now)
+        return False
+
+
+def _usage(prompt, reply):
+    prompt_tokens = max(1, len(prompt) // 4)
+    completion_tokens = max(1, len(reply) // 4)
+    return prompt_tokens, completion_tokens
+
+
+def gemini_body(prompt, reply):
+    prompt_tokens, completion_tokens = _usage(prompt, reply)
+    return {
+        "candidates": [{"content": {"role": "model", "parts": [{"text": reply}]}, "finishReason": "STOP"}],
+        "usageMetadata": {
+            "promptTokenCount": prompt_tokens,
+            "candidatesTokenCount": completion_tokens,
+            "totalTokenCount": prompt_tokens + completion_tokens
+        }
+    }
+
+
+def chat_body(prompt, reply, model):
+    prompt_tokens, completion_tokens = _usage(prompt, reply)
+    return {
+        "id": f"chatcmpl-mock-{random.getrandbits(32):08x}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": model or "mock",
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": reply}, "finish_reason": "stop"}],
+        "usage": {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens
+        }
+    }
+
+
+async def _respond(request, provider, prompt, build_body):
+    state = request.app["state"]
+    behaviour = state.behaviour[provider]
+    stats = state.stats[provider]
+    stats["requests"] += 1
+
+    await asyncio.sleep(sample_latency(behaviour["latency"]))
+
+    if state.over_rpm(provider) or random.random() < behaviour["rate_limit_rate"]:
+        stats["rate_limited"] += 1
+        return web.json_response(
+            {"error": {"code": 429, "message": "Rate limit exceeded (mock)", "status": "RESOURCE_EXHAUSTED"}},
+            status=429, headers={"Retry-After": "1"}
+        )
+    if random.random() < behaviour["error_rate"]:
+        stats["errors"] += 1
+        return web.json_response({"error": {"code": 500, "message": "Internal error (mock)"}}, status=500)
+    if random.random() < behaviour["malformed_rate"]:
+        stats["malformed"] += 1
+        return web.Response(text='{"candidates": [{"content": {"parts": [{"text": "{\\"today_',
+                            content_type="application/json")
+
+    if random.random() < behaviour["garbage_rate"]:
+        stats["garbage"] += 1
+        reply = "I'm unable to give an exact price for this product today."
+    else:
+        stats["ok"] += 1
+        reply = stub_reply(prompt)
+    return web.json_response(build_body(prompt, reply))
+
+
+async def gemini_generate(request):
+    payload = await request.json()
+    parts = payload.get("contents", [{}])[0].get("parts", [{}])
+    prompt = "".join(part.get("text", "") for part in parts)
+    return await _respond(request, "gemini", prompt, gemini_body)
+
+
+async def chat_completions(request):
+    provider = request.match_info["provider"]
+    if provider not in PROVIDERS:
+        raise web.HTTPNotFound()
+    payload = await request.json()
+    prompt = "\n".join(m.get("content", "") for m in payload.get("messages", []))
+    model = payload.get("model")
+    return await _respond(request, provider, prompt, lambda p, r: chat_body(p, r, model))
+
+
+async def get_stats(request):
+    state = request.app["state"]
+    return web.json_response({"behaviour": state.behaviour, "stats": state.stats})
+
+
+async def set_config(request):
+    try:
+        request.app["state"].configure(await request.json())
+    except (ValueError, IndexError) as e:
+        return web.json_response({"error": str(e)}, status=400)
+    return await get_stats(request)
+
+
+def create_app(config):
+    app = web.Application()
+    app["state"] = MockState(config)
+    app.router.add_post("/gemini/v1beta/models/{model}:generateContent", gemini_generate)
+    app.router.add_post("/{provider}/v1/chat/completions", chat_completions)
+    app.router.add_get("/_mock/stats", get_stats)
+    app.router.add_post("/_mock/config", set_config)
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mock Gemini/OpenAI-compatible LLM server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--config", help="JSON scenario file with 'default' and per-provider behaviour")
+    parser.add_argument("--latency", help="Default latency spec, e.g. fixed:0.2 or lognormal:-1.5,0.6")
+    parser.add_argument("--error-rate", type=float, help="Share of HTTP 500 replies")
+    parser.add_argument("--malformed-rate", type=float, help="Share of truncated JSON bodies")
+    parser.add_argument("--garbage-rate", type=float, help="Share of valid replies without a price JSON")
+    parser.add_argument("--rate-limit-rate", type=float, help="Share of HTTP 429 replies")
+    parser.add_argument("--rpm", type=int, help="Hard requests-per-minute limit per provider")
+    args = parser.parse_args()
+
+    config = {}
+    if args.config:
+        with open(args.config, "r") as f:
+            config = json.load(f)
+    default = config.setdefault("default", {})
+    for key in ["latency", "error_rate", "malformed_rate", "garbage_rate", "rate_limit_rate", "rpm"]:
+        value = getattr(args, key)
+        if value is not None:
+            default[key] = value
+
+    web.run_app(create_app(config), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
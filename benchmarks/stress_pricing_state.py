@@ -0,0 +1,189 @@
+import sys
+import os
+
+# Add the root project folder (one level up from benchmarks) to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import json
+import time
+import random
+import argparse
+import tempfile
+import threading
+from datetime import date, timedelta
+from ai_dev_app.constants.app_constants import AppConstants
+from ai_dev_app.helpers import openai_helpers
+from ai_dev_app.helpers import persistence
+from ai_dev_app.helpers import rate_limiter
+from ai_dev_app.helpers import llm_cache
+from ai_dev_app.helpers.catalog import get_catalog
+from ai_dev_app.helpers.provider_stubs import install_provider_stubs
+
+# Concurrency stress check for the shared pricing state. Many simulated
+# sessions price products, write history for their own days and append
+# training examples while a chaos thread drops cache entries and the
+# persistence writer keeps flushing. Afterwards every record written must be
+# in memory, in the history index and in the files on disk.
+#
+#   python benchmarks/stress_pricing_state.py --sessions 64 --iterations 300
+#
+# Exits with status 1 if any record was lost or corrupted. Writes go to a temp dir.
+
+
+class StressRun:
+    def __init__(self, sessions, iterations, failure_rate):
+        self.sessions = sessions
+        self.iterations = iterations
+        self.products = [product for _, product in get_catalog().iter_products()]
+        self.cities = AppConstants.CITIES
+        self.workdir = tempfile.mkdtemp(prefix="frjar-stress-")
+        self.failure_rate = failure_rate
+        self.errors = []
+        self.expected_history = {}
+        self.expected_training = set()
+        self.tiers = {}
+        self._record_lock = threading.Lock()
+        self._done = threading.Event()
+
+    def _isolate(self):
+        openai_helpers.PRICE_HISTORY_FILE = os.path.join(self.workdir, "price_history.json")
+        openai_helpers.TRAINING_FILE = os.path.join(self.workdir, "cloud_ai_training.json")
+        openai_helpers._daily_price_history.clear()
+        openai_helpers._training_data.clear()
+        openai_helpers._ai_price_cache.clear()
+        AppConstants.PRICE_STALE_WHILE_REVALIDATE = False
+        rate_limiter.disable()
+        llm_cache.disable()
+        install_provider_stubs(failure_rate=self.failure_rate)
+
+    def _session(self, session_id):
+        rng = random.Random(session_id)
+        # Each session owns its own past days, so every write has one expected value
+        first_day = date(2000, 1, 1) + timedelta(days=session_id * self.iterations)
+        try:
+            for i in range(self.iterations):
+                product = rng.choice(self.products)
+                city = rng.choice(self.cities)
+
+                _, tier = openai_helpers.estimate_today_price(product, city)
+
+                day_key = (first_day + timedelta(days=i)).isoformat()
+                summary = openai_helpers.build_price_summary(product, 100 + session_id + i / 1000, "Stress", city=city)
+                openai_helpers.save_price_history(product["name"], day_key, summary)
+
+                marker = session_id * 1_000_000 + i
+                openai_helpers.save_training_example(product, marker, city=city)
+
+                with self._record_lock:
+                    self.tiers[tier] = self.tiers.get(tier, 0) + 1
+                    self.expected_history[(product["name"], day_key, summary["city"])] = summary["today_price"]
+                    self.expected_training.add(float(marker))
+        except Exception as e:
+            self.errors.append(f"session {session_id}: {type(e).__name__}: {e}")
+
+    def _chaos(self):
+        # Forget cached prices and query the index while sessions are writing
+        rng = random.Random(-1)
+        index = openai_helpers.get_price_history_index()
+        while not self._done.is_set():
+            try:
+                product = rng.choice(self.products)
+                city = rng.choice(self.cities)
+                openai_helpers._ai_price_cache.pop(openai_helpers.price_cache_key(product["name"], city))
+                index.latest(product["name"], city, 5)
+                index.aggregate(product["name"], city, period="monthly")
+                persistence.flush()
+            except Exception as e:
+                self.errors.append(f"chaos: {type(e).__name__}: {e}")
+            time.sleep(0.001)
+
+    def run(self):
+        self._isolate()
+        threads = [threading.Thread(target=self._session, args=(i,)) for i in range(self.sessions)]
+        chaos = threading.Thread(target=self._chaos)
+
+        started = time.perf_counter()
+        chaos.start()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self._done.set()
+        chaos.join()
+        persistence.flush()
+        elapsed = time.perf_counter() - started
+
+        return elapsed, self.verify()
+
+    def verify(self):
+        problems = list(self.errors)
+        index = openai_helpers.get_price_history_index()
+
+        with open(openai_helpers.PRICE_HISTORY_FILE, "r") as f:
+            history_file = json.load(f)
+        with open(openai_helpers.TRAINING_FILE, "r") as f:
+            training_file = json.load(f)
+
+        for (name, day_key, city), price in self.expected_history.items():
+            in_memory = openai_helpers.get_history_entry(name, day_key, city)
+            if not in_memory or in_memory["today_price"] != price:
+                problems.append(f"history lost in memory: {name} {day_key} {city}")
+            on_disk = history_file.get(name, {}).get(day_key, {}).get(city)
+            if not on_disk or on_disk["today_price"] != price:
+                problems.append(f"history lost on disk: {name} {day_key} {city}")
+            indexed = dict(index.range(name, city, day_key, day_key)).get(day_key)
+            if not indexed or indexed["today_price"] != price:
+                problems.append(f"history missing from index: {name} {day_key} {city}")
+
+        # AI prices add their own training examples on top of the markers; one
+        # multi-city lookup prices several cities, so count today's AI history entries
+        today = date.today().isoformat()
+        ai_prices = sum(
+            1 for name in {product["name"] for product in self.products} for city in self.cities
+            if (openai_helpers.get_history_entry(name, today, city) or {}).get("model_source") == "AI"
+        )
+        expected_count = len(self.expected_training) + ai_prices
+        for label, records in (("memory", openai_helpers._training_data.snapshot()), ("disk", training_file)):
+            markers = {r["ai_price"] for r in records if r["ai_price"] in self.expected_training}
+            if markers != self.expected_training:
+                problems.append(f"training lost in {label}: {len(self.expected_training - markers)} records")
+            if len(records) != expected_count:
+                problems.append(f"training count in {label}: {len(records)} != {expected_count}")
+
+        return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrency stress check for the pricing state")
+    parser.add_argument("--sessions", type=int, default=32, help="Concurrent simulated sessions (threads)")
+    parser.add_argument("--iterations", "-n", type=int, default=200, help="Lookups and writes per session")
+    parser.add_argument("--failure-rate", type=float, default=0.2,
+                        help="Probability a stubbed provider call fails")
+    args = parser.parse_args()
+
+    run = StressRun(args.sessions, args.iterations, args.failure_rate)
+    stdout = sys.stdout
+    # The fallback tiers print per call; keep the report readable
+    sys.stdout = open(os.devnull, "w")
+    try:
+        elapsed, problems = run.run()
+    finally:
+        sys.stdout.close()
+        sys.stdout = stdout
+
+    operations = args.sessions * args.iterations
+    print(f"🧵 {args.sessions} sessions × {args.iterations} iterations in {elapsed:.2f}s "
+          f"({operations / elapsed:.0f} lookups/s), tiers={run.tiers}")
+    print(f"   {len(run.expected_history)} history records, {len(run.expected_training)} training markers, "
+          f"files in {run.workdir}")
+
+    if problems:
+        print(f"❌ {len(problems)} problems")
+        for problem in problems[:20]:
+            print(f"   {problem}")
+        sys.exit(1)
+    print("✅ No lost or corrupted records")
+
+
+if __name__ == "__main__":
+    main()
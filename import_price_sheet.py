@@ -0,0 +1,41 @@
+import argparse
+from ai_dev_app.constants.app_constants import AppConstants
+from ai_dev_app.helpers.sheet_import import import_price_sheet
+
+# Import a supplier price sheet into the catalog. Run from the project root:
+#   python import_price_sheet.py supplier_prices.xlsx --dry-run
+#   python import_price_sheet.py supplier_prices.csv
+#
+# Columns (header names are case-insensitive): product, price, and optionally
+# city, unit, supplier, supplier_location, supplier_type (wholesale|retail).
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import a supplier price sheet (.csv or .xlsx) into the catalog")
+    parser.add_argument("sheet", help="Price sheet to import")
+    parser.add_argument("--dry-run", action="store_true", help="Validate and report without changing the catalog")
+    parser.add_argument("--replace", action="store_true",
+                        help="Set national min/max/average/median from the sheet instead of widening min/max")
+    parser.add_argument("--catalog", default=AppConstants.CATALOG_FILE, help="Catalog file to update")
+    args = parser.parse_args()
+
+    # The catalog is rewritten once at the end; no watcher needed in this process
+    AppConstants.CATALOG_HOT_RELOAD = False
+    report = import_price_sheet(args.sheet, dry_run=args.dry_run, replace=args.replace, catalog_path=args.catalog)
+
+    elapsed = report["elapsed_s"]
+    rate = report["rows"] / elapsed if elapsed else 0.0
+    print(f"✅ {report['rows']} rows read in {elapsed:.2f}s ({rate:.0f} rows/s): "
+          f"{report['accepted']} accepted, {report['products']} products")
+    for reason, count in sorted(report["rejected"].items()):
+        print(f"   ⚠️ {reason:<16} {count}")
+    for example in report["examples"]:
+        print(f"      row {example['row']}: {example['reason']} ({example['product']})")
+    if args.dry_run:
+        print("   Dry run: catalog not changed")
+    elif report.get("catalog"):
+        print(f"   Catalog updated: {report['catalog']}")
+
+
+if __name__ == "__main__":
+    main()
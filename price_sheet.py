@@ -0,0 +1,167 @@
+import csv
+import time
+import argparse
+from datetime import date
+from concurrent.futures import ThreadPoolExecutor
+from ai_dev_app.constants.app_constants import AppConstants
+from ai_dev_app.helpers import openai_helpers
+from ai_dev_app.helpers.catalog import get_catalog
+
+# Bulk price sheet for the whole catalog (or a filtered subset) × cities.
+# Run from the project root:
+#   python price_sheet.py --output prices.xlsx --workers 16
+#   python price_sheet.py --category cement --city Riyadh --output cement.csv
+
+COLUMNS = [
+    "category", "product", "unit", "city", "date", "today_price",
+    "min_price", "max_price", "average_price", "model_source", "tier"
+]
+
+
+class CsvSheetWriter:
+    def __init__(self, path):
+        self._file = open(path, "w", newline="", encoding="utf-8")
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(COLUMNS)
+
+    def write_row(self, row):
+        self._writer.writerow(row)
+
+    def close(self):
+        self._file.close()
+
+
+class XlsxSheetWriter:
+    def __init__(self, path):
+        import xlsxwriter
+
+        # constant_memory flushes each row to disk once the next row starts
+        self._workbook = xlsxwriter.Workbook(path, {"constant_memory": True})
+        self._sheet = self._workbook.add_worksheet("Prices")
+        self._price_format = self._workbook.add_format({"num_format": "0.00"})
+        self._sheet.write_row(0, 0, COLUMNS, self._workbook.add_format({"bold": True}))
+        self._row = 1
+
+    def write_row(self, row):
+        for col, value in enumerate(row):
+            if isinstance(value, float):
+                self._sheet.write_number(self._row, col, value, self._price_format)
+            else:
+                self._sheet.write(self._row, col, value)
+        self._row += 1
+
+    def close(self):
+        self._workbook.close()
+
+
+def open_sheet_writer(path):
+    if path.lower().endswith(".xlsx"):
+        return XlsxSheetWriter(path)
+    if path.lower().endswith(".csv"):
+        return CsvSheetWriter(path)
+    raise ValueError(f"Unsupported output format: {path} (use .csv or .xlsx)")
+
+
+def select_jobs(catalog, categories=None, products=None, cities=None):
+    """Yields (category name, product, city) for every catalog entry matching the filters."""
+    categories = [c.lower() for c in categories or []]
+    products = [p.lower() for p in products or []]
+    cities = cities or AppConstants.CITIES
+
+    for category, product in catalog.iter_products():
+        category_name = category.get("name", "")
+        product_name = product.get("name", "")
+        if categories and not any(c in category_name.lower() for c in categories):
+            continue
+        if products and not any(p in product_name.lower() for p in products):
+            continue
+        for city in cities:
+            yield category_name, product, city
+
+
+def price_job(job, day_key):
+    category_name, product, city = job
+    if day_key == date.today().isoformat():
+        result, tier = openai_helpers.estimate_today_price(product, city)
+    else:
+        # Past dates are answered from history only
+        result = openai_helpers.get_history_entry(product.get("name"), day_key, city)
+        tier = "history" if result else "missing"
+    return category_name, product, city, result, tier
+
+
+def build_row(category_name, product, city, day_key, result, tier):
+    result = result or {}
+    return [
+        category_name,
+        product.get("name", ""),
+        product.get("unit", ""),
+        city,
+        day_key,
+        result.get("today_price", ""),
+        result.get("min_price", ""),
+        result.get("max_price", ""),
+        result.get("average_price", ""),
+        result.get("model_source", ""),
+        tier
+    ]
+
+
+def run_price_sheet(output, day_key, workers, categories=None, products=None, cities=None):
+    """
+    Prices the selected products and streams the rows to a CSV/XLSX file.
+
+    Returns:
+        Dict with row count, elapsed seconds and per-tier hit counts
+    """
+    jobs = list(select_jobs(get_catalog(), categories, products, cities))
+    writer = open_sheet_writer(output)
+    tier_counts = {}
+    started = time.perf_counter()
+
+    try:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="price-sheet") as executor:
+            # map() keeps catalog order while workers run ahead
+            for category_name, product, city, result, tier in executor.map(lambda job: price_job(job, day_key), jobs):
+                writer.write_row(build_row(category_name, product, city, day_key, result, tier))
+                tier_counts[tier] = tier_counts.get(tier, 0) + 1
+    finally:
+        writer.close()
+
+    return {
+        "rows": len(jobs),
+        "elapsed_s": time.perf_counter() - started,
+        "tiers": tier_counts
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export a price sheet for the catalog")
+    parser.add_argument("--output", "-o", required=True, help="Output file (.csv or .xlsx)")
+    parser.add_argument("--date", default=date.today().isoformat(),
+                        help="ISO date; dates other than today are read from price history")
+    parser.add_argument("--workers", "-w", type=int, default=8, help="Concurrent pricing workers")
+    parser.add_argument("--category", action="append", help="Category name filter (substring, repeatable)")
+    parser.add_argument("--product", action="append", help="Product name filter (substring, repeatable)")
+    parser.add_argument("--city", action="append", choices=AppConstants.CITIES, help="City (repeatable)")
+    parser.add_argument("--stub-providers", action="store_true", default=AppConstants.STUB_PROVIDERS,
+                        help="Answer LLM calls with local stubs instead of the real providers")
+    args = parser.parse_args()
+
+    if args.stub_providers:
+        from ai_dev_app.helpers.provider_stubs import install_provider_stubs, redirect_price_writes
+        install_provider_stubs()
+        print(f"🧪 LLM providers stubbed; price history and training writes go to {redirect_price_writes()}")
+
+    stats = run_price_sheet(args.output, args.date, args.workers, args.category, args.product, args.city)
+
+    elapsed = stats["elapsed_s"]
+    rate = stats["rows"] / elapsed if elapsed else 0.0
+    print(f"✅ {stats['rows']} rows → {args.output} in {elapsed:.2f}s ({rate:.1f} rows/s)")
+    for tier in openai_helpers.PRICE_TIERS + ["missing"]:
+        if tier in stats["tiers"]:
+            print(f"   {tier:<12} {stats['tiers'][tier]}")
+
+
+if __name__ == "__main__":
+    main()
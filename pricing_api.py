@@ -0,0 +1,331 @@
+import time
+import asyncio
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from aiohttp import web
+from ai_dev_app.constants.app_constants import AppConstants
+from ai_dev_app.helpers import metrics as pricing_metrics
+from ai_dev_app.helpers import openai_helpers
+from ai_dev_app.helpers import async_helpers
+from ai_dev_app.helpers import rate_limiter
+from ai_dev_app.helpers import persistence
+from ai_dev_app.helpers import warmup
+from ai_dev_app.helpers import model_registry
+from ai_dev_app.helpers import price_router
+from ai_dev_app.helpers.catalog import get_catalog, get_product_suppliers, reload_catalog
+from ai_dev_app.helpers.product_search import search_products
+
+# Headless JSON API over the same pricing engine as the Streamlit pages.
+# Run from the project root:  python pricing_api.py --stub-providers
+
+
+class ApiStats:
+    def __init__(self):
+        self.started_at = time.time()
+        self.requests = {}
+        self.errors = {}
+        self.latency_ms = {}
+        self.price_sources = {}
+        self.in_flight = 0
+
+    def record(self, route, elapsed_ms, status):
+        self.requests[route] = self.requests.get(route, 0) + 1
+        self.latency_ms[route] = self.latency_ms.get(route, 0.0) + elapsed_ms
+        if status >= 500:
+            self.errors[route] = self.errors.get(route, 0) + 1
+
+    def record_source(self, source):
+        self.price_sources[source] = self.price_sources.get(source, 0) + 1
+
+    def snapshot(self):
+        return {
+            "uptime_s": round(time.time() - self.started_at, 1),
+            "in_flight": self.in_flight,
+            "requests": dict(self.requests),
+            "errors": dict(self.errors),
+            "avg_latency_ms": {
+                route: round(total / self.requests[route], 2)
+                for route, total in self.latency_ms.items()
+            },
+            "price_sources": dict(self.price_sources),
+            "price_cache_entries": len(openai_helpers._ai_price_cache)
+        }
+
+
+def _error(status, message):
+    return web.json_response({"error": message}, status=status)
+
+
+@web.middleware
+async def stats_middleware(request, handler):
+    stats = request.app["stats"]
+    route = request.match_info.route.resource.canonical if request.match_info.route.resource else "unmatched"
+    started = time.perf_counter()
+    stats.in_flight += 1
+    status = 500
+    try:
+        response = await handler(request)
+        status = response.status
+        return response
+    except web.HTTPException as e:
+        status = e.status
+        raise
+    finally:
+        elapsed = time.perf_counter() - started
+        stats.in_flight -= 1
+        stats.record(route, elapsed * 1000, status)
+        pricing_metrics.observe("http_request_seconds", elapsed, route=route)
+        pricing_metrics.inc("http_requests_total", route=route, status=status)
+
+
+def _resolve(name, city):
+    """Returns (product, city, error); error is a (status, message) pair or None."""
+    if not name:
+        return None, None, (400, "Missing query parameter: product")
+    product = get_catalog().get_product(name)
+    if not product:
+        return None, None, (404, f"Unknown product: {name}")
+    city = city or "National Average"
+    if city not in AppConstants.CITIES:
+        return None, None, (400, f"Unknown city: {city}")
+    return product, city, None
+
+
+async def _price(app, product, city):
+    result = await async_helpers.get_today_price_estimate_async(product, city)
+    app["stats"].record_source(result.get("model_source", "unknown"))
+    return {"product": product.get("name"), "unit": product.get("unit", ""), **result}
+
+
+async def health(request):
+    catalog = get_catalog()
+    return web.json_response({
+        "status": "ok",
+        "catalog_version": catalog.version,
+        "products": len(catalog.products_by_name),
+        "local_model": model_registry.get_local_model() is not None,
+        "model_version": model_registry.get_model_version()
+    })
+
+
+async def ready(request):
+    # Readiness probe: 503 until the startup warm-up has finished
+    if not request.app["warmup"]:
+        return web.json_response({"status": "ready", "warmup": "disabled"})
+    state = warmup.status()
+    return web.json_response(state, status=200 if state["status"] == warmup.READY else 503)
+
+
+async def metrics(request):
+    return web.json_response({
+        **request.app["stats"].snapshot(),
+        "pricing": pricing_metrics.snapshot(),
+        "rate_limits": rate_limiter.snapshot(),
+        "router": price_router.router_stats()
+    })
+
+
+async def metrics_prometheus(request):
+    return web.Response(text=pricing_metrics.render_prometheus(), content_type="text/plain", charset="utf-8")
+
+
+async def price(request):
+    product, city, error = _resolve(request.query.get("product"), request.query.get("city"))
+    if error:
+        return _error(*error)
+    return web.json_response(await _price(request.app, product, city))
+
+
+async def price_batch(request):
+    try:
+        payload = await request.json()
+    except ValueError:
+        return _error(400, "Body must be JSON")
+
+    items = payload.get("items", []) if isinstance(payload, dict) else []
+    if not items:
+        return _error(400, "Body must contain a non-empty 'items' list")
+    if len(items) > AppConstants.API_MAX_BATCH:
+        return _error(413, f"Batch limited to {AppConstants.API_MAX_BATCH} items")
+
+    async def price_item(item):
+        if not isinstance(item, dict):
+            return {"error": "item must be an object"}
+        if not item.get("product"):
+            return {"product": None, "city": item.get("city"), "error": "item must have a product"}
+        product, city, error = _resolve(item.get("product"), item.get("city"))
+        if error:
+            return {"product": item.get("product"), "city": item.get("city"), "error": error[1]}
+        try:
+            return await _price(request.app, product, city)
+        except Exception as e:
+            print(f"⚠️ Batch pricing failed for {product.get('name')}: {e}")
+            return {"product": product.get("name"), "city": city, "error": "pricing failed"}
+
+    results = await asyncio.gather(*(price_item(item) for item in items))
+    return web.json_response({"count": len(results), "results": results})
+
+
+async def catalog(request):
+    catalog = get_catalog()
+    categories = []
+    for category in catalog.categories:
+        categories.append({
+            "name": category.get("name"),
+            "unit": category.get("unit", ""),
+            "products": [
+                {
+                    "name": p.get("name"),
+                    "unit": p.get("unit", ""),
+                    "min_price": p.get("min_price", 0),
+                    "max_price": p.get("max_price", 0),
+                    "average": p.get("average", 0)
+                }
+                for p in category.get("products", [])
+            ]
+        })
+    return web.json_response({"version": catalog.version, "categories": categories})
+
+
+async def catalog_reload(request):
+    # Same as the background watcher, for deploy scripts that want it applied now
+    try:
+        diff = await asyncio.get_running_loop().run_in_executor(None, reload_catalog)
+    except Exception as e:
+        return _error(500, f"Catalog reload failed: {e}")
+    return web.json_response({
+        "version": get_catalog().version,
+        "changed": diff is not None,
+        **(diff.summary() if diff else {})
+    })
+
+
+async def catalog_product(request):
+    product = get_catalog().get_product(request.query.get("name"))
+    if not product:
+        return _error(404, f"Unknown product: {request.query.get('name')}")
+    return web.json_response(product)
+
+
+async def search(request):
+    query = request.query.get("q", "")
+    if not query.strip():
+        return _error(400, "Missing query parameter: q")
+    try:
+        limit = int(request.query.get("limit", "10"))
+    except ValueError:
+        return _error(400, "limit must be an integer")
+    results = search_products(query, max(1, min(limit, 50)))
+    return web.json_response({"query": query, "count": len(results), "results": results})
+
+
+async def suppliers(request):
+    product, city, error = _resolve(request.query.get("product"), request.query.get("city"))
+    if error:
+        return _error(*error)
+    found = get_product_suppliers(product, city)
+    return web.json_response({
+        "product": product.get("name"),
+        "city": city,
+        "wholesale": found["wholesale"],
+        "retail": found["retail"]
+    })
+
+
+async def history(request):
+    product, city, error = _resolve(request.query.get("product"), request.query.get("city"))
+    if error:
+        return _error(*error)
+    index = openai_helpers.get_price_history_index()
+    start, end = request.query.get("start"), request.query.get("end")
+    period = request.query.get("period")
+    try:
+        if period:
+            points = index.aggregate(product["name"], city, start, end, period)
+        else:
+            points = [{"date": day, **summary} for day, summary in index.range(product["name"], city, start, end)]
+    except ValueError as e:
+        return _error(400, str(e))
+    return web.json_response({"product": product["name"], "city": city, "period": period or "raw", "points": points})
+
+
+async def history_latest(request):
+    product, city, error = _resolve(request.query.get("product"), request.query.get("city"))
+    if error:
+        return _error(*error)
+    try:
+        n = int(request.query.get("n", "1"))
+    except ValueError:
+        return _error(400, "n must be an integer")
+    latest = openai_helpers.get_price_history_index().latest(product["name"], city, n)
+    return web.json_response({
+        "product": product["name"],
+        "city": city,
+        "points": [{"date": day, **summary} for day, summary in latest]
+    })
+
+
+async def _on_startup(app):
+    # Pricing file writes and the local model run on the loop's default executor
+    asyncio.get_running_loop().set_default_executor(app["executor"])
+    if app["warmup"]:
+        warmup.start_warmup()
+
+
+async def _on_cleanup(app):
+    await async_helpers.close_http_session()
+    app["executor"].shutdown(wait=False)
+    persistence.flush()
+
+
+def create_app(workers=AppConstants.API_WORKERS, run_warmup=AppConstants.WARMUP_ON_START):
+    pricing_metrics.enable()
+    app = web.Application(middlewares=[stats_middleware])
+    app["warmup"] = run_warmup
+    app["stats"] = ApiStats()
+    app["executor"] = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="pricing")
+    app.on_startup.append(_on_startup)
+    app.on_cleanup.append(_on_cleanup)
+
+    app.router.add_get("/health", health)
+    app.router.add_get("/ready", ready)
+    app.router.add_get("/metrics", metrics)
+    app.router.add_get("/metrics/prometheus", metrics_prometheus)
+    app.router.add_get("/price", price)
+    app.router.add_post("/price/batch", price_batch)
+    app.router.add_get("/catalog", catalog)
+    app.router.add_get("/catalog/product", catalog_product)
+    app.router.add_post("/catalog/reload", catalog_reload)
+    app.router.add_get("/search", search)
+    app.router.add_get("/suppliers", suppliers)
+    app.router.add_get("/history", history)
+    app.router.add_get("/history/latest", history_latest)
+
+    get_catalog()
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="FRJAR AI pricing HTTP API")
+    parser.add_argument("--host", default=AppConstants.API_HOST)
+    parser.add_argument("--port", type=int, default=AppConstants.API_PORT)
+    parser.add_argument("--workers", type=int, default=AppConstants.API_WORKERS,
+                        help="Threads available for blocking pricing work (file writes, local model)")
+    parser.add_argument("--stub-providers", action="store_true", default=AppConstants.STUB_PROVIDERS,
+                        help="Answer LLM calls with local stubs instead of the real providers")
+    parser.add_argument("--stub-latency", type=float, default=0.0,
+                        help="Seconds each stubbed provider call sleeps")
+    parser.add_argument("--no-warmup", action="store_true", default=not AppConstants.WARMUP_ON_START,
+                        help="Report ready at once instead of warming caches first")
+    args = parser.parse_args()
+
+    if args.stub_providers:
+        from ai_dev_app.helpers.provider_stubs import install_provider_stubs, redirect_price_writes
+        install_provider_stubs(latency=args.stub_latency)
+        print(f"🧪 LLM providers stubbed; price history and training writes go to {redirect_price_writes()}")
+
+    web.run_app(create_app(args.workers, run_warmup=not args.no_warmup), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()